@@ -0,0 +1,293 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+DEFAULT_ROOT = os.getenv("FINDASH_BAR_STORE", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "bars"))
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Alpha Vantage and spreadsheet column names mapped to the yfinance names used by the dashboard.
+COLUMN_ALIASES = {
+    "open": "Open", "1. open": "Open",
+    "high": "High", "2. high": "High",
+    "low": "Low", "3. low": "Low",
+    "close": "Close", "4. close": "Close",
+    "volume": "Volume", "5. volume": "Volume",
+}
+
+# Alpha Vantage interval names mapped to the yfinance names used as store keys.
+INTERVAL_ALIASES = {
+    "1min": "1m", "5min": "5m", "15min": "15m", "30min": "30m", "60min": "1h",
+    "daily": "1d", "weekly": "1wk", "monthly": "1mo",
+}
+
+TIME_COLUMN = "timestamp"
+
+# Times read() re-reads the manifest when a concurrent compaction removed the parts it listed.
+READ_ATTEMPTS = 5
+
+
+def normalize_interval(interval: str) -> str:
+    return INTERVAL_ALIASES.get(interval, interval)
+
+
+def flatten_columns(data: pd.DataFrame | None) -> pd.DataFrame | None:
+    """
+        Drop the ticker level yfinance adds to the columns of a download, even of a single ticker,
+        so data["Close"] is a Series again. Frames of several tickers are returned unchanged.
+    """
+    if data is None or not isinstance(data.columns, pd.MultiIndex):
+        return data
+    level = "Ticker" if "Ticker" in data.columns.names else -1
+    if data.columns.get_level_values(level).nunique() > 1:
+        return data
+    return data.droplevel(level, axis=1)
+
+
+def normalize_ohlcv(data: pd.DataFrame, assume_tz: str = "America/New_York") -> pd.DataFrame:
+    """
+        Bring OHLCV data from yfinance, Alpha Vantage or the xlsx exports into one shape.
+        - params:
+            - data (pd.DataFrame): The bars, indexed by time or with a "date and time"/"date" column.
+            - assume_tz (str): The timezone of tz-naive timestamps (Alpha Vantage reports US/Eastern).
+        - returns:
+            - pd.DataFrame: Float Open/High/Low/Close/Volume columns on a sorted, unique UTC DatetimeIndex.
+    """
+    frame = flatten_columns(data).copy()
+    for column in ("date and time", "date", "Datetime", "Date", TIME_COLUMN):
+        if column in frame.columns:
+            frame = frame.set_index(column)
+            break
+    frame = frame.rename(columns=lambda c: COLUMN_ALIASES.get(str(c), COLUMN_ALIASES.get(str(c).lower(), c)))
+    frame = frame[[c for c in OHLCV_COLUMNS if c in frame.columns]].astype("float64")
+    index = pd.DatetimeIndex(pd.to_datetime(frame.index))
+    if index.tz is None:
+        index = index.tz_localize(assume_tz, ambiguous="NaT", nonexistent="NaT")
+    frame.index = index.tz_convert("UTC").rename(TIME_COLUMN)
+    frame = frame[frame.index.notna()].sort_index()
+    return frame[~frame.index.duplicated(keep="last")]
+
+
+def save_frame(data: pd.DataFrame, file_name: str) -> None:
+    """
+        Write a frame to disk in the format given by the file extension (.parquet, .feather or .xlsx).
+    """
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension == ".parquet":
+        data.to_parquet(file_name)
+    elif extension == ".feather":
+        data.reset_index().to_feather(file_name)
+    else:
+        data.to_excel(file_name)
+
+
+class Bar_Store:
+    def __init__(self, root: str = DEFAULT_ROOT, row_group_size: int = 50_000, max_parts: int = 32) -> None:
+        self._root = root
+        self._row_group_size = row_group_size
+        self._max_parts = max_parts
+        self._lock = threading.RLock()
+
+    def __repr__(self) -> str:
+        return f"Bar_Store(root={self._root})"
+
+    @property
+    def root(self) -> str:
+        return self._root
+
+    def _dir(self, symbol: str, interval: str) -> str:
+        return os.path.join(self._root, symbol.strip().upper(), normalize_interval(interval))
+
+    @contextmanager
+    def _locked(self, directory: str):
+        # The thread lock covers this process; flock covers other gunicorn workers on the host.
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, open(os.path.join(directory, ".lock"), "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_manifest(self, directory: str) -> dict:
+        path = os.path.join(directory, "_manifest.json")
+        if not os.path.exists(path):
+            return {"parts": [], "next": 0}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_manifest(self, directory: str, manifest: dict) -> None:
+        path = os.path.join(directory, "_manifest.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(path + ".tmp", path)
+
+    def _write_part(self, directory: str, manifest: dict, frame: pd.DataFrame) -> dict:
+        name = f"part-{manifest['next']:06d}.parquet"
+        path = os.path.join(directory, name)
+        table = pa.Table.from_pandas(frame.reset_index(), preserve_index=False)
+        pq.write_table(table, path + ".tmp", row_group_size=self._row_group_size)
+        os.replace(path + ".tmp", path)
+        manifest["next"] += 1
+        return {
+            "file": name,
+            "start": int(frame.index[0].value),
+            "end": int(frame.index[-1].value),
+            "rows": len(frame),
+        }
+
+    def symbols(self) -> list:
+        if not os.path.isdir(self._root):
+            return []
+        return sorted(d for d in os.listdir(self._root) if os.path.isdir(os.path.join(self._root, d)))
+
+    def last_timestamp(self, symbol: str, interval: str) -> pd.Timestamp | None:
+        parts = self._read_manifest(self._dir(symbol, interval))["parts"]
+        return pd.Timestamp(parts[-1]["end"], tz="UTC") if parts else None
+
+    def first_timestamp(self, symbol: str, interval: str) -> pd.Timestamp | None:
+        parts = self._read_manifest(self._dir(symbol, interval))["parts"]
+        return pd.Timestamp(parts[0]["start"], tz="UTC") if parts else None
+
+    def synced_at(self, symbol: str, interval: str) -> float | None:
+        """
+            Return the wall-clock time of the last append, even one that added no rows.
+        """
+        return self._read_manifest(self._dir(symbol, interval)).get("synced_at")
+
+    def append(self, symbol: str, interval: str, data: pd.DataFrame, assume_tz: str = "America/New_York") -> int:
+        """
+            Append bars newer than the last stored bar as a new Parquet part. The last stored bar
+            may have been partial when it was written, so a bar with the same timestamp replaces it.
+            - params:
+                - symbol (str): The stock symbol.
+                - interval (str): The bar interval (1m, 5m, 1h, 1d, ... or the Alpha Vantage names).
+                - data (pd.DataFrame): The bars to add, in any shape normalize_ohlcv accepts.
+                - assume_tz (str): The timezone of tz-naive timestamps.
+            - returns:
+                - int: The number of rows written.
+        """
+        if data is None or data.empty:
+            return 0
+        frame = normalize_ohlcv(data, assume_tz)
+        directory = self._dir(symbol, interval)
+        with self._locked(directory):
+            manifest = self._read_manifest(directory)
+            manifest["synced_at"] = time.time()
+            if manifest["parts"]:
+                frame = frame[frame.index >= pd.Timestamp(manifest["parts"][-1]["end"], tz="UTC")]
+            if frame.empty:
+                self._write_manifest(directory, manifest)
+                return 0
+            manifest["parts"].append(self._write_part(directory, manifest, frame))
+            self._write_manifest(directory, manifest)
+            if len(manifest["parts"]) > self._max_parts:
+                self._compact(directory, manifest)
+        return len(frame)
+
+    def read(self, symbol: str, interval: str, start=None, end=None) -> pd.DataFrame | None:
+        """
+            Read bars in [start, end]. Parts outside the range are skipped using the manifest,
+            and row groups inside a part are skipped using their Parquet min/max statistics.
+            Where two parts share a timestamp, the later part wins. Reads take no lock: a read that
+            races a compaction re-reads the manifest and tries again.
+            - params:
+                - symbol (str): The stock symbol.
+                - interval (str): The bar interval.
+                - start: The first timestamp to include, None for the beginning (naive times are UTC).
+                - end: The last timestamp to include, None for the end.
+            - returns:
+                - pd.DataFrame | None: The bars on a UTC DatetimeIndex, or None if nothing is stored.
+        """
+        directory = self._dir(symbol, interval)
+        start = self._utc(start)
+        end = self._utc(end)
+        filters = []
+        if start is not None:
+            filters.append((TIME_COLUMN, ">=", start))
+        if end is not None:
+            filters.append((TIME_COLUMN, "<=", end))
+        for attempt in range(READ_ATTEMPTS):
+            parts = self._read_manifest(directory)["parts"]
+            files = [
+                os.path.join(directory, part["file"]) for part in parts
+                if (start is None or part["end"] >= start.value) and (end is None or part["start"] <= end.value)
+            ]
+            if not files:
+                return None
+            try:
+                frame = pd.concat([pq.read_table(f, filters=filters or None).to_pandas() for f in files])
+                break
+            except FileNotFoundError:
+                # A compaction removed the parts after we read the manifest. It writes the new manifest
+                # before removing anything, so reading the manifest again finds the merged part.
+                if attempt == READ_ATTEMPTS - 1:
+                    raise
+        frame = frame.set_index(TIME_COLUMN)
+        frame = frame[~frame.index.duplicated(keep="last")]
+        return frame if not frame.empty else None
+
+    def compact(self, symbol: str, interval: str) -> None:
+        """
+            Merge all parts of a series into one file with evenly sized, time-ordered row groups.
+        """
+        directory = self._dir(symbol, interval)
+        with self._locked(directory):
+            self._compact(directory, self._read_manifest(directory))
+
+    def _compact(self, directory: str, manifest: dict) -> None:
+        old = [part["file"] for part in manifest["parts"]]
+        if len(old) < 2:
+            return
+        frame = pd.concat([pq.read_table(os.path.join(directory, f)).to_pandas() for f in old]).set_index(TIME_COLUMN)
+        frame = frame[~frame.index.duplicated(keep="last")]
+        manifest["parts"] = [self._write_part(directory, manifest, frame)]
+        self._write_manifest(directory, manifest)
+        for name in old:
+            os.remove(os.path.join(directory, name))
+
+    def migrate_excel(self, file_name: str, symbol: str, interval: str, assume_tz: str = "America/New_York") -> int:
+        """
+            Import an existing xlsx export (like data/apple.xlsx) into the store.
+            - returns:
+                - int: The number of rows written.
+        """
+        return self.append(symbol, interval, pd.read_excel(file_name), assume_tz)
+
+    @staticmethod
+    def _utc(value) -> pd.Timestamp | None:
+        if value is None:
+            return None
+        value = pd.Timestamp(value)
+        return value.tz_localize("UTC") if value.tz is None else value.tz_convert("UTC")
+
+
+bar_store = Bar_Store()
+
+
+def main(argv: list) -> None:
+    if len(argv) != 4 or argv[0] != "migrate":
+        print("Usage: python -m Data_Services.Bar_Store migrate <file.xlsx> <symbol> <interval>")
+        return
+    rows = bar_store.migrate_excel(argv[1], argv[2], argv[3])
+    print(f"Migrated {rows} rows of {argv[2].upper()} {argv[3]} into {bar_store.root}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,274 @@
+import io
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any
+import pandas as pd
+import pyarrow as pa
+
+
+DEFAULT_PATH = os.getenv("FINDASH_CACHE_PATH", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cache.sqlite"))
+
+
+def encode(value: Any) -> tuple:
+    """
+        Serialize a value for a shared backend.
+        - returns:
+            - tuple: (encoding, bytes). DataFrames with plain column names are written as an Arrow IPC
+              stream, everything else is pickled.
+    """
+    if isinstance(value, pd.DataFrame) and all(isinstance(column, str) for column in value.columns):
+        try:
+            table = pa.Table.from_pandas(value, preserve_index=True)
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return "arrow", sink.getvalue().to_pybytes()
+        except (pa.ArrowException, TypeError, ValueError):
+            pass
+    return "pickle", pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def decode(encoding: str, data: bytes) -> Any:
+    if encoding == "arrow":
+        return pa.ipc.open_stream(io.BytesIO(data)).read_all().to_pandas()
+    return pickle.loads(data)
+
+
+class Cache_Backend(ABC):
+    """
+        Storage shared behind Symbol_Cache. Keys are strings; values expire after their TTL.
+    """
+
+    # Whether other processes on the host read the same entries.
+    shared = False
+
+    @abstractmethod
+    def get(self, key: str) -> tuple | None:
+        """
+            - returns:
+                - tuple | None: (value, seconds until expiry), None if missing or expired.
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def items(self, prefix: str) -> list:
+        """
+            - returns:
+                - list: (key, value) of every live entry whose key starts with prefix.
+        """
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+
+class Memory_Backend(Cache_Backend):
+    """
+        A backend local to the process, for single-worker runs.
+    """
+
+    def __init__(self) -> None:
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"Memory_Backend(entries={len(self._entries)})"
+
+    def get(self, key: str) -> tuple | None:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[1], entry[0] - time.time()
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+
+    def items(self, prefix: str) -> list:
+        now = time.time()
+        with self._lock:
+            return [(k, v) for k, (expires, v) in self._entries.items() if k.startswith(prefix) and expires > now]
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries)}
+
+
+class SQLite_Backend(Cache_Backend):
+    """
+        A backend in one SQLite file in WAL mode, shared by every gunicorn worker on the host.
+        Each write is a single transaction, so readers never see half-written values. When the
+        pages in use exceed max_bytes, expired and then least recently read entries are removed
+        until the file is back under EVICT_TO of the limit.
+
+        Connections are opened on first use in each thread of each process, so a backend created
+        at import time in the gunicorn master is never shared with the forked workers.
+    """
+
+    shared = True
+
+    # Reads refresh the LRU timestamp at most this often, to keep reads from turning into writes.
+    TOUCH_INTERVAL = 60
+
+    # Share of max_bytes an eviction frees down to, so the writes after it do not evict again.
+    EVICT_TO = 0.9
+
+    def __init__(self, path: str = DEFAULT_PATH, max_bytes: int = 256 * 1024 * 1024, timeout: float = 10.0) -> None:
+        self._path = path
+        self._max_bytes = max_bytes
+        self._timeout = timeout
+        self._local = threading.local()
+        self._schema_pid = None
+        self._schema_lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"SQLite_Backend(path={self._path}, max_bytes={self._max_bytes})"
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads or across fork, so each thread of
+        # each process opens its own. A connection inherited from the parent is dropped, not closed.
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            self._create_schema()
+            connection = sqlite3.connect(self._path, timeout=self._timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    def _create_schema(self) -> None:
+        if self._schema_pid == os.getpid():
+            return
+        with self._schema_lock:
+            if self._schema_pid == os.getpid():
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+            connection = sqlite3.connect(self._path, timeout=self._timeout)
+            try:
+                with connection:
+                    connection.execute(
+                        "CREATE TABLE IF NOT EXISTS cache ("
+                        "key TEXT PRIMARY KEY, encoding TEXT NOT NULL, value BLOB NOT NULL, "
+                        "size INTEGER NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)")
+                    connection.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+            finally:
+                connection.close()
+            self._schema_pid = os.getpid()
+
+    def get(self, key: str) -> tuple | None:
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT encoding, value, expires, accessed FROM cache WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or row[2] <= now:
+            return None
+        if now - row[3] > self.TOUCH_INTERVAL:
+            try:
+                with connection:
+                    connection.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+            except sqlite3.OperationalError:
+                pass
+        try:
+            return decode(row[0], row[1]), row[2] - now
+        except Exception as e:
+            print("Error: ", e)
+            return None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        encoding, data = encode(value)
+        if len(data) > self._max_bytes:
+            return
+        now = time.time()
+        try:
+            with self._connection() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO cache (key, encoding, value, size, expires, accessed) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", (key, encoding, data, len(data), now + ttl, now))
+                self._evict(connection, now)
+        except sqlite3.OperationalError as e:
+            print("Error: ", e)
+
+    @staticmethod
+    def _used_bytes(connection: sqlite3.Connection) -> int:
+        # The pages in use, read from the database header instead of summing every row.
+        page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = connection.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - free_pages) * connection.execute("PRAGMA page_size").fetchone()[0]
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        if self._used_bytes(connection) <= self._max_bytes:
+            return
+        connection.execute("DELETE FROM cache WHERE expires <= ?", (now,))
+        excess = self._used_bytes(connection) - int(self._max_bytes * self.EVICT_TO)
+        if excess <= 0:
+            return
+        for key, size in connection.execute("SELECT key, size FROM cache ORDER BY accessed").fetchall():
+            if excess <= 0:
+                break
+            connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+            excess -= size
+
+    def items(self, prefix: str) -> list:
+        rows = self._connection().execute(
+            "SELECT key, encoding, value FROM cache WHERE key >= ? AND key < ? AND expires > ?",
+            (prefix, prefix + "\uffff", time.time())).fetchall()
+        entries = []
+        for key, encoding, data in rows:
+            try:
+                entries.append((key, decode(encoding, data)))
+            except Exception as e:
+                print("Error: ", e)
+        return entries
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache WHERE key >= ? AND key < ?", (prefix, prefix + "\uffff"))
+
+    def clear(self) -> None:
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache")
+
+    def stats(self) -> dict:
+        connection = self._connection()
+        entries = connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        return {"entries": entries, "bytes": self._used_bytes(connection), "max_bytes": self._max_bytes}
+
+
+def backend_from_env() -> Cache_Backend | None:
+    """
+        Build the backend named by FINDASH_CACHE_BACKEND: sqlite, memory, or none (the default).
+    """
+    name = os.getenv("FINDASH_CACHE_BACKEND", "none").lower()
+    if name == "sqlite":
+        return SQLite_Backend(max_bytes=int(os.getenv("FINDASH_CACHE_MAX_BYTES", 256 * 1024 * 1024)))
+    if name == "memory":
+        return Memory_Backend()
+    return None
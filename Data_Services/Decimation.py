@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_WIDTH = 1200
+
+# Points drawn per pixel of graph width: a line needs about one point per pixel, a candle a few pixels.
+POINTS_PER_PIXEL = {"line": 1.0, "candlestick": 0.25, "ohlc": 0.25}
+
+
+# Widths payloads are built for. Graph widths are rounded up to one of them, so windows of similar
+# size and small resizes share figure cache entries.
+WIDTH_BUCKETS = (800, 1200, 1600, 2400)
+
+
+def width_bucket(width: int | None) -> int:
+    """
+        Round a graph width in pixels up to the nearest of WIDTH_BUCKETS, DEFAULT_WIDTH when unknown.
+    """
+    if not width:
+        return DEFAULT_WIDTH
+    return next((bucket for bucket in WIDTH_BUCKETS if width <= bucket), WIDTH_BUCKETS[-1])
+
+
+def target_points(width: int | None, chart_type: str) -> int:
+    """
+        Return how many points are worth sending for a graph of the given pixel width.
+    """
+    width = width or DEFAULT_WIDTH
+    return max(int(width * POINTS_PER_PIXEL.get(chart_type, 1.0)), 10)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+        Largest-Triangle-Three-Buckets downsampling.
+        - params:
+            - x (np.ndarray): The x values, increasing.
+            - y (np.ndarray): The y values.
+            - threshold (int): The number of points to keep.
+        - returns:
+            - np.ndarray: The positions of the kept points, always including the first and last.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    # Bucket i covers [edges[i], edges[i + 1]); the first and last points are buckets of their own.
+    edges = (np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    counts = np.diff(np.append(edges, n))
+    averages_x = np.add.reduceat(x, edges) / counts
+    averages_y = np.add.reduceat(y, edges) / counts
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        area = np.abs((x[a] - averages_x[i + 1]) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (averages_y[i + 1] - y[a]))
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    kept[-1] = n - 1
+    return kept
+
+
+def ohlc_buckets(data: pd.DataFrame, buckets: int) -> pd.DataFrame:
+    """
+        Merge consecutive bars into at most `buckets` bars, keeping the first open, the highest high,
+        the lowest low, the last close and the total volume of each group.
+    """
+    n = len(data)
+    if buckets >= n:
+        return data
+    starts = np.unique((np.arange(buckets) * n) // buckets)
+    ends = np.append(starts[1:], n) - 1
+    merged = {
+        "Open": data["Open"].to_numpy()[starts],
+        "High": np.maximum.reduceat(data["High"].to_numpy(), starts),
+        "Low": np.minimum.reduceat(data["Low"].to_numpy(), starts),
+        "Close": data["Close"].to_numpy()[ends],
+    }
+    if "Volume" in data.columns:
+        merged["Volume"] = np.add.reduceat(data["Volume"].to_numpy(), starts)
+    return pd.DataFrame(merged, index=data.index[starts])
+
+
+def visible_range(relayout_data: dict | None) -> tuple | None:
+    """
+        Read the zoomed x range out of a dcc.Graph relayoutData event.
+        - returns:
+            - tuple | None: (start, end) as strings, or None when the graph shows everything.
+    """
+    if not relayout_data:
+        return None
+    if "xaxis.range[0]" in relayout_data and "xaxis.range[1]" in relayout_data:
+        return relayout_data["xaxis.range[0]"], relayout_data["xaxis.range[1]"]
+    if "xaxis.range" in relayout_data:
+        return tuple(relayout_data["xaxis.range"][:2])
+    return None
+
+
+def is_zoom_event(relayout_data: dict | None) -> bool:
+    """
+        Whether a relayoutData event changed the x range (zoom, pan or reset) rather than e.g. autosize.
+    """
+    return bool(relayout_data) and (visible_range(relayout_data) is not None or "xaxis.autorange" in relayout_data)
+
+
+def slice_range(data: pd.DataFrame, x_range: tuple) -> pd.DataFrame:
+    # Plotly reports ranges as wall-clock strings in the data's own timezone.
+    start, end = (pd.Timestamp(value) for value in x_range)
+    tz = data.index.tz
+    if tz is not None:
+        start, end = start.tz_localize(tz), end.tz_localize(tz)
+    return data.loc[start:end]
+
+
+def decimate(data: pd.DataFrame, chart_type: str, width: int | None = None, x_range: tuple | None = None) -> pd.DataFrame:
+    """
+        Cut a frame down to what the graph can show before it is turned into a figure.
+        - params:
+            - data (pd.DataFrame): The full resolution OHLCV bars.
+            - chart_type (str): line, candlestick or ohlc.
+            - width (int): The graph width in pixels.
+            - x_range (tuple): The zoomed range, only bars inside it are used.
+        - returns:
+            - pd.DataFrame: LTTB-selected rows for line charts, merged bars for candlestick and OHLC charts.
+    """
+    if x_range is not None:
+        data = slice_range(data, x_range)
+    target = target_points(width, chart_type)
+    if len(data) <= target:
+        return data
+    if chart_type == "line":
+        close = data["Close"].dropna()
+        kept = lttb(close.index.asi8.astype("float64"), close.to_numpy(), target)
+        return data.loc[close.index[kept]]
+    return ohlc_buckets(data.dropna(subset=["Open", "High", "Low", "Close"]), target)
+
+
+def _wall_clock(index: pd.DatetimeIndex) -> list:
+    # Plotly draws naive timestamps; zoom ranges come back in the same wall-clock time.
+    return index.strftime("%Y-%m-%d %H:%M:%S").tolist()
+
+
+def _values(series: pd.Series) -> list:
+    # NaN is not valid JSON, gaps are sent as null.
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def chart_payload(data: pd.DataFrame, width: int | None = None, x_range: tuple | None = None) -> dict:
+    """
+        Build the columnar payload the browser draws every chart type from, so switching chart type
+        needs no server call.
+        - params:
+            - data (pd.DataFrame): The full resolution OHLCV bars.
+            - width (int): The graph width in pixels.
+            - x_range (tuple): The zoomed range, only bars inside it are used.
+        - returns:
+            - dict: "line" holds x and close of the line chart, "bars" holds x, open, high, low and close
+              of the candlestick and OHLC charts, each decimated for its chart type.
+    """
+    line = decimate(data, "line", width, x_range)
+    bars = decimate(data, "candlestick", width, x_range)
+    return {
+        "line": {"x": _wall_clock(line.index), "close": _values(line["Close"])},
+        "bars": {
+            "x": _wall_clock(bars.index),
+            "open": _values(bars["Open"]),
+            "high": _values(bars["High"]),
+            "low": _values(bars["Low"]),
+            "close": _values(bars["Close"]),
+        },
+    }
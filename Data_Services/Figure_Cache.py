@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+from typing import Callable
+import pandas as pd
+
+
+def data_version(data: pd.DataFrame | None) -> tuple:
+    """
+        A cheap fingerprint of a bar frame: its length, first and last timestamp and last close.
+        Any new or revised bar at the end changes it.
+    """
+    if data is None or data.empty:
+        return (0,)
+    last_close = data["Close"].iloc[-1] if "Close" in data.columns else None
+    return len(data), str(data.index[0]), str(data.index[-1]), float(last_close) if last_close is not None else None
+
+
+class Figure_Cache:
+    """
+        Serialized Plotly figures and chart payloads kept in LRU order and bounded by their total size,
+        so a view that was already drawn skips both building the figure and turning it into JSON.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __repr__(self) -> str:
+        return f"Figure_Cache(entries={len(self._entries)}, bytes={self._bytes}, max_bytes={self._max_bytes})"
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    def get(self, key: tuple, builder: Callable) -> str:
+        """
+            Return the JSON of the figure for the key, building and storing it on a miss.
+            - params:
+                - key (tuple): Everything the figure depends on, including the data_version of its bars.
+                - builder (Callable): Returns the go.Figure to cache, or its JSON as a str.
+            - returns:
+                - str: The figure as JSON.
+        """
+        with self._lock:
+            figure_json = self._entries.get(key)
+            if figure_json is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return figure_json
+            self._misses += 1
+        built = builder()
+        figure_json = built if isinstance(built, str) else built.to_json()
+        self._store(key, figure_json)
+        return figure_json
+
+    def _store(self, key: tuple, figure_json: str) -> None:
+        size = len(figure_json)
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = figure_json
+            self._bytes += size
+            while self._bytes > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+            }
+
+
+figure_cache = Figure_Cache()
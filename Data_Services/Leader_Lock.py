@@ -0,0 +1,80 @@
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # Without flock (Windows) every process leads, as before the election existed.
+    fcntl = None
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOCK_DIR = os.getenv("FINDASH_LOCK_DIR", os.path.join(ROOT, "data"))
+
+
+class Leader_Lock:
+    """
+        Elects one process among the gunicorn workers to run a background job, with an exclusive flock
+        on <LOCK_DIR>/<name>.lock. The lock is released by the kernel when its holder exits, so another
+        worker takes over on its next try_acquire(). A child forked from the holder does not inherit
+        the leadership.
+    """
+
+    def __init__(self, name: str, directory: str = LOCK_DIR) -> None:
+        self._path = os.path.join(directory, f"{name}.lock")
+        self._file = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"Leader_Lock(path={self._path}, held={self.held})"
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None and self._pid == os.getpid()
+
+    def try_acquire(self) -> bool:
+        """
+            Take the lock if no other process holds it, without waiting.
+            - returns:
+                - bool: Whether this process holds the lock.
+        """
+        if fcntl is None:
+            return True
+        with self._lock:
+            if self._file is not None and self._pid != os.getpid():
+                # Inherited across fork: the lock belongs to the parent, closing our copy keeps it held.
+                self._file.close()
+                self._file = None
+            if self._file is not None:
+                return True
+            try:
+                os.makedirs(os.path.dirname(self._path), exist_ok=True)
+                f = open(self._path, "a+")
+            except OSError as e:
+                print("Error: ", e)
+                return False
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                f.close()
+                return False
+            f.truncate(0)
+            f.write(str(os.getpid()))
+            f.flush()
+            self._file, self._pid = f, os.getpid()
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            if self._pid == os.getpid():
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
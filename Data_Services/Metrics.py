@@ -0,0 +1,328 @@
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+
+# Latency buckets in seconds, from cache hits to slow upstream calls.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Directory where each gunicorn worker writes its metrics for the others to serve, unset for one process.
+METRICS_DIR = os.getenv("FINDASH_METRICS_DIR")
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(label, "")) for label in self.labels), 0.0)
+
+    def render(self, extra: dict | None = None) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                labels = {**(extra or {}), **dict(zip(self.labels, key))}
+                lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self, extra: dict | None = None) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                labels = {**(extra or {}), **dict(zip(self.labels, key))}
+                for bound, count in zip(self.buckets, counts):
+                    bucket_labels = _format_labels({**labels, "le": _format_value(bound)})
+                    lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {counts[-1]}")
+        return lines
+
+
+def _merge(texts: list) -> list:
+    # Join several expositions into one, keeping a single HELP and TYPE line per metric.
+    families = {}
+    for text in texts:
+        name = None
+        for line in text.splitlines():
+            if line.startswith("# HELP "):
+                name = line.split(" ", 3)[2]
+                if name not in families:
+                    families[name] = ([line], [])
+                continue
+            if line.startswith("# TYPE "):
+                if not families[name][0][1:]:
+                    families[name][0].append(line)
+                continue
+            if line and name is not None:
+                families[name][1].append(line)
+    return [line for header, samples in families.values() for line in header + samples]
+
+
+class Metrics_Registry:
+    """
+        Counters and histograms recorded in this process, plus gauges read from other components
+        (cache and scheduler stats) when the metrics are scraped. render() writes the Prometheus
+        text exposition format.
+
+        Every series carries a pid label, since the counters of each gunicorn worker start from zero
+        and a scrape reaches only one of them. With a `directory` (FINDASH_METRICS_DIR) each process
+        writes its own series to <directory>/<pid>.prom every `interval` seconds and render() serves
+        those of all live workers, so one scrape covers the host; aggregate with sum without (pid).
+        Without one, only the worker that answered is reported.
+    """
+
+    def __init__(self, directory: str | None = METRICS_DIR, interval: float = 15.0) -> None:
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._directory = directory
+        self._interval = interval
+        self._exporter = None
+        self._collector_errors = self.counter(
+            "findash_collector_errors_total", "Scrapes in which a stats collector raised.", ("collector",))
+
+    def __repr__(self) -> str:
+        return f"Metrics_Registry(metrics={len(self._metrics)}, collectors={len(self._collectors)})"
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        with self._lock:
+            return self._metrics.setdefault(name, Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        with self._lock:
+            return self._metrics.setdefault(name, Histogram(name, help, labels, buckets))
+
+    def register_collector(self, prefix: str, collect: Callable[[], dict], help: str | None = None) -> None:
+        """
+            Export the numbers of a stats() dict as gauges named <prefix>_<key>; nested dicts become
+            a label named after the key, e.g. queue_depth_by_priority{key="interactive"}.
+            - params:
+                - help (str): What the stats describe, used in the HELP line of each gauge.
+        """
+        self._collectors.append((prefix, collect, help or prefix.replace("_", " ")))
+
+    def render(self) -> str:
+        own = self.render_process()
+        if self._directory is None:
+            return own
+        self._write(own)
+        texts = [own]
+        cutoff = time.time() - 4 * self._interval
+        try:
+            names = os.listdir(self._directory)
+        except OSError as e:
+            print("Error: ", e)
+            names = []
+        for name in sorted(names):
+            path = os.path.join(self._directory, name)
+            if not name.endswith(".prom") or name == f"{os.getpid()}.prom":
+                continue
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    continue
+                with open(path) as f:
+                    texts.append(f.read())
+            except OSError:
+                continue
+        return "\n".join(_merge(texts)) + "\n"
+
+    def start_export(self) -> None:
+        """
+            Write this process's series to the metrics directory every `interval` seconds, for the
+            worker that answers the next scrape. Does nothing without a directory.
+        """
+        if self._directory is None or (self._exporter is not None and self._exporter[0] == os.getpid()):
+            return
+        if self._exporter is None and hasattr(os, "register_at_fork"):
+            # Threads do not survive fork, so a worker forked from a preloaded master starts its own.
+            os.register_at_fork(after_in_child=self.start_export)
+        thread = threading.Thread(target=self._export, name="metrics-export", daemon=True)
+        self._exporter = (os.getpid(), thread)
+        thread.start()
+
+    def _export(self) -> None:
+        while True:
+            self._write(self.render_process())
+            time.sleep(self._interval)
+
+    def _write(self, text: str) -> None:
+        path = os.path.join(self._directory, f"{os.getpid()}.prom")
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            with open(path + ".tmp", "w") as f:
+                f.write(text)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print("Error: ", e)
+
+    def render_process(self) -> str:
+        """
+            Render the series of this process only, each labelled with its pid.
+        """
+        process = {"pid": os.getpid()}
+        lines = []
+        collected = []
+        for prefix, collect, help in self._collectors:
+            try:
+                collected.append((prefix, collect(), help))
+            except Exception:
+                logger.exception("Metrics collector %s failed", prefix)
+                self._collector_errors.inc(collector=prefix)
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render(process))
+        for prefix, stats, help in collected:
+            for key, value in stats.items():
+                name = f"{prefix}_{key}"
+                if isinstance(value, dict):
+                    values = [({**process, "key": k}, v) for k, v in value.items() if isinstance(v, (int, float))]
+                elif isinstance(value, (int, float)):
+                    values = [(process, value)]
+                else:
+                    continue
+                lines.append(f"# HELP {name} {help}: {key.replace('_', ' ')}.")
+                lines.append(f"# TYPE {name} gauge")
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(v)}" for labels, v in values)
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics_Registry()
+
+callback_seconds = metrics.histogram(
+    "findash_callback_seconds", "Latency of Dash callbacks.", ("callback",))
+callback_calls = metrics.counter(
+    "findash_callback_calls_total", "Dash callback calls by outcome (ok, prevented, error).", ("callback", "outcome"))
+function_seconds = metrics.histogram(
+    "findash_function_seconds", "Latency of data functions, including cache hits.", ("function",))
+function_errors = metrics.counter(
+    "findash_function_errors_total", "Data function calls that raised.", ("function",))
+upstream_seconds = metrics.histogram(
+    "findash_upstream_seconds", "Latency of requests to Yahoo Finance and Alpha Vantage.", ("source", "endpoint"))
+upstream_calls = metrics.counter(
+    "findash_upstream_calls_total", "Requests to Yahoo Finance and Alpha Vantage by outcome (ok, empty, error, throttled).",
+    ("source", "endpoint", "outcome"))
+
+
+def timed(name: str):
+    """
+        Decorate a data function to record its latency and errors under findash_function_*.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                function_errors.inc(function=name)
+                raise
+            finally:
+                function_seconds.observe(time.perf_counter() - start, function=name)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def upstream(source: str, endpoint: str):
+    """
+        Time one upstream request. Callers may set outcome["outcome"] to "empty", "throttled" or "error"
+        for requests that returned without raising.
+    """
+    outcome = {"outcome": "ok"}
+    start = time.perf_counter()
+    try:
+        yield outcome
+    except Exception:
+        outcome["outcome"] = "error"
+        raise
+    finally:
+        upstream_seconds.observe(time.perf_counter() - start, source=source, endpoint=endpoint)
+        upstream_calls.inc(source=source, endpoint=endpoint, outcome=outcome["outcome"])
+
+
+def instrument_callbacks(app) -> None:
+    """
+        Wrap every server-side callback registered on a Dash app so far with latency and outcome metrics.
+    """
+    from dash.exceptions import PreventUpdate
+    for entry in app.callback_map.values():
+        func = entry.get("callback")
+        if func is None or getattr(func, "_instrumented", False):
+            continue
+        name = getattr(func, "__name__", "callback")
+
+        def wrapper(*args, _func=func, _name=name, **kwargs):
+            start = time.perf_counter()
+            outcome = "ok"
+            try:
+                return _func(*args, **kwargs)
+            except PreventUpdate:
+                outcome = "prevented"
+                raise
+            except Exception:
+                outcome = "error"
+                raise
+            finally:
+                callback_seconds.observe(time.perf_counter() - start, callback=_name)
+                callback_calls.inc(callback=_name, outcome=outcome)
+
+        functools.update_wrapper(wrapper, func)
+        wrapper._instrumented = True
+        entry["callback"] = wrapper
@@ -0,0 +1,262 @@
+import os
+import threading
+import time
+from typing import Any, Callable
+import pandas as pd
+from Data_Services.Leader_Lock import Leader_Lock
+from Data_Services.Rollup import EXCHANGE_TZ
+from Data_Services.Symbol_Cache import Symbol_Cache, symbol_cache
+from Data_Services.Watchlist import Watchlist, watchlist
+
+
+# Seconds between refresh cycles in each market session. While the market is closed only the first
+# cycle refreshes, later ones just check whether the session has changed.
+SESSION_INTERVALS = {
+    "regular": 60,
+    "extended": 5 * 60,
+    "closed": 15 * 60,
+}
+
+# Backend keys under which each process publishes its request counts and watchlist, followed by its pid.
+DEMAND_PREFIX = "prefetch\x1fdemand\x1f"
+
+
+def market_session(now: pd.Timestamp | None = None) -> str:
+    """
+        Return the NYSE session at the given time: regular (09:30-16:00), extended (04:00-09:30 and
+        16:00-20:00) or closed (overnight and weekends). Exchange holidays are not taken into account.
+    """
+    now = (now if now is not None else pd.Timestamp.now(tz=EXCHANGE_TZ)).tz_convert(EXCHANGE_TZ)
+    if now.weekday() >= 5:
+        return "closed"
+    minutes = now.hour * 60 + now.minute
+    if 9 * 60 + 30 <= minutes < 16 * 60:
+        return "regular"
+    if 4 * 60 <= minutes < 20 * 60:
+        return "extended"
+    return "closed"
+
+
+class Prefetch_Worker:
+    """
+        A daemon thread that keeps the symbol cache warm for the symbols users are looking at:
+        the most requested symbols of the last `hot_window` seconds and the watchlist.
+        Each cycle reloads the fields that would expire before the next cycle. Once the market has
+        closed the worker makes one more pass and then rests until the next session.
+
+        With a shared cache backend (FINDASH_CACHE_BACKEND=sqlite) every gunicorn worker publishes its
+        request counts and watchlist to the backend each cycle, and only the process holding `leader`
+        refreshes, for the demand of all of them; the others retry the election each cycle, so one
+        takes over when the leader exits. Without one the workers cannot see each other's cache, so
+        each process refreshes its own symbols and there is no election.
+    """
+
+    def __init__(self, cache: Symbol_Cache = symbol_cache, watched: Watchlist = watchlist,
+                 hot_size: int = 20, hot_window: float = 30 * 60, intervals: dict | None = None,
+                 leader: Leader_Lock | None = None) -> None:
+        self._cache = cache
+        self._watchlist = watched
+        self._hot_size = hot_size
+        self._hot_window = hot_window
+        self._intervals = {**SESSION_INTERVALS, **(intervals or {})}
+        self._loaders = []
+        self._requests = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._leader = leader if leader is not None else Leader_Lock("prefetch")
+        self._closed_pass = False
+        self._refreshed = 0
+        self._failed = 0
+
+    def __repr__(self) -> str:
+        return f"Prefetch_Worker(running={self.running}, loaders={len(self._loaders)})"
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def shared(self) -> bool:
+        return self._cache.backend is not None and self._cache.backend.shared
+
+    @property
+    def leading(self) -> bool:
+        return self._leader.held or not self.shared
+
+    def register(self, field: str, loader: Callable[[str], Any], params: tuple = ()) -> None:
+        """
+            Add a field to keep warm.
+            - params:
+                - field (str): The symbol cache field, e.g. info, news or history.
+                - loader (Callable): Takes a symbol and fetches the value from upstream.
+                - params (tuple): The extra key parts the dashboard reads the field with.
+        """
+        self._loaders.append((field, loader, params))
+
+    def record(self, symbol: str) -> None:
+        """
+            Count a dashboard request for a symbol.
+        """
+        now = time.time()
+        symbol = symbol.strip().upper()
+        with self._lock:
+            count, _ = self._requests.get(symbol, (0, now))
+            self._requests[symbol] = (count + 1, now)
+
+    def _local_requests(self) -> dict:
+        cutoff = time.time() - self._hot_window
+        with self._lock:
+            for symbol in [s for s, (_, seen) in self._requests.items() if seen < cutoff]:
+                del self._requests[symbol]
+            return dict(self._requests)
+
+    def _demand(self) -> list:
+        # What the other processes published, empty without a shared backend.
+        if not self.shared:
+            return []
+        own = f"{DEMAND_PREFIX}{os.getpid()}"
+        try:
+            return [value for key, value in self._cache.backend.items(DEMAND_PREFIX) if key != own]
+        except Exception as e:
+            print("Error: ", e)
+            return []
+
+    def publish(self) -> None:
+        """
+            Write this process's request counts and watchlist to the shared backend, for the leader to read.
+            They expire after the hot window, so the demand of an exited worker drops out.
+        """
+        if not self.shared:
+            return
+        demand = {"requests": self._local_requests(), "watched": self._watchlist.symbols}
+        try:
+            self._cache.backend.set(f"{DEMAND_PREFIX}{os.getpid()}", demand, self._hot_window)
+        except Exception as e:
+            print("Error: ", e)
+
+    def hot_symbols(self, demand: list | None = None) -> list:
+        """
+            Return the most requested symbols among those requested within the hot window, counting
+            the requests published by the other processes.
+        """
+        cutoff = time.time() - self._hot_window
+        requests = self._local_requests()
+        for published in (demand if demand is not None else self._demand()):
+            for symbol, (count, seen) in published["requests"].items():
+                if seen < cutoff:
+                    continue
+                total, last = requests.get(symbol, (0, seen))
+                requests[symbol] = (total + count, max(last, seen))
+        ranked = sorted(requests.items(), key=lambda item: item[1], reverse=True)
+        return [symbol for symbol, _ in ranked[:self._hot_size]]
+
+    def watched(self, demand: list | None = None) -> list:
+        """
+            Return the watchlist of this process merged with those published by the other processes.
+        """
+        symbols = set(self._watchlist.symbols)
+        for published in (demand if demand is not None else self._demand()):
+            symbols.update(published["watched"])
+        return sorted(symbols)
+
+    def targets(self) -> list:
+        demand = self._demand()
+        return list(dict.fromkeys(self.hot_symbols(demand) + self.watched(demand)))
+
+    def interval(self, now: pd.Timestamp | None = None) -> float:
+        return self._intervals[market_session(now)]
+
+    def refresh_once(self, horizon: float | None = None) -> int:
+        """
+            Reload every registered field of every target symbol that expires within `horizon` seconds,
+            and the watchlist prices in one batched download.
+            - returns:
+                - int: The number of values reloaded.
+        """
+        horizon = horizon if horizon is not None else self.interval()
+        refreshed = 0
+        watched = self.watched()
+        if watched:
+            result = self._watchlist.fetch("1d", "5d", watched, refresh=True)
+            refreshed += len(result["frames"])
+        for symbol in self.targets():
+            for field, loader, params in self._loaders:
+                if self._stop.is_set():
+                    return refreshed
+                remaining = self._cache.expires_in(symbol, field, params)
+                if remaining is not None and remaining > horizon:
+                    continue
+                try:
+                    value = loader(symbol)
+                except Exception as e:
+                    print("Error: ", e)
+                    self._failed += 1
+                    continue
+                if value is not None:
+                    self._cache.set(symbol, field, value, params)
+                    refreshed += 1
+        self._refreshed += refreshed
+        return refreshed
+
+    def start(self) -> None:
+        if self.running:
+            return
+        if not self.shared:
+            print("Warning: ", "no shared cache backend (FINDASH_CACHE_BACKEND=sqlite), "
+                  "the prefetch worker only warms the cache of its own process")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="prefetch-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def due(self, now: pd.Timestamp | None = None) -> bool:
+        """
+            Whether a cycle at the given time should refresh: always during the regular and extended
+            sessions, and only for the first cycle once the market is closed.
+        """
+        if market_session(now) != "closed":
+            self._closed_pass = False
+            return True
+        if self._closed_pass:
+            return False
+        self._closed_pass = True
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            interval = self.interval()
+            self.publish()
+            leading = self._leader.try_acquire() if self.shared else True
+            if leading and self.due():
+                try:
+                    self.refresh_once(interval)
+                except Exception as e:
+                    print("Error: ", e)
+            self._stop.wait(interval)
+        self._leader.release()
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "leader": self.leading,
+            "shared": self.shared,
+            "session": market_session(),
+            "hot_symbols": len(self.hot_symbols()),
+            "refreshed": self._refreshed,
+            "failed": self._failed,
+        }
+
+
+prefetch_worker = Prefetch_Worker()
+
+
+def prefetch_enabled() -> bool:
+    """
+        Whether the worker should run in this process, set with FINDASH_PREFETCH=1.
+    """
+    return os.getenv("FINDASH_PREFETCH", "0").lower() in ("1", "true", "yes")
@@ -0,0 +1,50 @@
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from Data_Services.Replay_Transport import REPLAY, Replay_Error, Replay_Transport, request_key
+
+
+class Replay_Adapter(HTTPAdapter):
+    """
+        A requests transport adapter that records responses to, or replays them from, a Replay_Transport.
+        Server errors (5xx) are passed through without being recorded.
+    """
+
+    def __init__(self, transport: Replay_Transport, source: str, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._transport = transport
+        self._source = source
+
+    def send(self, request: requests.PreparedRequest, *args, **kwargs) -> requests.Response:
+        key = request_key(request.method, request.url, request.body)
+        if self._transport.mode == REPLAY:
+            try:
+                recorded = self._transport.replay(self._source, key)
+            except Replay_Error as e:
+                raise requests.ConnectionError(str(e), request=request) from e
+            return self._build(request, recorded)
+        response = super().send(request, *args, **kwargs)
+        if response.status_code < 500:
+            self._transport.record(self._source, key, {
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": dict(response.headers),
+                "content": response.content,
+            })
+        return response
+
+    def _build(self, request: requests.PreparedRequest, recorded: dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = recorded["status"]
+        response.reason = recorded["reason"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        # The recorded body is already decoded, so drop the headers that describe the wire format.
+        for header in ("Content-Encoding", "Transfer-Encoding"):
+            response.headers.pop(header, None)
+        response._content = recorded["content"]
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
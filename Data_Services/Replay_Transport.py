@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import pickle
+import random
+import threading
+import time
+from typing import Any, Callable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+LIVE = "live"
+RECORD = "record"
+REPLAY = "replay"
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "replay")
+
+# Query parameters left out of recording keys, so recordings neither hold nor depend on credentials.
+SECRET_PARAMS = ("apikey", "api_key", "token", "crumb")
+
+
+class Replay_Error(ConnectionError):
+    """
+        A failure raised by the replay transport: an injected error or a request that was never recorded.
+        Replay_Adapter raises it to requests callers as a requests.ConnectionError.
+    """
+
+
+class Replay_Miss(Replay_Error):
+    pass
+
+
+def request_key(method: str, url: str, body: bytes | str | None = None) -> str:
+    """
+        Describe an HTTP request independently of its credentials and parameter order.
+    """
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in SECRET_PARAMS)
+    key = f"{method.upper()} {urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))}"
+    if body:
+        key += " " + hashlib.sha1(body if isinstance(body, bytes) else body.encode("utf-8")).hexdigest()
+    return key
+
+
+def call_key(endpoint: str, args: tuple, kwargs: dict) -> str:
+    return f"{endpoint} " + json.dumps([list(args), sorted(kwargs.items())], default=str)
+
+
+class Replay_Store:
+    """
+        Recorded responses on disk, one pickle per request under <directory>/<source>/, named after a
+        hash of the request key. Each file keeps the key next to the value so recordings can be inspected.
+    """
+
+    def __init__(self, directory: str = DEFAULT_DIR) -> None:
+        self._directory = directory
+
+    def __repr__(self) -> str:
+        return f"Replay_Store(directory={self._directory})"
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    def path(self, source: str, key: str) -> str:
+        return os.path.join(self._directory, source, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".pkl")
+
+    def load(self, source: str, key: str) -> tuple | None:
+        """
+            - returns:
+                - tuple | None: (value,) if the request was recorded, None otherwise.
+        """
+        try:
+            with open(self.path(source, key), "rb") as f:
+                record = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print("Error: ", e)
+            return None
+        return (record["value"],)
+
+    def save(self, source: str, key: str, value: Any) -> None:
+        path = self.path(source, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"key": key, "recorded": time.time(), "value": value}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+
+class Replay_Transport:
+    """
+        Switches the upstream fetch paths between the live APIs, recording their responses, and replaying
+        the recordings offline. Replayed requests wait a synthetic latency drawn from `latency` and fail
+        with probability `error_rate`, so load tests see realistic timing without touching the quotas.
+
+        HTTP requests made through requests go through Replay_Adapter; yfinance, which has its own HTTP
+        client, is recorded per function call through call().
+    """
+
+    def __init__(self, mode: str = LIVE, store: Replay_Store | None = None, latency: tuple = (0.0, 0.0),
+                 error_rate: float = 0.0, seed: int | None = None) -> None:
+        if mode not in (LIVE, RECORD, REPLAY):
+            raise ValueError(f"Unknown transport mode: {mode}")
+        self._mode = mode
+        self._store = store if store is not None else Replay_Store()
+        self._latency = latency
+        self._error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts = {"recorded": 0, "replayed": 0, "misses": 0, "injected_errors": 0}
+
+    def __repr__(self) -> str:
+        return (f"Replay_Transport(mode={self._mode}, directory={self._store.directory}, "
+                f"latency={self._latency}, error_rate={self._error_rate})")
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def store(self) -> Replay_Store:
+        return self._store
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def _inject(self, key: str) -> None:
+        with self._lock:
+            delay = self._random.uniform(*self._latency)
+            fail = self._random.random() < self._error_rate
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            self._count("injected_errors")
+            raise Replay_Error(f"Injected error for {key}")
+
+    def replay(self, source: str, key: str) -> Any:
+        """
+            Return the recorded value of a request after the synthetic latency.
+            - raises:
+                - Replay_Error: When an error is injected.
+                - Replay_Miss: When the request was never recorded.
+        """
+        self._inject(key)
+        record = self._store.load(source, key)
+        if record is None:
+            self._count("misses")
+            raise Replay_Miss(f"No recording for {key} in {self._store.directory}")
+        self._count("replayed")
+        return record[0]
+
+    def record(self, source: str, key: str, value: Any) -> None:
+        try:
+            self._store.save(source, key, value)
+            self._count("recorded")
+        except Exception as e:
+            print("Error: ", e)
+
+    def call(self, source: str, endpoint: str, func: Callable, *args, **kwargs) -> Any:
+        """
+            Call a client library function through the transport.
+            - params:
+                - source (str): The upstream, e.g. yfinance.
+                - endpoint (str): The name of the call, part of the recording key with the arguments.
+                - func (Callable): The live call, invoked as func(*args, **kwargs).
+            - returns:
+                - Any: The live, or replayed, return value.
+        """
+        if self._mode == LIVE:
+            return func(*args, **kwargs)
+        key = call_key(endpoint, args, kwargs)
+        if self._mode == REPLAY:
+            return self.replay(source, key)
+        value = func(*args, **kwargs)
+        self.record(source, key, value)
+        return value
+
+    def adapter(self, source: str, **kwargs):
+        """
+            Return the adapter to mount on a requests.Session; kwargs are passed to HTTPAdapter.
+        """
+        # requests is only needed once a session is built, so importing the transport stays cheap.
+        from requests.adapters import HTTPAdapter
+        if self._mode == LIVE:
+            return HTTPAdapter(**kwargs)
+        from Data_Services.Replay_Adapter import Replay_Adapter
+        return Replay_Adapter(self, source, **kwargs)
+
+    def session(self, source: str, **kwargs):
+        import requests
+        session = requests.Session()
+        adapter = self.adapter(source, **kwargs)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"mode": self._mode, **self._counts}
+
+
+def _latency_from_env(value: str) -> tuple:
+    low, _, high = value.partition("-")
+    return float(low), float(high or low)
+
+
+def transport_from_env() -> Replay_Transport:
+    """
+        Build the transport named by FINDASH_TRANSPORT: live (the default), record or replay. Recordings
+        live in FINDASH_REPLAY_DIR; FINDASH_REPLAY_LATENCY takes seconds, fixed ("0.2") or a range
+        ("0.05-0.4"), and FINDASH_REPLAY_ERROR_RATE the share of replayed requests that fail.
+    """
+    seed = os.getenv("FINDASH_REPLAY_SEED")
+    return Replay_Transport(
+        mode=os.getenv("FINDASH_TRANSPORT", LIVE).lower(),
+        store=Replay_Store(os.getenv("FINDASH_REPLAY_DIR", DEFAULT_DIR)),
+        latency=_latency_from_env(os.getenv("FINDASH_REPLAY_LATENCY", "0")),
+        error_rate=float(os.getenv("FINDASH_REPLAY_ERROR_RATE", 0)),
+        seed=int(seed) if seed else None,
+    )
+
+
+transport = transport_from_env()
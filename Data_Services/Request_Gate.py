@@ -0,0 +1,79 @@
+import threading
+from collections import OrderedDict
+from Data_Services.Cache_Backend import Cache_Backend
+from Data_Services.Symbol_Cache import symbol_cache
+
+
+# Backend keys holding the latest token of each client, followed by the client id.
+TOKEN_PREFIX = "gate\x1ftoken\x1f"
+
+
+class Request_Gate:
+    """
+        Tracks the latest submitted request token of each browser session, so work started for
+        input the user has already replaced can be dropped before and after the upstream fetch.
+
+        Consecutive requests of one session may reach different gunicorn workers, so with a shared
+        backend (FINDASH_CACHE_BACKEND=sqlite) the latest token is also kept there, for `ttl` seconds
+        after the session last submitted. The read and the write are not one transaction: two workers
+        registering tokens of the same client at once may both proceed, which only costs a fetch.
+        Without a shared backend the gate only sees the requests of its own process.
+    """
+
+    def __init__(self, backend: Cache_Backend | None = None, max_clients: int = 10_000, ttl: float = 60 * 60) -> None:
+        self._latest = OrderedDict()
+        self._backend = backend if backend is not None and backend.shared else None
+        self._max_clients = max_clients
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._dropped = 0
+
+    def __repr__(self) -> str:
+        return f"Request_Gate(clients={len(self._latest)}, shared={self._backend is not None})"
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    def is_current(self, client: str | None, token: int | None) -> bool:
+        """
+            Register the token if it is the newest seen for the client and report whether it still is.
+            - params:
+                - client (str): The browser session id, None for callers that are not tracked.
+                - token (int): The submit counter of the request.
+            - returns:
+                - bool: False if the client has submitted a newer request since.
+        """
+        if client is None or token is None:
+            return True
+        shared = self._shared_latest(client, token)
+        with self._lock:
+            latest = max(self._latest.get(client, -1), shared)
+            if token > latest:
+                latest = token
+            self._latest[client] = latest
+            self._latest.move_to_end(client)
+            while len(self._latest) > self._max_clients:
+                self._latest.popitem(last=False)
+            if token < latest:
+                self._dropped += 1
+                return False
+            return True
+
+    def _shared_latest(self, client: str, token: int) -> int:
+        # The newest token any worker has registered for the client, after registering this one.
+        if self._backend is None:
+            return -1
+        key = TOKEN_PREFIX + client
+        try:
+            entry = self._backend.get(key)
+            latest = entry[0] if entry is not None else -1
+            if token > latest:
+                self._backend.set(key, token, self._ttl)
+            return latest
+        except Exception as e:
+            print("Error: ", e)
+            return -1
+
+
+request_gate = Request_Gate(symbol_cache.backend)
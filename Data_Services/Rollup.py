@@ -0,0 +1,159 @@
+import time
+import pandas as pd
+from Data_Services.Bar_Store import COLUMN_ALIASES, Bar_Store, bar_store, flatten_columns, normalize_interval
+from Data_Services.Replay_Transport import transport
+
+
+EXCHANGE_TZ = "America/New_York"
+
+AGGREGATIONS = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+# Each level is built from the level before it, so one pass over the 1m bars feeds a cascade
+# of ever smaller frames. Hourly buckets start at :30 to line up with the 09:30 open, as on Yahoo.
+LEVELS = {
+    "5m": ("1m", "5min", None),
+    "15m": ("5m", "15min", None),
+    "30m": ("15m", "30min", None),
+    "1h": ("30m", "1h", "30min"),
+    "4h": ("1h", "4h", "30min"),
+    "1d": ("1h", "1D", None),
+    "1wk": ("1d", "W-MON", None),
+    "1mo": ("1d", "MS", None),
+}
+
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+
+def resample_ohlcv(data: pd.DataFrame, rule: str, offset: str | None = None, tz: str = EXCHANGE_TZ) -> pd.DataFrame:
+    """
+        Aggregate OHLCV bars into larger buckets.
+        - params:
+            - data (pd.DataFrame): Bars on a DatetimeIndex, with yfinance or Alpha Vantage column names.
+            - rule (str): The pandas offset of the new buckets, e.g. 5min, 1h, 1D, W-MON, MS.
+            - offset (str): Shift of the bucket edges, e.g. 30min for hourly bars starting at 09:30.
+            - tz (str): The timezone used to cut days, weeks and months for tz-aware data.
+        - returns:
+            - pd.DataFrame: One row per non-empty bucket, labelled by the bucket start.
+    """
+    aggregations = {}
+    for column in data.columns:
+        name = COLUMN_ALIASES.get(str(column).lower(), column)
+        if name in AGGREGATIONS:
+            aggregations[column] = AGGREGATIONS[name]
+    original_tz = data.index.tz
+    frame = data.tz_convert(tz) if original_tz is not None else data
+    resampled = frame.resample(rule, offset=offset, closed="left", label="left").agg(aggregations)
+    open_column = next((c for c, how in aggregations.items() if how == "first"), None)
+    if open_column is not None:
+        resampled = resampled[resampled[open_column].notna()]
+    return resampled.tz_convert(original_tz) if original_tz is not None else resampled
+
+
+def period_start(period: str, now: pd.Timestamp | None = None) -> pd.Timestamp | None:
+    """
+        Return the first timestamp covered by a yfinance period, None for "max".
+    """
+    now = now if now is not None else pd.Timestamp.now(tz=EXCHANGE_TZ)
+    if period == "ytd":
+        return now.normalize().replace(month=1, day=1)
+    if period not in PERIOD_OFFSETS:
+        return None
+    return now - PERIOD_OFFSETS[period]
+
+
+class Rollup_Engine:
+    def __init__(self, store: Bar_Store = bar_store, freshness: float = 120.0) -> None:
+        self._store = store
+        self._freshness = freshness
+
+    def __repr__(self) -> str:
+        return f"Rollup_Engine(store={self._store!r}, freshness={self._freshness})"
+
+    @property
+    def store(self) -> Bar_Store:
+        return self._store
+
+    def build(self, bars: pd.DataFrame) -> dict:
+        """
+            Build every level of the pyramid from 1m bars in one cascade.
+            - params:
+                - bars (pd.DataFrame): 1m OHLCV bars.
+            - returns:
+                - dict: The bars of each level, keyed by interval.
+        """
+        built = {"1m": bars}
+        for interval, (source, rule, offset) in LEVELS.items():
+            built[interval] = resample_ohlcv(built[source], rule, offset)
+        return built
+
+    def ingest(self, symbol: str, bars: pd.DataFrame) -> int:
+        """
+            Store new 1m bars and bring every level up to date.
+            - returns:
+                - int: The number of 1m rows written.
+        """
+        rows = self._store.append(symbol, "1m", bars)
+        self.update(symbol)
+        return rows
+
+    def update(self, symbol: str) -> None:
+        """
+            Recompute each level from the start of its last stored bucket, which may have been partial,
+            so only the tail of the pyramid is rebuilt.
+        """
+        for interval, (source, rule, offset) in LEVELS.items():
+            last = self._store.last_timestamp(symbol, interval)
+            bars = self._store.read(symbol, source, start=last)
+            if bars is None:
+                continue
+            self._store.append(symbol, interval, resample_ohlcv(bars, rule, offset))
+
+    def sync(self, symbol: str, period: str | None = None) -> int:
+        """
+            Download recent 1m bars from yfinance and ingest them. Without a period, the first sync
+            fetches the 7 days Yahoo keeps at 1m resolution and later syncs fetch the last day.
+        """
+        import yfinance as yf
+        if period is None:
+            period = "1d" if self._store.last_timestamp(symbol, "1m") is not None else "7d"
+        bars = flatten_columns(
+            transport.call("yfinance", "download", yf.download, symbol, interval="1m", period=period, progress=False))
+        if bars is None or bars.empty:
+            return 0
+        return self.ingest(symbol, bars)
+
+    def read(self, symbol: str, interval: str, period: str) -> pd.DataFrame | None:
+        """
+            Serve bars from the pyramid when it is fresh and covers the whole period.
+            - params:
+                - symbol (str): The stock symbol.
+                - interval (str): The dashboard interval (1m, 5m, ..., 1mo).
+                - period (str): The dashboard period (1d, 5d, ..., ytd). "max" is never served locally.
+            - returns:
+                - pd.DataFrame | None: The bars in the exchange timezone, or None to fetch from the network.
+        """
+        interval = normalize_interval(interval)
+        if interval != "1m" and interval not in LEVELS:
+            return None
+        synced_at = self._store.synced_at(symbol, "1m")
+        if synced_at is None or time.time() - synced_at > self._freshness:
+            return None
+        start = period_start(period)
+        first = self._store.first_timestamp(symbol, interval)
+        if start is None or first is None or first > start:
+            return None
+        bars = self._store.read(symbol, interval, start=start)
+        return bars.tz_convert(EXCHANGE_TZ) if bars is not None else None
+
+
+rollup_engine = Rollup_Engine()
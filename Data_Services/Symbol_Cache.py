@@ -0,0 +1,247 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+from Data_Services.Cache_Backend import Cache_Backend, backend_from_env
+
+
+# Default time-to-live (seconds) for each field cached per symbol.
+DEFAULT_TTLS = {
+    "info": 6 * 60 * 60,
+    "news": 15 * 60,
+    "recommendations": 6 * 60 * 60,
+    "history": 60,
+    "economic": 12 * 60 * 60,
+    "overview": 6 * 60 * 60,
+}
+
+
+class _Inflight:
+    """
+        A fetch that is currently running for a cache key. Callers that ask for
+        the same key while it runs wait on the event and share the result.
+    """
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class Symbol_Cache:
+    """
+        An in-process LRU with per-field TTLs. With a backend, misses are looked up in the backend
+        before calling the loader and loaded values are written to it, so processes sharing the
+        backend share fetches.
+    """
+
+    def __init__(self, ttls: dict | None = None, max_entries: int = 512, backend: Cache_Backend | None = None) -> None:
+        self._ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._max_entries = max_entries
+        self._backend = backend
+        self._shared_hits = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+
+    def __repr__(self) -> str:
+        return f"Symbol_Cache(entries={len(self._entries)}, max_entries={self._max_entries})"
+
+    @property
+    def ttls(self) -> dict:
+        return self._ttls
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries
+
+    @property
+    def backend(self) -> Cache_Backend | None:
+        return self._backend
+
+    @staticmethod
+    def make_key(symbol: str, field: str, params: tuple = ()) -> tuple:
+        return (symbol.strip().upper(), field, params)
+
+    @staticmethod
+    def backend_key(symbol: str, field: str | None = None, params: tuple | None = None) -> str:
+        """
+            Return the backend key of a cache key, or the prefix of all its keys when field or params is None.
+        """
+        key = symbol.strip().upper() + "\x1f"
+        if field is not None:
+            key += field + "\x1f"
+            if params is not None:
+                key += repr(params)
+        return key
+
+    def get(self, symbol: str, field: str, loader: Callable[[], Any], params: tuple = ()) -> Any:
+        """
+            Return the cached value for (symbol, field, params), calling loader on a miss.
+            Concurrent misses for the same key share a single call to loader.
+            - params:
+                - symbol (str): The stock symbol.
+                - field (str): The field name, used to pick the TTL (info, news, recommendations, history).
+                - loader (Callable): Fetches the value from upstream.
+                - params (tuple): Extra key parts, e.g. (interval, period).
+            - returns:
+                - Any: The cached or freshly loaded value. None results are not cached.
+        """
+        key = self.make_key(symbol, field, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1]
+            call = self._inflight.get(key)
+            if call is not None:
+                self._coalesced += 1
+                leader = False
+            else:
+                self._misses += 1
+                call = _Inflight()
+                self._inflight[key] = call
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            shared = self._backend_get(key)
+            if shared is not None:
+                call.value, remaining = shared
+                self._store(key, call.value, ttl=remaining)
+                return call.value
+            call.value = loader()
+            if call.value is not None:
+                self._store(key, call.value)
+                self._backend_set(key, call.value)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.event.set()
+        return call.value
+
+    def set(self, symbol: str, field: str, value: Any, params: tuple = ()) -> None:
+        key = self.make_key(symbol, field, params)
+        self._store(key, value)
+        self._backend_set(key, value)
+
+    def _backend_get(self, key: tuple) -> tuple | None:
+        if self._backend is None:
+            return None
+        try:
+            shared = self._backend.get(self.backend_key(*key))
+        except Exception as e:
+            print("Error: ", e)
+            return None
+        if shared is not None:
+            with self._lock:
+                self._shared_hits += 1
+        return shared
+
+    def _backend_set(self, key: tuple, value: Any) -> None:
+        if self._backend is None:
+            return
+        try:
+            self._backend.set(self.backend_key(*key), value, self._ttls.get(key[1], 60))
+        except Exception as e:
+            print("Error: ", e)
+
+    def lookup(self, symbol: str, field: str, params: tuple = ()) -> Any:
+        """
+            Return the fresh value cached in this process or in the backend, None on a miss, without
+            calling a loader. Counted like get(), for callers that load many misses in one batch.
+        """
+        key = self.make_key(symbol, field, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+        shared = self._backend_get(key)
+        if shared is None:
+            return None
+        self._store(key, shared[0], ttl=shared[1])
+        return shared[0]
+
+    def peek(self, symbol: str, field: str, params: tuple = ()) -> Any:
+        """
+            Return the cached value without loading it or touching the counters.
+        """
+        key = self.make_key(symbol, field, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+        return None
+
+    def expires_in(self, symbol: str, field: str, params: tuple = ()) -> float | None:
+        """
+            Return the seconds until the cached value expires, None if nothing fresh is cached.
+        """
+        key = self.make_key(symbol, field, params)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        remaining = entry[0] - time.monotonic()
+        return remaining if remaining > 0 else None
+
+    def invalidate(self, symbol: str, field: str | None = None) -> None:
+        symbol = symbol.strip().upper()
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == symbol and (field is None or k[1] == field)]:
+                del self._entries[key]
+        if self._backend is not None:
+            self._backend.delete_prefix(self.backend_key(symbol, field))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self._backend is not None:
+            self._backend.clear()
+
+    def stats(self) -> dict:
+        """
+            Return the hit/miss counters of the cache.
+            - returns:
+                - dict: hits, misses, coalesced (callers that waited on an in-flight fetch),
+                  shared_hits (misses served by the backend), evictions, entries and hit_ratio.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses + self._coalesced
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "shared_hits": self._shared_hits,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "hit_ratio": (self._hits + self._coalesced) / lookups if lookups else 0.0,
+            }
+
+    def _store(self, key: tuple, value: Any, ttl: float | None = None) -> None:
+        expires = time.monotonic() + (ttl if ttl is not None else self._ttls.get(key[1], 60))
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+
+symbol_cache = Symbol_Cache(backend=backend_from_env())
@@ -0,0 +1,253 @@
+import bisect
+import difflib
+import csv
+import os
+import re
+import threading
+import pandas as pd
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+UNIVERSE_PATH = os.path.join(ROOT, "companies.xlsx")
+
+LISTINGS_PATH = os.getenv("FINDASH_LISTINGS", os.path.join(ROOT, "data", "listings.csv"))
+
+# Names learned from Yahoo's search and Ticker.info, kept across restarts.
+LEARNED_PATH = os.getenv("FINDASH_LEARNED_NAMES", os.path.join(ROOT, "data", "learned_names.csv"))
+
+# Input that could be a ticker (MSFT, brk.b, BF-B) is used as one; only other input is resolved by name.
+TICKER_PATTERN = re.compile(r"^[A-Za-z]{1,5}([.-][A-Za-z]{1,2})?$")
+
+# Endings dropped from company names, so "apple" matches "Apple Inc.".
+NAME_SUFFIXES = re.compile(
+    r"(,?\s+(inc\.?|incorporated|corp\.?|corporation|co\.?|company|plc|ltd\.?|limited|n\.v\.|"
+    r"holdings?|group|class [a-c]))+$")
+
+# Column names used by common listings files (NASDAQ, Alpha Vantage LISTING_STATUS, spreadsheets).
+TICKER_COLUMNS = ("symbol", "ticker", "act symbol")
+NAME_COLUMNS = ("name", "security name", "company name", "company")
+
+
+def is_ticker_like(query: str) -> bool:
+    return bool(TICKER_PATTERN.match(query.strip()))
+
+
+def short_name(name: str) -> str:
+    """
+        Return the lower-case company name without a leading "the" and corporate endings.
+    """
+    name = name.strip().lower()
+    if name.startswith("the "):
+        name = name[4:]
+    return NAME_SUFFIXES.sub("", name).strip()
+
+
+def _column(frame: pd.DataFrame, candidates: tuple) -> str | None:
+    lowered = {str(column).strip().lower(): column for column in frame.columns}
+    return next((lowered[name] for name in candidates if name in lowered), None)
+
+
+class Symbol_Index:
+    """
+        Tickers and company names kept in sorted lists, so prefix lookups are binary searches and
+        name-to-ticker resolution needs no network. The listings files are read on first use, not when
+        the index is created, so importing the dashboard stays fast.
+
+        Names come from the shipped listings (data/listings.csv) and from names learned from Yahoo,
+        which are appended to `learned_path`.
+    """
+
+    def __init__(self, universe_path: str = UNIVERSE_PATH, listings_path: str = LISTINGS_PATH,
+                 learned_path: str = LEARNED_PATH) -> None:
+        self._names = {}
+        self._aliases = {}
+        self._lock = threading.Lock()
+        self._tickers = []
+        self._name_keys = []
+        self._learned_path = learned_path
+        self._paths = (universe_path, listings_path, learned_path)
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"Symbol_Index(symbols={len(self._names)})"
+
+    def __len__(self) -> int:
+        self._load()
+        return len(self._names)
+
+    def __contains__(self, ticker: str) -> bool:
+        self._load()
+        return ticker.strip().upper() in self._names
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            for path in self._paths:
+                if path and os.path.exists(path):
+                    self.refresh(path)
+            self._loaded = True
+
+    def name(self, ticker: str) -> str | None:
+        self._load()
+        return self._names.get(ticker.strip().upper())
+
+    def refresh(self, path: str) -> int:
+        """
+            Add the tickers and names of a listings file (.csv or .xlsx).
+            - returns:
+                - int: The number of rows read.
+        """
+        try:
+            frame = pd.read_excel(path) if path.endswith((".xlsx", ".xls")) else pd.read_csv(path)
+        except Exception as e:
+            print("Error: ", e)
+            return 0
+        ticker_column = _column(frame, TICKER_COLUMNS)
+        if ticker_column is None:
+            return 0
+        name_column = _column(frame, NAME_COLUMNS)
+        names = frame[name_column] if name_column is not None else pd.Series(None, index=frame.index)
+        self.add_many(zip(frame[ticker_column], names))
+        return len(frame)
+
+    def add(self, ticker: str, name: str | None = None) -> None:
+        self.add_many([(ticker, name)])
+
+    def learn(self, ticker: str, name: str | None) -> None:
+        """
+            Add a name found on Yahoo, and keep it in the learned names file if it is new.
+        """
+        if not isinstance(ticker, str) or not ticker.strip() or not isinstance(name, str) or not name.strip():
+            return
+        ticker, name = ticker.strip().upper(), name.strip()
+        self._load()
+        if self._names.get(ticker) == name:
+            return
+        self.add(ticker, name)
+        if not self._learned_path:
+            return
+        try:
+            with self._lock:
+                new_file = not os.path.exists(self._learned_path)
+                os.makedirs(os.path.dirname(os.path.abspath(self._learned_path)), exist_ok=True)
+                with open(self._learned_path, "a", newline="") as f:
+                    writer = csv.writer(f)
+                    if new_file:
+                        writer.writerow(["symbol", "name"])
+                    writer.writerow([ticker, name])
+        except OSError as e:
+            print("Error: ", e)
+
+    def alias(self, query: str, ticker: str) -> None:
+        """
+            Remember that a query which looked like a ticker turned out to be the name of `ticker`.
+        """
+        with self._lock:
+            self._aliases[query.strip().lower()] = ticker.strip().upper()
+
+    def add_many(self, entries) -> None:
+        with self._lock:
+            for ticker, name in entries:
+                if not isinstance(ticker, str) or not ticker.strip():
+                    continue
+                ticker = ticker.strip().upper()
+                if isinstance(name, str) and name.strip():
+                    self._names[ticker] = name.strip()
+                else:
+                    self._names.setdefault(ticker, None)
+            self._tickers = sorted(self._names)
+            self._name_keys = sorted({(key, ticker) for ticker, name in self._names.items() if name
+                                      for key in (name.lower(), short_name(name)) if key})
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """
+            Suggest symbols for a partial ticker or company name.
+            - params:
+                - query (str): What the user typed.
+                - limit (int): The number of suggestions.
+            - returns:
+                - list: (ticker, name) tuples: ticker prefix matches first, then name prefix matches,
+                  then close matches for misspellings.
+        """
+        query = query.strip()
+        if not query:
+            return []
+        self._load()
+        tickers, name_keys = self._tickers, self._name_keys
+        found = []
+        upper = query.upper()
+        start = bisect.bisect_left(tickers, upper)
+        for ticker in tickers[start:]:
+            if not ticker.startswith(upper) or len(found) >= limit:
+                break
+            found.append(ticker)
+        lower = query.lower()
+        start = bisect.bisect_left(name_keys, (lower,))
+        for name, ticker in name_keys[start:]:
+            if not name.startswith(lower) or len(found) >= limit:
+                break
+            if ticker not in found:
+                found.append(ticker)
+        if len(found) < limit:
+            names = {name: ticker for name, ticker in name_keys}
+            for match in difflib.get_close_matches(lower, list(names), n=limit, cutoff=0.6):
+                if names[match] not in found and len(found) < limit:
+                    found.append(names[match])
+        return [(ticker, self._names.get(ticker)) for ticker in found]
+
+    def resolve(self, query: str) -> str | None:
+        """
+            Turn what the user submitted into a ticker, without guessing for input that could itself
+            be a ticker: those are only resolved by name after their download came back empty
+            (see lookup_name and alias).
+            - returns:
+                - str | None: The ticker if the query is a known ticker or alias, or, for input that is
+                  not ticker-like, a company name, the start of exactly one name or a close spelling
+                  of one; None otherwise.
+        """
+        query = query.strip()
+        if not query:
+            return None
+        self._load()
+        if query.upper() in self._names:
+            return query.upper()
+        if query.lower() in self._aliases:
+            return self._aliases[query.lower()]
+        if is_ticker_like(query):
+            return None
+        return self.lookup_name(query)
+
+    def lookup_name(self, query: str) -> str | None:
+        """
+            Find the ticker of a company name, its start or a close spelling, whatever the input looks like.
+            - returns:
+                - str | None: The ticker, or None if no name matches or the start matches several companies.
+        """
+        query = query.strip()
+        if not query:
+            return None
+        self._load()
+        lower = query.lower()
+        name_keys = self._name_keys
+        start = bisect.bisect_left(name_keys, (lower,))
+        prefixed = []
+        for name, ticker in name_keys[start:]:
+            if not name.startswith(lower):
+                break
+            if name == lower:
+                return ticker
+            prefixed.append(ticker)
+        if len(set(prefixed)) == 1:
+            return prefixed[0]
+        matches = difflib.get_close_matches(lower, [name for name, _ in name_keys], n=1, cutoff=0.85)
+        if matches:
+            return name_keys[bisect.bisect_left(name_keys, (matches[0],))][1]
+        return None
+
+
+symbol_index = Symbol_Index()
@@ -0,0 +1,107 @@
+import threading
+import time
+import pandas as pd
+from Data_Services.Bar_Store import Bar_Store, bar_store
+from Data_Services.Metrics import upstream
+from Data_Services.Replay_Transport import transport
+from Data_Services.Symbol_Cache import Symbol_Cache, symbol_cache
+
+
+class Watchlist:
+    """
+        The symbols watched by any dashboard session. Sessions keep their own list in the browser
+        and report it with touch(); symbols nobody has reported for `expiry` seconds drop out.
+    """
+
+    def __init__(self, cache: Symbol_Cache = symbol_cache, store: Bar_Store = bar_store,
+                 batch_size: int = 100, expiry: float = 24 * 60 * 60) -> None:
+        self._cache = cache
+        self._store = store
+        self._batch_size = batch_size
+        self._expiry = expiry
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"Watchlist(symbols={self.symbols})"
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol.strip().upper() in self.symbols
+
+    @property
+    def symbols(self) -> list:
+        now = time.time()
+        with self._lock:
+            for symbol in [s for s, seen in self._seen.items() if now - seen > self._expiry]:
+                del self._seen[symbol]
+            return sorted(self._seen)
+
+    def touch(self, symbols: list) -> None:
+        now = time.time()
+        with self._lock:
+            for symbol in symbols:
+                self._seen[symbol.strip().upper()] = now
+
+    def fetch(self, interval: str, period: str, symbols: list | None = None, refresh: bool = False) -> dict:
+        """
+            Return bars for many symbols: fresh frames come from the symbol cache, the rest are downloaded
+            with one yf.download call per batch and cached under the same key get_stock_data uses.
+            - params:
+                - interval (str): The bar interval.
+                - period (str): The period to download.
+                - symbols (list): The symbols to fetch, defaults to the whole watchlist.
+                - refresh (bool): Download every symbol, even those with fresh frames cached.
+            - returns:
+                - dict: "frames" maps each symbol to its bars, "errors" maps failed symbols to a message.
+        """
+        symbols = sorted({s.strip().upper() for s in (symbols if symbols is not None else self.symbols)})
+        frames, errors = {}, {}
+        missing = []
+        for symbol in symbols:
+            cached = None if refresh else self._cache.lookup(symbol, "history", params=(interval, period))
+            if cached is not None:
+                frames[symbol] = cached
+            else:
+                missing.append(symbol)
+        if not missing:
+            return {"frames": frames, "errors": errors}
+        import yfinance as yf
+        for i in range(0, len(missing), self._batch_size):
+            batch = missing[i:i + self._batch_size]
+            try:
+                with upstream("yfinance", "download_batch"):
+                    data = transport.call("yfinance", "download", yf.download, batch, interval=interval,
+                                          period=period, group_by="ticker", threads=True, progress=False)
+            except Exception as e:
+                errors.update({symbol: str(e) for symbol in batch})
+                continue
+            for symbol in batch:
+                frame = self._split(data, symbol)
+                if frame is None:
+                    errors[symbol] = "No data found"
+                    continue
+                frames[symbol] = frame
+                self._cache.set(symbol, "history", frame, params=(interval, period))
+                try:
+                    self._store.append(symbol, interval, frame)
+                except Exception as e:
+                    print("Error: ", e)
+        return {"frames": frames, "errors": errors}
+
+    @staticmethod
+    def _split(data: pd.DataFrame, symbol: str) -> pd.DataFrame | None:
+        # yf.download leaves a failed symbol's columns all NaN (or out of the frame), so failures are
+        # read from the frame itself rather than from yfinance's internal error registry.
+        if data is None or data.empty:
+            return None
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                return None
+            data = data[symbol]
+        frame = data.dropna(how="all")
+        if frame.empty or ("Close" in frame.columns and frame["Close"].isna().all()):
+            return None
+        return frame
+
+
+watchlist = Watchlist()
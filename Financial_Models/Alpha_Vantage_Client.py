@@ -0,0 +1,129 @@
+import threading
+import requests
+from urllib3.util.retry import Retry
+from Financial_Models.Request_Scheduler import INTERACTIVE, Request_Scheduler, Throttled_Error, get_scheduler, is_throttled
+from Data_Services.Metrics import upstream
+from Data_Services.Replay_Transport import transport
+
+
+class Alpha_Vantage_Client:
+    BASE_URL = "https://www.alphavantage.co/query"
+
+    def __init__(self, timeout: float = 10.0, retries: int = 3, backoff_factor: float = 0.5, pool_size: int = 10,
+                 scheduler: Request_Scheduler | None = None) -> None:
+        self._timeout = timeout
+        self._scheduler = scheduler if scheduler is not None else get_scheduler()
+        self._session = requests.Session()
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=("GET",),
+            raise_on_status=False,
+        )
+        adapter = transport.adapter("alpha_vantage", pool_connections=pool_size, pool_maxsize=pool_size,
+                                    max_retries=retry)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def __repr__(self) -> str:
+        return f"Alpha_Vantage_Client(timeout={self._timeout})"
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session
+
+    @property
+    def scheduler(self) -> Request_Scheduler:
+        return self._scheduler
+
+    @property
+    def timeout(self) -> float:
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, timeout: float) -> None:
+        self._timeout = timeout
+
+    def get(self, params: dict) -> requests.Response | None:
+        """
+            Issue a single GET request against the Alpha Vantage query endpoint.
+            - params:
+                - params (dict): The query parameters, including function and apikey.
+            - returns:
+                - requests.Response | None: The response, or None if the request failed.
+        """
+        try:
+            return self._session.get(self.BASE_URL, params=params, timeout=self._timeout)
+        except requests.RequestException as e:
+            print("Error: ", e)
+            return None
+
+    def get_json(self, params: dict, priority: int = INTERACTIVE) -> dict | None:
+        """
+            Get the parsed JSON body for the given query, queued through the quota scheduler.
+            - params:
+                - params (dict): The query parameters, including function and apikey.
+                - priority (int): The scheduler priority class (INTERACTIVE or BACKGROUND).
+            - returns:
+                - dict | None: The parsed body, or None if the request failed or stayed throttled.
+        """
+        return self._schedule(lambda: self._fetch_json(params), priority)
+
+    def get_text(self, params: dict, priority: int = INTERACTIVE) -> str | None:
+        """
+            Get the decoded body for the given query, for CSV endpoints such as EARNINGS_CALENDAR.
+            - params:
+                - params (dict): The query parameters, including function and apikey.
+                - priority (int): The scheduler priority class (INTERACTIVE or BACKGROUND).
+            - returns:
+                - str | None: The decoded body, or None if the request failed or stayed throttled.
+        """
+        return self._schedule(lambda: self._fetch_text(params), priority)
+
+    def _schedule(self, fetch, priority: int):
+        try:
+            return self._scheduler.call(fetch, priority)
+        except Throttled_Error as e:
+            print("Error: ", e)
+            return None
+
+    def _fetch_json(self, params: dict) -> dict | None:
+        with upstream("alpha_vantage", params.get("function", "")) as outcome:
+            r = self.get(params)
+            if r is None or r.status_code != 200:
+                outcome["outcome"] = "error"
+                return None
+            try:
+                data = r.json()
+            except ValueError as e:
+                print("Error: ", e)
+                outcome["outcome"] = "error"
+                return None
+            if is_throttled(data):
+                outcome["outcome"] = "throttled"
+            return data
+
+    def _fetch_text(self, params: dict) -> str | None:
+        with upstream("alpha_vantage", params.get("function", "")) as outcome:
+            r = self.get(params)
+            if r is None or r.status_code != 200:
+                outcome["outcome"] = "error"
+                return None
+            return r.content.decode("utf-8")
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> Alpha_Vantage_Client:
+    """
+        Return the process-wide client, so every model shares one connection pool.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = Alpha_Vantage_Client()
+    return _client
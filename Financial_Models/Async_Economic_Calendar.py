@@ -0,0 +1,48 @@
+import asyncio
+from typing import NamedTuple
+import pandas as pd
+from Financial_Models.Economic_Calendar import Economic_Calendar
+
+
+class Economic_Series(NamedTuple):
+    real_gdp: pd.DataFrame | None
+    gdp_per_capita: pd.DataFrame | None
+    cpi: pd.DataFrame | None
+    retail_sales: pd.DataFrame | None
+    unemployment_rate: pd.DataFrame | None
+    nonfarm_payroll: pd.DataFrame | None
+
+
+class Async_Economic_Calendar(Economic_Calendar):
+    """
+        Economic_Calendar with a get_all() that requests every series at once. Requests still go
+        through the shared client, so the quota scheduler decides how many leave per minute.
+    """
+
+    def __repr__(self) -> str:
+        return f"Async_Economic_Calendar(api_key={self._api_key})"
+
+    async def get_all(self) -> Economic_Series:
+        """
+            Fetch every series in self.functions concurrently through get_series, so they are parsed and
+            cached like the series the dashboard reads one at a time.
+            - returns:
+                - Economic_Series: The parsed series in the order of self.functions, None for any that failed.
+        """
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self.get_series, name) for name in self.functions),
+            return_exceptions=True,
+        )
+        series = []
+        for name, result in zip(self.functions, results):
+            if isinstance(result, Exception):
+                print("Error: ", name, result)
+                result = None
+            series.append(result)
+        return Economic_Series(*series)
+
+    def fetch_all(self) -> Economic_Series:
+        """
+            Run get_all() from synchronous code such as a Dash callback.
+        """
+        return asyncio.run(self.get_all())
@@ -1,16 +1,48 @@
-import requests
 import pandas as pd
 import os
 import dotenv
 import json
+from Financial_Models.Alpha_Vantage_Client import get_client
+from Financial_Models.Request_Scheduler import INTERACTIVE
+from Data_Services.Symbol_Cache import symbol_cache
+from Data_Services.Metrics import timed
+
+
+# Interval each series is requested with when the caller gives none, so every path shares one cache entry.
+DEFAULT_INTERVALS = {
+    "Real GDP": "annual",
+    "Consumer Price Index": "monthly",
+}
+
+
+def parse_series(payload: dict | None) -> pd.DataFrame | None:
+    """
+        Parse an Alpha Vantage economic indicator response into a frame.
+        - params:
+            - payload (dict): The JSON body, with a "data" list of {"date", "value"} records.
+        - returns:
+            - pd.DataFrame | None: A float64 "value" column on a sorted DatetimeIndex named "date";
+              missing values (".") become NaN.
+    """
+    if not payload or not payload.get("data"):
+        return None
+    records = pd.DataFrame(payload["data"])
+    series = pd.DataFrame(
+        {"value": pd.to_numeric(records["value"], errors="coerce").astype("float64").to_numpy()},
+        index=pd.DatetimeIndex(pd.to_datetime(records["date"]), name="date"),
+    )
+    series.attrs = {key: payload[key] for key in ("name", "interval", "unit") if key in payload}
+    return series.sort_index()
 
 
 class Economic_Calendar:
-    def __init__(self) -> None:
+    def __init__(self, priority: int = INTERACTIVE) -> None:
         try:
+            self._priority = priority
             dotenv.load_dotenv()
             self._api_key = os.environ["ALPHA_VANTAGE_API_KEY"]
             self.BASE_URL = "https://www.alphavantage.co/query?"
+            self._client = get_client()
             self.functions = {
                 "Real GDP": "REAL_GDP",
                 "Real GDP per capita": "REAL_GDP_PER_CAPITA",
@@ -58,67 +90,85 @@ class Economic_Calendar:
             - returns:
                 - dict | pd.DataFrame: The filtered data.
         """
-        if output_format == "dataframe":
-            return data.loc[(data["date"] >= from_period) & (data["date"] <= to_period)]
-        elif output_format == "dict":
-            return data.loc[(data["date"] >= from_period) & (data["date"] <= to_period)].to_dict()
-        else:
+        if output_format not in ("dataframe", "dict"):
             return None
+        if not isinstance(data.index, pd.DatetimeIndex):
+            # frames with a "date" column, as the getters used to return
+            data = data.assign(date=pd.to_datetime(data["date"])).set_index("date")
+        if not data.index.is_monotonic_increasing:
+            data = data.sort_index()
+        # a label slice on a sorted index is a binary search, not a scan
+        filtered = data.loc[pd.Timestamp(from_period):pd.Timestamp(to_period)]
+        return filtered if output_format == "dataframe" else filtered.to_dict()
+
+    @timed("Economic_Calendar.get_series")
+    def get_series(self, name: str, interval: str | None = None) -> pd.DataFrame | None:
+        """
+            Get an economic series parsed into a frame, cached so the dashboard and notebooks share one parse.
+            - params:
+                - name (str): A key of self.functions, e.g. "Consumer Price Index".
+                - interval (str): The interval for series that accept one (Real GDP, Consumer Price Index),
+                  defaults to DEFAULT_INTERVALS.
+            - returns:
+                - pd.DataFrame | None: See parse_series.
+        """
+        function = self.functions[name]
+        interval = interval or DEFAULT_INTERVALS.get(name)
+        params = {"function": function, "apikey": self.api_key}
+        if interval is not None:
+            params["interval"] = interval
+        return symbol_cache.get(function, "economic",
+                                lambda: parse_series(self._client.get_json(params, priority=self._priority)),
+                                params=(interval,))
 
-    def get_real_gdp(self, interval="annual") -> dict | None:
+    @timed("Economic_Calendar.get_real_gdp")
+    def get_real_gdp(self, interval: str | None = None) -> pd.DataFrame | None:
         """
             Get the real GDP for a given interval. 
             - params: 
                 - interval (str): The interval for which to get the real GDP. 
-                    - annual: annual
+                    - annual: annual (default)
                     - quarterly: quarterly
             - returns: 
-                - dict: The real GDP for the given interval.
+                - pd.DataFrame: The real GDP for the given interval, see parse_series.
         """
-        url = f'{self.BASE_URL}function={self.functions["Real GDP"]}&interval={interval}&apikey={self.api_key}'
-        r = requests.get(url)
-        return requests.get(url).json() if r.status_code == 200 else None
+        return self.get_series("Real GDP", interval)
 
-    def get_gdp_per_capita(self):
-        url = f'{self.BASE_URL}function={self._functions["Real GDP per capita"]}A&apikey={self.api_key}'
-        r = requests.get(url)
-        return requests.get(url).json() if r.status_code == 200 else None
+    @timed("Economic_Calendar.get_gdp_per_capita")
+    def get_gdp_per_capita(self) -> pd.DataFrame | None:
+        return self.get_series("Real GDP per capita")
 
-    def get_cpi(self, interval: str = "monthly") -> dict | None:
+    @timed("Economic_Calendar.get_cpi")
+    def get_cpi(self, interval: str | None = None) -> pd.DataFrame | None:
         """
             Get the consumer price index for a given interval. 
             - params: 
                 - interval (str): The interval for which to get the consumer price index. 
-                    - monthly: monthly
+                    - monthly: monthly (default)
                     - semiannual: semiannual
             - returns: 
-                - dict: The consumer price index for the given interval.
+                - pd.DataFrame: The consumer price index for the given interval, see parse_series.
         """
-        url = f'{self.BASE_URL}function={self._functions["Consumer Price Index"]}&interval={interval}&apikey={self.api_key}'
-        r = requests.get(url)
-        return requests.get(url).json() if r.status_code == 200 else None
+        return self.get_series("Consumer Price Index", interval)
 
-    def get_retail_sales(self) -> dict:
+    @timed("Economic_Calendar.get_retail_sales")
+    def get_retail_sales(self) -> pd.DataFrame | None:
         """
             Get the retail sales.
             - returns:
-                - dict: The retail sales.
+                - pd.DataFrame: The retail sales, see parse_series.
         """
-        url = f'{self.BASE_URL}function={self._functions["Retail Sales"]}&apikey={self.api_key}'
-        r = requests.get(url)
-        return requests.get(url).json() if r.status_code == 200 else None
+        return self.get_series("Retail Sales")
 
-    def get_unemployment_rate(self) -> dict | None:
+    @timed("Economic_Calendar.get_unemployment_rate")
+    def get_unemployment_rate(self) -> pd.DataFrame | None:
         """
             Get the unemployment rate.
             - returns:
-                - dict: The unemployment rate.
+                - pd.DataFrame: The unemployment rate, see parse_series.
         """
-        url = f"{self.BASE_URL}function={self._functions['Unemployment Rate']}&apikey={self.api_key}"
-        r = requests.get(url)
-        return requests.get(url).json() if r.status_code == 200 else None
-
-    def get_nonfarm_payroll(self) -> dict | None:
-        url = f"{self.BASE_URL}function={self._functions['Nonfarm Payroll']}&apikey={self.api_key}"
-        r = requests.get(url)
-        return requests.get(url).json() if r.status_code == 200 else None
+        return self.get_series("Unemployment Rate")
+
+    @timed("Economic_Calendar.get_nonfarm_payroll")
+    def get_nonfarm_payroll(self) -> pd.DataFrame | None:
+        return self.get_series("Nonfarm Payroll")
@@ -0,0 +1,195 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from Financial_Models.Request_Scheduler import INTERACTIVE
+from Data_Services.Symbol_Cache import symbol_cache
+
+
+DEFAULT_PATH = os.getenv("FINDASH_STATEMENTS", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "statements.parquet"))
+
+# Statement names mapped to the Alpha Vantage function and the Fundamental_Indicators getter.
+STATEMENTS = {
+    "income": ("INCOME_STATEMENT", "get_income_statement"),
+    "balance": ("BALANCE_SHEET", "get_balance_sheet"),
+    "cash_flow": ("CASH_FLOW", "get_cash_flow"),
+}
+
+PERIOD_TYPES = {"annual": "annualReports", "quarterly": "quarterlyReports"}
+
+KEY_COLUMNS = ["symbol", "statement", "period_type", "fiscal_date", "line_item"]
+
+# Periods between a report and the one a year earlier.
+GROWTH_LAGS = {"annual": 1, "quarterly": 4}
+
+
+def normalize_statement(symbol: str, statement: str, payload: dict | None) -> pd.DataFrame:
+    """
+        Turn an Alpha Vantage statement response into long-format rows.
+        - params:
+            - symbol (str): The stock symbol.
+            - statement (str): income, balance or cash_flow.
+            - payload (dict): The JSON body with annualReports and quarterlyReports.
+        - returns:
+            - pd.DataFrame: One float64 value per (symbol, statement, period_type, fiscal_date, line_item);
+              "None" strings become NaN.
+    """
+    frames = []
+    for period_type, key in PERIOD_TYPES.items():
+        reports = (payload or {}).get(key) or []
+        if not reports:
+            continue
+        wide = pd.DataFrame(reports).drop(columns=["reportedCurrency"], errors="ignore")
+        long = wide.melt(id_vars="fiscalDateEnding", var_name="line_item", value_name="value")
+        frames.append(pd.DataFrame({
+            "symbol": symbol.upper(),
+            "statement": statement,
+            "period_type": period_type,
+            "fiscal_date": pd.to_datetime(long["fiscalDateEnding"]),
+            "line_item": long["line_item"],
+            "value": pd.to_numeric(long["value"], errors="coerce").astype("float64"),
+        }))
+    if not frames:
+        return pd.DataFrame({column: pd.Series(dtype="object") for column in KEY_COLUMNS}).assign(
+            fiscal_date=pd.Series(dtype="datetime64[ns]"), value=pd.Series(dtype="float64"))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _ratio(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
+    return numerator / denominator.where(denominator != 0)
+
+
+class Financial_Statements:
+    """
+        Income statements, balance sheets and cash flows of many companies in one long-format frame,
+        persisted as Parquet, with ratios computed for every company at once.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._frame = self._load()
+
+    def __repr__(self) -> str:
+        return f"Financial_Statements(path={self._path}, symbols={len(self.symbols())})"
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        return self._frame
+
+    def _load(self) -> pd.DataFrame:
+        if os.path.exists(self._path):
+            try:
+                return pd.read_parquet(self._path)
+            except Exception as e:
+                print("Error: ", e)
+        return normalize_statement("", "income", None)
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        self._frame.to_parquet(self._path + ".tmp", index=False)
+        os.replace(self._path + ".tmp", self._path)
+
+    def symbols(self) -> list:
+        return sorted(self._frame["symbol"].unique())
+
+    def add(self, symbol: str, statement: str, payload: dict | None) -> int:
+        """
+            Replace the stored rows of one statement of one company.
+            - returns:
+                - int: The number of rows stored.
+        """
+        rows = normalize_statement(symbol, statement, payload)
+        if rows.empty:
+            return 0
+        with self._lock:
+            frame = self._frame
+            stale = (frame["symbol"] == symbol.upper()) & (frame["statement"] == statement)
+            self._frame = pd.concat([frame[~stale], rows], ignore_index=True)
+        return len(rows)
+
+    def fetch(self, tickers: list, priority: int = INTERACTIVE, save: bool = True) -> dict:
+        """
+            Download all three statements of each ticker and store them.
+            - returns:
+                - dict: The number of rows stored for each ticker.
+        """
+        from Financial_Models.Fundamental_Indicator import Fundamental_Indicators
+        stored = {}
+        for ticker in tickers:
+            indicators = Fundamental_Indicators(ticker, priority)
+            stored[ticker] = sum(self.add(ticker, statement, getattr(indicators, getter)())
+                                 for statement, (function, getter) in STATEMENTS.items())
+        if save:
+            self.save()
+        return stored
+
+    def get(self, symbol: str, statement: str, period_type: str = "annual") -> pd.DataFrame:
+        """
+            Return one statement of one company, one row per fiscal date and one column per line item.
+        """
+        frame = self._frame
+        rows = frame[(frame["symbol"] == symbol.upper()) & (frame["statement"] == statement)
+                     & (frame["period_type"] == period_type)]
+        return rows.pivot(index="fiscal_date", columns="line_item", values="value").sort_index()
+
+    def wide(self, period_type: str = "annual") -> pd.DataFrame:
+        """
+            Return every company's line items side by side, indexed by (symbol, fiscal_date).
+            Items reported on more than one statement (netIncome) are taken from the first in STATEMENTS.
+        """
+        frame = self._frame[self._frame["period_type"] == period_type]
+        order = frame["statement"].map({name: i for i, name in enumerate(STATEMENTS)})
+        frame = frame.assign(order=order).sort_values("order", kind="stable")
+        frame = frame.drop_duplicates(["symbol", "fiscal_date", "line_item"], keep="first")
+        return frame.pivot(index=["symbol", "fiscal_date"], columns="line_item", values="value").sort_index()
+
+    def ratios(self, period_type: str = "annual", market_caps: pd.Series | dict | None = None) -> pd.DataFrame:
+        """
+            Compute standard ratios for every stored company in one pass.
+            - params:
+                - period_type (str): annual or quarterly.
+                - market_caps (pd.Series | dict): Market capitalization by symbol for the FCF yield;
+                  defaults to the MarketCapitalization of overviews in the symbol cache.
+            - returns:
+                - pd.DataFrame: gross, operating and net margin, debt to equity, free cash flow, FCF yield
+                  and year over year revenue and net income growth, indexed by (symbol, fiscal_date).
+        """
+        wide = self.wide(period_type)
+        columns = wide.columns
+        column = lambda name: wide[name] if name in columns else pd.Series(np.nan, index=wide.index)
+        revenue = column("totalRevenue")
+        free_cash_flow = column("operatingCashflow") - column("capitalExpenditures").abs()
+        if market_caps is None:
+            market_caps = self._cached_market_caps(wide.index.get_level_values("symbol").unique())
+        market_cap = pd.Series(wide.index.get_level_values("symbol"), index=wide.index).map(
+            pd.Series(market_caps, dtype="float64"))
+        lag = GROWTH_LAGS[period_type]
+        by_symbol = wide.groupby(level="symbol")
+        return pd.DataFrame({
+            "gross_margin": _ratio(column("grossProfit"), revenue),
+            "operating_margin": _ratio(column("operatingIncome"), revenue),
+            "net_margin": _ratio(column("netIncome"), revenue),
+            "debt_to_equity": _ratio(column("shortLongTermDebtTotal"), column("totalShareholderEquity")),
+            "free_cash_flow": free_cash_flow,
+            "fcf_yield": _ratio(free_cash_flow, market_cap),
+            "revenue_growth": by_symbol[revenue.name].pct_change(lag) if "totalRevenue" in columns else np.nan,
+            "net_income_growth": by_symbol["netIncome"].pct_change(lag) if "netIncome" in columns else np.nan,
+        }, index=wide.index)
+
+    @staticmethod
+    def _cached_market_caps(symbols) -> dict:
+        market_caps = {}
+        for symbol in symbols:
+            overview = symbol_cache.peek(symbol, "overview")
+            if overview and "MarketCapitalization" in overview:
+                market_caps[symbol] = pd.to_numeric(overview["MarketCapitalization"], errors="coerce")
+        return market_caps
+
+
+financial_statements = Financial_Statements()
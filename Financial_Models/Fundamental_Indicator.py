@@ -1,18 +1,26 @@
-import requests
 import os
 import dotenv
 import pandas as pd
 import json
 import csv
+from concurrent.futures import ThreadPoolExecutor
+from Financial_Models.Request_Scheduler import INTERACTIVE
+from Data_Services.Bar_Store import bar_store, save_frame
+from Data_Services.Metrics import timed
+from Data_Services.Rollup import resample_ohlcv
+from Data_Services.Symbol_Cache import symbol_cache
 
 
 class Fundamental_Indicators:
-    def __init__(self, ticker: str) -> None:
+    def __init__(self, ticker: str, priority: int = INTERACTIVE) -> None:
         try:
+            self._priority = priority
             self._ticker = ticker
             dotenv.load_dotenv()
             self._api_key = os.environ["ALPHA_VANTAGE_API_KEY"]
-            self._company_info = self.get_company_info()
+            # imported here so the dashboard does not load requests until a model is used
+            from Financial_Models.Alpha_Vantage_Client import get_client
+            self._client = get_client()
         except Exception as e:
             print("Error: ", e)
             return None
@@ -40,145 +48,179 @@ class Fundamental_Indicators:
         self._api_key = api_key
 
     @property
-    def company_info(self) -> dict:
-        return self._company_info
-    
+    def company_info(self) -> dict | None:
+        """
+            The OVERVIEW snapshot, fetched on first use and shared by every instance for the same
+            ticker until the "overview" TTL of the symbol cache expires.
+        """
+        return symbol_cache.get(self.ticker, "overview", self.fetch_overview)
+
     @company_info.setter
     def company_info(self, company_info: dict) -> None:
-        self._company_info = company_info
+        symbol_cache.set(self.ticker, "overview", company_info)
+
+    @classmethod
+    def load_many(cls, tickers: list, priority: int = INTERACTIVE, max_workers: int = 8) -> dict:
+        """
+            Load the overviews of many tickers concurrently; the request scheduler still paces the calls.
+            - params:
+                - tickers (list): The tickers to load.
+                - priority (int): The scheduler priority class (INTERACTIVE or BACKGROUND).
+                - max_workers (int): The number of overviews requested at once.
+            - returns:
+                - dict: The instances keyed by ticker, leaving out tickers whose overview could not be loaded.
+        """
+        indicators = [cls(ticker, priority) for ticker in dict.fromkeys(tickers)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            overviews = list(executor.map(lambda indicator: indicator.company_info, indicators))
+        return {indicator.ticker: indicator for indicator, overview in zip(indicators, overviews) if overview}
+
+    @timed("Fundamental_Indicators.fetch_overview")
+    def fetch_overview(self) -> dict | None:
+        """
+            Request the OVERVIEW from Alpha Vantage, bypassing the cached snapshot.
+        """
+        data = self._client.get_json({"function": "OVERVIEW", "symbol": self.ticker, "apikey": self._api_key}, priority=self._priority)
+        # unknown tickers come back as an empty object, which is not worth caching
+        return data if data and "Symbol" in data else None
 
+    @timed("Fundamental_Indicators.get_data")
     def get_data(self, interval: str = "1min", outputsize: str = "compact") -> pd.DataFrame:
-        url = f'https://www.alphavantage.co/query?function=TIME_SERIES_INTRADAY&symbol={self.ticker}&interval={interval}&apikey={self._api_key}&outputsize={outputsize}'
-        response = requests.get(url)
-        data = response.json()
-        data = data["Time Series (1min)"]
+        data = self._client.get_json({"function": "TIME_SERIES_INTRADAY", "symbol": self.ticker, "interval": interval, "apikey": self._api_key, "outputsize": outputsize}, priority=self._priority)
+        data = data[f"Time Series ({interval})"]
         data = pd.DataFrame(data).T
         data.index = pd.to_datetime(data.index)
         data = data.astype(float)
         return data
 
+    @timed("Fundamental_Indicators.get_company_info")
     def get_company_info(self, parameter: str = None, function: str = "OVERVIEW") -> str:
-        url = f'https://www.alphavantage.co/query?function={function}&symbol={self.ticker}&apikey={self._api_key}'
-        response = requests.get(url)
-        data = response.json()
-        if parameter is None:
+        if function == "OVERVIEW":
+            data = self.company_info
+        else:
+            data = self._client.get_json({"function": function, "symbol": self.ticker, "apikey": self._api_key}, priority=self._priority)
+        if data is None or parameter is None:
             return data
         return data[parameter]
 
     def get_full_name(self) -> str:
-        return self._company_info["Name"]
+        return self.company_info["Name"]
 
     def get_description(self) -> str:
-        return self._company_info["Description"]
+        return self.company_info["Description"]
 
     def get_exchange(self) -> str:
-        return self._company_info["Exchange"]
+        return self.company_info["Exchange"]
 
     def get_country(self) -> str:
-        return self._company_info["Country"]
+        return self.company_info["Country"]
 
     def get_sector(self) -> str:
-        return self._company_info["Sector"]
+        return self.company_info["Sector"]
 
     def get_industry(self) -> str:
-        return self._company_info["Industry"]
+        return self.company_info["Industry"]
 
     def get_market_cap(self) -> str:
-        return self._company_info["MarketCapitalization"]
+        return self.company_info["MarketCapitalization"]
 
     def get_ebitda(self) -> str:
-        return self._company_info["EBITDA"]
+        return self.company_info["EBITDA"]
 
     def get_pe_ratio(self) -> str:
-        return self._company_info["PERatio"]
+        return self.company_info["PERatio"]
 
     def get_eps(self) -> str:
-        return self._company_info["EPS"]
+        return self.company_info["EPS"]
 
     def get_peg_ratio(self) -> str:
-        return self._company_info["PEGRatio"]
+        return self.company_info["PEGRatio"]
 
     def get_book_value(self) -> str:
-        return self._company_info["BookValue"]
+        return self.company_info["BookValue"]
 
     def get_dividend_per_share(self) -> str:
-        return self._company_info["DividendPerShare"]
+        return self.company_info["DividendPerShare"]
 
     def get_dividend_yield(self) -> str:
-        return self._company_info["DividendYield"]
+        return self.company_info["DividendYield"]
 
     def geT_profit_margin(self) -> str:
-        return self._company_info["ProfitMargin"]
+        return self.company_info["ProfitMargin"]
 
     def get_operating_margin(self) -> str:
-        return self._company_info["OperatingMarginTTM"]
+        return self.company_info["OperatingMarginTTM"]
 
     def get_return_on_assets(self) -> str:
-        return self._company_info["ReturnOnAssetsTTM"]
+        return self.company_info["ReturnOnAssetsTTM"]
 
     def get_return_on_equity(self) -> str:
-        return self._company_info["ReturnOnEquityTTM"]
+        return self.company_info["ReturnOnEquityTTM"]
 
     def get_revenue(self) -> str:
-        return self._company_info["RevenueTTM"]
+        return self.company_info["RevenueTTM"]
 
     def get_gross_profit(self) -> str:
-        return self._company_info["GrossProfitTTM"]
+        return self.company_info["GrossProfitTTM"]
 
     def get_quarterly_earning_growth(self) -> str:
-        return self._company_info["QuarterlyEarningsGrowthYOY"]
+        return self.company_info["QuarterlyEarningsGrowthYOY"]
 
     def get_quarterly_revenue_growth(self) -> str:
-        return self._company_info["QuarterlyRevenueGrowthYOY"]
+        return self.company_info["QuarterlyRevenueGrowthYOY"]
 
     def get_analyst_target_price(self) -> str:
-        return self._company_info["AnalystTargetPrice"]
+        return self.company_info["AnalystTargetPrice"]
 
     def get_trailing_pe(self) -> str:
-        return self._company_info["TrailingPE"]
+        return self.company_info["TrailingPE"]
 
     def get_forward_pe(self) -> str:
-        return self._company_info["ForwardPE"]
+        return self.company_info["ForwardPE"]
 
     def get_price_to_sales_ratio(self) -> str:
-        return self._company_info["PriceToSalesRatioTTM"]
+        return self.company_info["PriceToSalesRatioTTM"]
 
     def get_price_to_book_ratio(self) -> str:
-        return self._company_info["PriceToBookRatio"]
+        return self.company_info["PriceToBookRatio"]
 
     def get_beta(self) -> str:
-        return self._company_info["Beta"]
+        return self.company_info["Beta"]
 
     def get_52_week_high(self) -> str:
-        return self._company_info["52WeekHigh"]
+        return self.company_info["52WeekHigh"]
 
     def get_52_week_low(self) -> str:
-        return  self._company_info["52WeekLow"]
+        return  self.company_info["52WeekLow"]
 
     def get_50_day_moving_average(self) -> str:
-        return self.get_company_info(parameter="50DayMovingAverage")
+        return self.company_info["50DayMovingAverage"]
 
     def get_200_day_moving_average(self) -> str:
-        return self.get_company_info(parameter="200DayMovingAverage")
+        return self.company_info["200DayMovingAverage"]
 
     def get_share_outstanding(self) -> str:
-        return self.get_company_info(parameter="SharesOutstanding")
+        return self.company_info["SharesOutstanding"]
 
     def get_dividend_date(self) -> str:
-        return self.get_company_info(parameter="DividendDate")
+        return self.company_info["DividendDate"]
 
     def get_ex_dividend_date(self) -> str:
-        return self.get_company_info(parameter="ExDividendDate")
+        return self.company_info["ExDividendDate"]
 
+    @timed("Fundamental_Indicators.get_income_statement")
     def get_income_statement(self):
         return self.get_company_info(function="INCOME_STATEMENT")
 
+    @timed("Fundamental_Indicators.get_balance_sheet")
     def get_balance_sheet(self):
         return self.get_company_info(function="BALANCE_SHEET")
 
+    @timed("Fundamental_Indicators.get_cash_flow")
     def get_cash_flow(self):
         return self.get_company_info(function="CASH_FLOW")
 
+    @timed("Fundamental_Indicators.get_earnings")
     def get_earnings(self):
         """
             Get the earnings for a company.
@@ -187,6 +229,7 @@ class Fundamental_Indicators:
         """
         return self.get_company_info(function="EARNINGS")
 
+    @timed("Fundamental_Indicators.get_earnings_calendar")
     def get_earnings_calendar(self, horizon: str = "3month") -> dict | None:
         """
             Get the earnings calendar for a company for a given horizon. 
@@ -198,14 +241,13 @@ class Fundamental_Indicators:
             - returns: 
                 - dict: The earnings calendar for the company.
         """
-        url = f'https://www.alphavantage.co/query?function=EARNINGS_CALENDAR&symbol={self.ticker}&horizon={horizon}&apikey={self.api_key}'
-        with requests.Session() as s:
-            download = s.get(url)
-            decoded_content = download.content.decode('utf-8')
-            cr = csv.reader(decoded_content.splitlines(), delimiter=',')
-            my_list = list(cr)
-            if len(my_list) > 1:
-                return my_list
+        decoded_content = self._client.get_text({"function": "EARNINGS_CALENDAR", "symbol": self.ticker, "horizon": horizon, "apikey": self.api_key}, priority=self._priority)
+        if decoded_content is None:
+            return None
+        cr = csv.reader(decoded_content.splitlines(), delimiter=',')
+        my_list = list(cr)
+        if len(my_list) > 1:
+            return my_list
         return None
 
     def convert_to_dataframe(self, data: dict) -> pd.DataFrame:
@@ -218,6 +260,7 @@ class Fundamental_Indicators:
         """
         return pd.DataFrame(data)
 
+    @timed("Fundamental_Indicators.download_historical_data")
     def download_historical_data(self, outputsize: str = "full", datatype: str = "pd.DataFrame") -> pd.DataFrame | None:
         """
             Download the historical data for a company.
@@ -231,17 +274,23 @@ class Fundamental_Indicators:
             - returns:
                 - pd.DataFrame: The downloaded data.
         """
-        url = f"https://www.alphavantage.co/query?function=TIME_SERIES_INTRADAY&symbol={self.ticker}&interval=1min&apikey={self.api_key}&outputsize={outputsize}"
-        r = requests.get(url)
-        data = r.json()
+        data = self._client.get_json({"function": "TIME_SERIES_INTRADAY", "symbol": self.ticker, "interval": "1min", "apikey": self.api_key, "outputsize": outputsize}, priority=self._priority)
+        if data is None:
+            return None
+        bars = pd.DataFrame(data["Time Series (1min)"]).T
+        try:
+            bar_store.append(self.ticker, "1min", bars)
+        except Exception as e:
+            print("Error: ", e)
         if datatype == "pd.DataFrame":
-            return pd.DataFrame(data["Time Series (1min)"]).T
+            return bars
         
 
     def convert_timeframe(self,file_name: str, data: pd.DataFrame, timeframe: str = "1min") -> pd.DataFrame:
         """
             Convert the timeframe of the data.
             - params:
+                - file_name (str): Where to save the result, .parquet/.feather or .xlsx.
                 - data (pd.DataFrame): The data to convert.
                 - timeframe (str): The timeframe to convert to.
                     - 1min: 1 minute
@@ -251,38 +300,27 @@ class Fundamental_Indicators:
                     - 60min: 60 minutes
                     - 2h: 120 minutes
                     - 4h: 240 minutes
-                    - 1d: Daily 1440 minutes
-                    - 1w: Weekly 7200 minutes
-                    - 1m: Monthly 40320 minutes
+                    - 1d: Daily
+                    - 1w: Weekly, starting on Monday
+                    - 1m: Calendar month
             - returns:
                 - pd.DataFrame: The converted data.
         """
-        new_timeframe=  0
-        if timeframe == "5min":
-            new_timeframe = 5
-        if timeframe == "15min":
-            new_timeframe = 15
-        if timeframe == "30min":
-            new_timeframe = 30
-        if timeframe == "60min":
-            new_timeframe = 60
-        if timeframe == "2h":
-            new_timeframe = 120
-        if timeframe == "4h":
-            new_timeframe = 240
-        if timeframe == "1d":
-            new_timeframe = 1440
-        if timeframe == "1w":
-            new_timeframe = 1440 * 5
-        if timeframe == "1m":
-            new_timeframe = 1440 * 28
-        
-        return data.resample(new_timeframe).agg(
-            {
-                "open": "first",
-                "high": "max",
-                "low": "min",
-                "close": "last",
-                "volume": "sum",
-            }
-        ).to_excel(file_name)
+        timeframes = {
+            "1min": ("1min", None),
+            "5min": ("5min", None),
+            "15min": ("15min", None),
+            "30min": ("30min", None),
+            "60min": ("1h", "30min"),
+            "2h": ("2h", "30min"),
+            "4h": ("4h", "30min"),
+            "1d": ("1D", None),
+            "1w": ("W-MON", None),
+            "1m": ("MS", None),
+        }
+        rule, offset = timeframes[timeframe]
+        data = data.copy()
+        data.index = pd.to_datetime(data.index)
+        converted = resample_ohlcv(data.sort_index().astype(float), rule, offset)
+        save_frame(converted, file_name)
+        return converted
@@ -0,0 +1,429 @@
+import json
+import math
+import os
+from abc import ABC, abstractmethod
+from collections import deque
+import pandas as pd
+from Financial_Models.Local_Technical_Indicator import ema_step, wilder_step
+
+
+# Every state class registers here by name so load_state can rebuild it from a dict.
+STATE_TYPES = {}
+
+
+class Indicator_State(ABC):
+    """
+        Base class for indicators that consume one bar at a time in constant time and memory.
+        Each subclass performs the same floating point operations, in the same order, as the
+        matching batch function in Local_Technical_Indicator, so the outputs are identical.
+    """
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        STATE_TYPES[cls.__name__] = cls
+
+    @abstractmethod
+    def params(self) -> dict:
+        ...
+
+    @abstractmethod
+    def state(self) -> dict:
+        ...
+
+    @abstractmethod
+    def restore(self, state: dict) -> None:
+        ...
+
+    def to_dict(self) -> dict:
+        return {"type": type(self).__name__, "params": self.params(), "state": self.state()}
+
+    def __repr__(self) -> str:
+        params = ", ".join(f"{k}={v}" for k, v in self.params().items())
+        return f"{type(self).__name__}({params})"
+
+
+def load_state(data: dict) -> Indicator_State:
+    """
+        Rebuild an indicator state from the output of to_dict().
+    """
+    state = STATE_TYPES[data["type"]](**data["params"])
+    state.restore(data["state"])
+    return state
+
+
+class SMA_State(Indicator_State):
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self._reference = None
+        self._total = 0.0
+        self._sums = deque([0.0], maxlen=period + 1)
+
+    def params(self) -> dict:
+        return {"period": self.period}
+
+    def state(self) -> dict:
+        return {"reference": self._reference, "total": self._total, "sums": list(self._sums)}
+
+    def restore(self, state: dict) -> None:
+        self._reference = state["reference"]
+        self._total = state["total"]
+        self._sums = deque(state["sums"], maxlen=self.period + 1)
+
+    def update(self, value: float) -> float:
+        if math.isnan(value) and self._reference is None:
+            return math.nan
+        if self._reference is None:
+            self._reference = value
+        self._total = self._total + (value - self._reference)
+        self._sums.append(self._total)
+        if len(self._sums) <= self.period:
+            return math.nan
+        return (self._total - self._sums[0]) / self.period + self._reference
+
+
+class Rolling_Std_State(Indicator_State):
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self._reference = None
+        self._total = 0.0
+        self._squares_total = 0.0
+        self._sums = deque([0.0], maxlen=period + 1)
+        self._squares = deque([0.0], maxlen=period + 1)
+
+    def params(self) -> dict:
+        return {"period": self.period}
+
+    def state(self) -> dict:
+        return {"reference": self._reference, "total": self._total, "squares_total": self._squares_total,
+                "sums": list(self._sums), "squares": list(self._squares)}
+
+    def restore(self, state: dict) -> None:
+        self._reference = state["reference"]
+        self._total = state["total"]
+        self._squares_total = state["squares_total"]
+        self._sums = deque(state["sums"], maxlen=self.period + 1)
+        self._squares = deque(state["squares"], maxlen=self.period + 1)
+
+    def update(self, value: float) -> float:
+        if math.isnan(value) and self._reference is None:
+            return math.nan
+        if self._reference is None:
+            self._reference = value
+        d = value - self._reference
+        self._total = self._total + d
+        self._squares_total = self._squares_total + d * d
+        self._sums.append(self._total)
+        self._squares.append(self._squares_total)
+        if len(self._sums) <= self.period:
+            return math.nan
+        mean = (self._total - self._sums[0]) / self.period
+        variance = (self._squares_total - self._squares[0]) / self.period - mean * mean
+        return math.sqrt(max(variance, 0.0))
+
+
+class Rolling_Max_State(Indicator_State):
+    """
+        Rolling maximum using a monotonic deque of (bar number, value), amortised O(1) per bar.
+    """
+
+    sign = 1
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self._count = 0
+        self._window = deque()
+
+    def params(self) -> dict:
+        return {"period": self.period}
+
+    def state(self) -> dict:
+        return {"count": self._count, "window": [list(item) for item in self._window]}
+
+    def restore(self, state: dict) -> None:
+        self._count = state["count"]
+        self._window = deque(tuple(item) for item in state["window"])
+
+    def update(self, value: float) -> float:
+        while self._window and self.sign * self._window[-1][1] <= self.sign * value:
+            self._window.pop()
+        self._window.append((self._count, value))
+        if self._window[0][0] <= self._count - self.period:
+            self._window.popleft()
+        self._count += 1
+        return self._window[0][1] if self._count >= self.period else math.nan
+
+
+class Rolling_Min_State(Rolling_Max_State):
+    sign = -1
+
+
+class _Smoothing_State(Indicator_State):
+    # Seeded with the mean of the first `period` values, like _recursive in the batch engine.
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self._count = 0
+        self._seed = 0.0
+        self._value = None
+
+    def params(self) -> dict:
+        return {"period": self.period}
+
+    def state(self) -> dict:
+        return {"count": self._count, "seed": self._seed, "value": self._value}
+
+    def restore(self, state: dict) -> None:
+        self._count = state["count"]
+        self._seed = state["seed"]
+        self._value = state["value"]
+
+    @abstractmethod
+    def step(self, prev: float, value: float) -> float:
+        ...
+
+    def update(self, value: float) -> float:
+        if math.isnan(value) and self._count == 0:
+            return math.nan
+        if self._value is not None:
+            self._value = self.step(self._value, value)
+            return self._value
+        self._count += 1
+        self._seed = self._seed + value
+        if self._count < self.period:
+            return math.nan
+        self._value = self._seed / self.period
+        return self._value
+
+
+class EMA_State(_Smoothing_State):
+    def step(self, prev: float, value: float) -> float:
+        return ema_step(prev, value, 2.0 / (self.period + 1))
+
+
+class Wilder_State(_Smoothing_State):
+    def step(self, prev: float, value: float) -> float:
+        return wilder_step(prev, value, self.period)
+
+
+class RSI_State(Indicator_State):
+    def __init__(self, period: int = 14) -> None:
+        self.period = period
+        self._previous = None
+        self._gains = Wilder_State(period)
+        self._losses = Wilder_State(period)
+
+    def params(self) -> dict:
+        return {"period": self.period}
+
+    def state(self) -> dict:
+        return {"previous": self._previous, "gains": self._gains.state(), "losses": self._losses.state()}
+
+    def restore(self, state: dict) -> None:
+        self._previous = state["previous"]
+        self._gains.restore(state["gains"])
+        self._losses.restore(state["losses"])
+
+    def update(self, value: float) -> float:
+        if self._previous is None:
+            self._previous = value
+            return math.nan
+        change = value - self._previous
+        self._previous = value
+        gain = self._gains.update(max(change, 0.0))
+        loss = self._losses.update(max(-change, 0.0))
+        total = gain + loss
+        if math.isnan(total):
+            return math.nan
+        return 100 * gain / total if total > 0 else 0.0
+
+
+class MACD_State(Indicator_State):
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9) -> None:
+        self.fast = fast
+        self.slow = slow
+        self.signal = signal
+        self._fast = EMA_State(fast)
+        self._slow = EMA_State(slow)
+        self._signal = EMA_State(signal)
+
+    def params(self) -> dict:
+        return {"fast": self.fast, "slow": self.slow, "signal": self.signal}
+
+    def state(self) -> dict:
+        return {"fast": self._fast.state(), "slow": self._slow.state(), "signal": self._signal.state()}
+
+    def restore(self, state: dict) -> None:
+        self._fast.restore(state["fast"])
+        self._slow.restore(state["slow"])
+        self._signal.restore(state["signal"])
+
+    def update(self, value: float) -> tuple:
+        """
+            - returns:
+                - tuple: (MACD, signal, histogram), NaN while warming up.
+        """
+        line = self._fast.update(value) - self._slow.update(value)
+        signal = self._signal.update(line)
+        return line, signal, line - signal
+
+
+class ATR_State(Indicator_State):
+    def __init__(self, period: int = 14) -> None:
+        self.period = period
+        self._previous = None
+        self._average = Wilder_State(period)
+
+    def params(self) -> dict:
+        return {"period": self.period}
+
+    def state(self) -> dict:
+        return {"previous": self._previous, "average": self._average.state()}
+
+    def restore(self, state: dict) -> None:
+        self._previous = state["previous"]
+        self._average.restore(state["average"])
+
+    def update(self, high: float, low: float, close: float) -> float:
+        previous = self._previous
+        self._previous = close
+        if previous is None:
+            return math.nan
+        true_range = max(high - low, max(abs(high - previous), abs(low - previous)))
+        return self._average.update(true_range)
+
+
+class Bollinger_State(Indicator_State):
+    def __init__(self, period: int = 20, deviations: float = 2.0) -> None:
+        self.period = period
+        self.deviations = deviations
+        self._middle = SMA_State(period)
+        self._std = Rolling_Std_State(period)
+
+    def params(self) -> dict:
+        return {"period": self.period, "deviations": self.deviations}
+
+    def state(self) -> dict:
+        return {"middle": self._middle.state(), "std": self._std.state()}
+
+    def restore(self, state: dict) -> None:
+        self._middle.restore(state["middle"])
+        self._std.restore(state["std"])
+
+    def update(self, value: float) -> tuple:
+        """
+            - returns:
+                - tuple: (upper, middle, lower), NaN while warming up.
+        """
+        middle = self._middle.update(value)
+        width = self.deviations * self._std.update(value)
+        return middle + width, middle, middle - width
+
+
+class Stoch_State(Indicator_State):
+    def __init__(self, fastk: int = 5, slowk: int = 3, slowd: int = 3) -> None:
+        self.fastk = fastk
+        self.slowk = slowk
+        self.slowd = slowd
+        self._highest = Rolling_Max_State(fastk)
+        self._lowest = Rolling_Min_State(fastk)
+        self._slow_k = SMA_State(slowk)
+        self._slow_d = SMA_State(slowd)
+
+    def params(self) -> dict:
+        return {"fastk": self.fastk, "slowk": self.slowk, "slowd": self.slowd}
+
+    def state(self) -> dict:
+        return {"highest": self._highest.state(), "lowest": self._lowest.state(),
+                "slow_k": self._slow_k.state(), "slow_d": self._slow_d.state()}
+
+    def restore(self, state: dict) -> None:
+        self._highest.restore(state["highest"])
+        self._lowest.restore(state["lowest"])
+        self._slow_k.restore(state["slow_k"])
+        self._slow_d.restore(state["slow_d"])
+
+    def update(self, high: float, low: float, close: float) -> tuple:
+        """
+            - returns:
+                - tuple: (SlowK, SlowD), NaN while warming up.
+        """
+        highest = self._highest.update(high)
+        lowest = self._lowest.update(low)
+        span = highest - lowest
+        if math.isnan(span):
+            return math.nan, math.nan
+        fast_k = 100 * (close - lowest) / span if span > 0 else 0.0
+        slow_k = self._slow_k.update(fast_k)
+        return slow_k, self._slow_d.update(slow_k)
+
+
+# Indicators that read a single price series; the others take the whole bar.
+BAR_INDICATORS = (ATR_State, Stoch_State)
+
+
+class Indicator_Set:
+    """
+        The incremental indicators kept for one (symbol, interval), fed with bars newer than the
+        last one consumed. Serializable, so it can be saved and reloaded across worker restarts.
+    """
+
+    def __init__(self, indicators: dict | None = None, series_type: str = "Close") -> None:
+        self.indicators = indicators if indicators is not None else {
+            "EMA": EMA_State(10),
+            "SMA": SMA_State(10),
+            "RSI": RSI_State(14),
+            "MACD": MACD_State(),
+            "ATR": ATR_State(14),
+            "BBANDS": Bollinger_State(20),
+            "STOCH": Stoch_State(),
+        }
+        self.series_type = series_type
+        self.last_timestamp = None
+        self.values = {}
+
+    def __repr__(self) -> str:
+        return f"Indicator_Set({list(self.indicators)}, last_timestamp={self.last_timestamp})"
+
+    def update(self, bars: pd.DataFrame) -> dict:
+        """
+            Consume the bars newer than the last consumed one.
+            - params:
+                - bars (pd.DataFrame): OHLCV bars with Open/High/Low/Close columns on a sorted DatetimeIndex.
+            - returns:
+                - dict: The latest value of each indicator.
+        """
+        if self.last_timestamp is not None:
+            bars = bars[bars.index > pd.Timestamp(self.last_timestamp)]
+        columns = [bars[c].tolist() for c in ("High", "Low", "Close", self.series_type)]
+        for high, low, close, value in zip(*columns):
+            for name, indicator in self.indicators.items():
+                if isinstance(indicator, BAR_INDICATORS):
+                    self.values[name] = indicator.update(high, low, close)
+                else:
+                    self.values[name] = indicator.update(value)
+        if len(bars):
+            self.last_timestamp = bars.index[-1].isoformat()
+        return self.values
+
+    def to_dict(self) -> dict:
+        return {
+            "series_type": self.series_type,
+            "last_timestamp": self.last_timestamp,
+            "indicators": {name: indicator.to_dict() for name, indicator in self.indicators.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Indicator_Set":
+        indicator_set = cls({name: load_state(d) for name, d in data["indicators"].items()}, data["series_type"])
+        indicator_set.last_timestamp = data["last_timestamp"]
+        return indicator_set
+
+    def save(self, file_name: str) -> None:
+        with open(file_name + ".tmp", "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(file_name + ".tmp", file_name)
+
+    @classmethod
+    def load(cls, file_name: str) -> "Indicator_Set":
+        with open(file_name) as f:
+            return cls.from_dict(json.load(f))
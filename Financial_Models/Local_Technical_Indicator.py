@@ -0,0 +1,376 @@
+import json
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Callable
+from Data_Services.Bar_Store import bar_store, flatten_columns, normalize_interval, normalize_ohlcv
+from Data_Services.Replay_Transport import transport
+
+
+# Moving averages the local engine can compute, MAMA still needs the remote API.
+LOCAL_MOVING_AVERAGES = ("SMA", "EMA", "WMA", "DEMA", "TEMA", "TRIMA", "KAMA", "T3")
+
+# Periods used to fetch bars with yfinance when the store has nothing for the interval.
+DOWNLOAD_PERIODS = {"1m": "7d", "5m": "60d", "15m": "60d", "30m": "60d", "1h": "730d",
+                    "1d": "max", "1wk": "max", "1mo": "max"}
+
+
+def _first_valid(values: np.ndarray) -> int:
+    valid = np.flatnonzero(~np.isnan(values))
+    return int(valid[0]) if len(valid) else len(values)
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    """
+        Simple moving average. The window sums come from a cumulative sum of the values minus the
+        first value, which keeps the whole series O(n) and is reproduced bit for bit by
+        Indicator_State.SMA_State.
+    """
+    values = np.asarray(values, dtype="float64")
+    out = np.full(len(values), np.nan)
+    start = _first_valid(values)
+    x = values[start:]
+    if len(x) < period:
+        return out
+    reference = x[0]
+    sums = np.concatenate(([0.0], np.cumsum(x - reference)))
+    out[start + period - 1:] = (sums[period:] - sums[:-period]) / period + reference
+    return out
+
+
+def rolling_std(values: np.ndarray, period: int) -> np.ndarray:
+    """
+        Population standard deviation over a rolling window, as used by Bollinger bands.
+    """
+    values = np.asarray(values, dtype="float64")
+    out = np.full(len(values), np.nan)
+    start = _first_valid(values)
+    x = values[start:]
+    if len(x) < period:
+        return out
+    d = x - x[0]
+    sums = np.concatenate(([0.0], np.cumsum(d)))
+    squares = np.concatenate(([0.0], np.cumsum(d * d)))
+    mean = (sums[period:] - sums[:-period]) / period
+    variance = (squares[period:] - squares[:-period]) / period - mean * mean
+    out[start + period - 1:] = np.sqrt(np.maximum(variance, 0.0))
+    return out
+
+
+def rolling_max(values: np.ndarray, period: int) -> np.ndarray:
+    values = np.asarray(values, dtype="float64")
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        out[period - 1:] = sliding_window_view(values, period).max(axis=1)
+    return out
+
+
+def rolling_min(values: np.ndarray, period: int) -> np.ndarray:
+    values = np.asarray(values, dtype="float64")
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        out[period - 1:] = sliding_window_view(values, period).min(axis=1)
+    return out
+
+
+def _recursive(values: np.ndarray, period: int, step: Callable[[float, float], float]) -> np.ndarray:
+    # Seed with the mean of the first `period` values, then apply `step` bar by bar.
+    # The recursion is inherently sequential, so it runs over a plain list of floats.
+    values = np.asarray(values, dtype="float64")
+    out = np.full(len(values), np.nan)
+    start = _first_valid(values)
+    x = values[start:]
+    if len(x) < period:
+        return out
+    prev = float(np.cumsum(x[:period])[-1]) / period
+    result = [prev]
+    for value in x[period:].tolist():
+        prev = step(prev, value)
+        result.append(prev)
+    out[start + period - 1:] = result
+    return out
+
+
+def ema_step(prev: float, value: float, alpha: float) -> float:
+    return prev + alpha * (value - prev)
+
+
+def wilder_step(prev: float, value: float, period: int) -> float:
+    return (prev * (period - 1) + value) / period
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    alpha = 2.0 / (period + 1)
+    return _recursive(values, period, lambda prev, value: ema_step(prev, value, alpha))
+
+
+def wilder(values: np.ndarray, period: int) -> np.ndarray:
+    return _recursive(values, period, lambda prev, value: wilder_step(prev, value, period))
+
+
+def wma(values: np.ndarray, period: int) -> np.ndarray:
+    values = np.asarray(values, dtype="float64")
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        weights = np.arange(1, period + 1, dtype="float64")
+        out[period - 1:] = sliding_window_view(values, period) @ weights / weights.sum()
+    return out
+
+
+def dema(values: np.ndarray, period: int) -> np.ndarray:
+    e1 = ema(values, period)
+    return 2 * e1 - ema(e1, period)
+
+
+def tema(values: np.ndarray, period: int) -> np.ndarray:
+    e1 = ema(values, period)
+    e2 = ema(e1, period)
+    return 3 * e1 - 3 * e2 + ema(e2, period)
+
+
+def trima(values: np.ndarray, period: int) -> np.ndarray:
+    if period % 2:
+        return sma(sma(values, (period + 1) // 2), (period + 1) // 2)
+    return sma(sma(values, period // 2), period // 2 + 1)
+
+
+def kama(values: np.ndarray, period: int, fast: int = 2, slow: int = 30) -> np.ndarray:
+    values = np.asarray(values, dtype="float64")
+    out = np.full(len(values), np.nan)
+    if len(values) <= period:
+        return out
+    change = np.abs(values[period:] - values[:-period])
+    volatility = sliding_window_view(np.abs(np.diff(values)), period).sum(axis=1)
+    ratio = np.divide(change, volatility, out=np.zeros_like(change), where=volatility != 0)
+    fastest, slowest = 2.0 / (fast + 1), 2.0 / (slow + 1)
+    constants = (ratio * (fastest - slowest) + slowest) ** 2
+    prev = values[period - 1]
+    result = []
+    for value, constant in zip(values[period:].tolist(), constants.tolist()):
+        prev = prev + constant * (value - prev)
+        result.append(prev)
+    out[period:] = result
+    return out
+
+
+def t3(values: np.ndarray, period: int, volume_factor: float = 0.7) -> np.ndarray:
+    e1 = ema(values, period)
+    e2 = ema(e1, period)
+    e3 = ema(e2, period)
+    e4 = ema(e3, period)
+    e5 = ema(e4, period)
+    e6 = ema(e5, period)
+    a = volume_factor
+    c1 = -a ** 3
+    c2 = 3 * a ** 2 + 3 * a ** 3
+    c3 = -6 * a ** 2 - 3 * a - 3 * a ** 3
+    c4 = 1 + 3 * a + a ** 3 + 3 * a ** 2
+    return c1 * e6 + c2 * e5 + c3 * e4 + c4 * e3
+
+
+def macd(values: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> tuple:
+    line = ema(values, fast) - ema(values, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def stoch(high: np.ndarray, low: np.ndarray, close: np.ndarray, fastk: int = 5, slowk: int = 3, slowd: int = 3) -> tuple:
+    highest = rolling_max(high, fastk)
+    lowest = rolling_min(low, fastk)
+    span = highest - lowest
+    fast_k = np.where(span > 0, 100 * (np.asarray(close, dtype="float64") - lowest) / np.where(span > 0, span, 1), 0.0)
+    fast_k[np.isnan(span)] = np.nan
+    slow_k = sma(fast_k, slowk)
+    return slow_k, sma(slow_k, slowd)
+
+
+def rsi(values: np.ndarray, period: int = 14) -> np.ndarray:
+    values = np.asarray(values, dtype="float64")
+    out = np.full(len(values), np.nan)
+    if len(values) <= period:
+        return out
+    change = np.diff(values)
+    gains = wilder(np.maximum(change, 0.0), period)
+    losses = wilder(np.maximum(-change, 0.0), period)
+    total = gains + losses
+    out[1:] = np.where(total > 0, 100 * gains / np.where(total > 0, total, 1), 0.0)
+    out[1:][np.isnan(total)] = np.nan
+    return out
+
+
+def bbands(values: np.ndarray, period: int = 20, deviations: float = 2.0) -> tuple:
+    middle = sma(values, period)
+    width = deviations * rolling_std(values, period)
+    return middle + width, middle, middle - width
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    high, low, close = (np.asarray(a, dtype="float64") for a in (high, low, close))
+    out = np.full(len(close), np.nan)
+    previous = close[:-1]
+    out[1:] = np.maximum(high[1:] - low[1:], np.maximum(np.abs(high[1:] - previous), np.abs(low[1:] - previous)))
+    return out
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    return wilder(true_range(high, low, close), period)
+
+
+MOVING_AVERAGES = {
+    "SMA": sma, "EMA": ema, "WMA": wma, "DEMA": dema, "TEMA": tema,
+    "TRIMA": trima, "KAMA": kama, "T3": t3,
+}
+
+
+def load_bars(ticker: str, interval: str) -> pd.DataFrame | None:
+    """
+        Load OHLCV bars for the indicator engine, from the bar store or else from yfinance.
+        - params:
+            - ticker (str): The stock ticker.
+            - interval (str): The interval, in Alpha Vantage (1min, daily) or yfinance (1m, 1d) naming.
+        - returns:
+            - pd.DataFrame | None: The bars, or None if none could be loaded.
+    """
+    interval = normalize_interval(interval)
+    data = bar_store.read(ticker, interval)
+    if data is not None:
+        return data
+    import yfinance as yf
+    data = flatten_columns(transport.call("yfinance", "download", yf.download, ticker, interval=interval,
+                                          period=DOWNLOAD_PERIODS.get(interval, "1y"), progress=False))
+    if data is None or data.empty:
+        return None
+    try:
+        bar_store.append(ticker, interval, data)
+    except Exception as e:
+        print("Error: ", e)
+    return normalize_ohlcv(data)
+
+
+def compare_outputs(local: dict, remote: dict, skip: int = 0) -> dict:
+    """
+        Compare a local result against a recorded Alpha Vantage response for the same request.
+        - params:
+            - local (dict): The output of a Local_Technical_Indicators getter.
+            - remote (dict): The recorded Alpha Vantage JSON, or a path to a JSON file holding it.
+            - skip (int): The number of oldest common timestamps to ignore while seeding settles.
+        - returns:
+            - dict: The number of compared timestamps and the max absolute difference per field.
+    """
+    if isinstance(remote, str):
+        with open(remote) as f:
+            remote = json.load(f)
+    local_series = next(v for k, v in local.items() if k.startswith("Technical Analysis"))
+    remote_series = next(v for k, v in remote.items() if k.startswith("Technical Analysis"))
+    common = sorted(set(local_series) & set(remote_series))[skip:]
+    differences = {}
+    for timestamp in common:
+        for field, value in remote_series[timestamp].items():
+            if field in local_series[timestamp]:
+                difference = abs(float(local_series[timestamp][field]) - float(value))
+                differences[field] = max(differences.get(field, 0.0), difference)
+    return {"compared": len(common), "max_abs_diff": differences}
+
+
+class Local_Technical_Indicators:
+    def __init__(self, data_source: Callable[[str, str], pd.DataFrame | None] = load_bars) -> None:
+        self._data_source = data_source
+
+    def __str__(self) -> str:
+        return "Local_Technical_Indicators"
+
+    def __repr__(self) -> str:
+        return f"Local_Technical_Indicators(data_source={self._data_source.__name__})"
+
+    def _bars(self, ticker: str, interval: str, data: pd.DataFrame | None) -> pd.DataFrame | None:
+        data = data if data is not None else self._data_source(ticker, interval)
+        if data is None or data.empty:
+            return None
+        return normalize_ohlcv(data)
+
+    def _format(self, bars: pd.DataFrame, name: str, ticker: str, interval: str, columns: dict, meta: dict) -> dict:
+        # Shape the result like the Alpha Vantage response, newest timestamp first.
+        frame = pd.DataFrame(columns, index=bars.index).dropna()
+        index = frame.index.tz_convert("US/Eastern")
+        intraday = normalize_interval(interval) in ("1m", "5m", "15m", "30m", "1h")
+        keys = index.strftime("%Y-%m-%d %H:%M" if intraday else "%Y-%m-%d")
+        values = {
+            key: {column: f"{value:.4f}" for column, value in zip(frame.columns, row)}
+            for key, row in zip(keys[::-1], frame.to_numpy()[::-1].tolist())
+        }
+        return {
+            "Meta Data": {
+                "1: Symbol": ticker,
+                "2: Indicator": name,
+                "3: Last Refreshed": keys[-1] if len(keys) else None,
+                "4: Interval": interval,
+                **meta,
+                "Time Zone": "US/Eastern Time",
+            },
+            f"Technical Analysis: {name.split(' ')[0]}": values,
+        }
+
+    def get_moving_average(self, ticker: str, moving_average_type: str = "SMA", interval: str = "1min", time_period: int = 10,
+                           series_type: str = "close", data: pd.DataFrame | None = None) -> dict | None:
+        """
+            Compute the moving average locally, see Technical_Indicators.get_moving_average.
+            - params:
+                - data (pd.DataFrame): Optional OHLCV bars to use instead of loading them, e.g. from get_stock_data.
+            - returns:
+                - dict: The moving average, shaped like the Alpha Vantage response.
+        """
+        if moving_average_type not in MOVING_AVERAGES:
+            raise ValueError(f"{moving_average_type} is not supported locally")
+        bars = self._bars(ticker, interval, data)
+        if bars is None:
+            return None
+        values = MOVING_AVERAGES[moving_average_type](bars[series_type.capitalize()].to_numpy(), time_period)
+        return self._format(bars, moving_average_type, ticker, interval, {moving_average_type: values},
+                            {"5: Time Period": time_period, "6: Series Type": series_type})
+
+    def get_macd(self, ticker: str, interval: str = "1min", series_type: str = "close", data: pd.DataFrame | None = None) -> dict | None:
+        bars = self._bars(ticker, interval, data)
+        if bars is None:
+            return None
+        line, signal, histogram = macd(bars[series_type.capitalize()].to_numpy())
+        return self._format(bars, "MACD", ticker, interval,
+                            {"MACD_Signal": signal, "MACD": line, "MACD_Hist": histogram},
+                            {"5.1: Fast Period": 12, "5.2: Slow Period": 26, "5.3: Signal Period": 9,
+                             "6: Series Type": series_type})
+
+    def get_stoch(self, ticker: str, interval: str = "1min", series_type: str = "close", data: pd.DataFrame | None = None) -> dict | None:
+        bars = self._bars(ticker, interval, data)
+        if bars is None:
+            return None
+        slow_k, slow_d = stoch(bars["High"].to_numpy(), bars["Low"].to_numpy(), bars["Close"].to_numpy())
+        return self._format(bars, "STOCH", ticker, interval, {"SlowK": slow_k, "SlowD": slow_d},
+                            {"5.1: FastK Period": 5, "5.2: SlowK Period": 3, "5.3: SlowK MA Type": 0,
+                             "5.4: SlowD Period": 3, "5.5: SlowD MA Type": 0})
+
+    def get_rsi(self, ticker: str, interval: str = "1min", time_period: int = 10, series_type: str = "close",
+                data: pd.DataFrame | None = None) -> dict | None:
+        bars = self._bars(ticker, interval, data)
+        if bars is None:
+            return None
+        values = rsi(bars[series_type.capitalize()].to_numpy(), time_period)
+        return self._format(bars, "RSI", ticker, interval, {"RSI": values},
+                            {"5: Time Period": time_period, "6: Series Type": series_type})
+
+    def get_bolinger_bands(self, ticker, interval: str = "1min", time_period: int = 10, series_type: str = "close",
+                           data: pd.DataFrame | None = None) -> dict | None:
+        bars = self._bars(ticker, interval, data)
+        if bars is None:
+            return None
+        upper, middle, lower = bbands(bars[series_type.capitalize()].to_numpy(), time_period)
+        return self._format(bars, "BBANDS", ticker, interval,
+                            {"Real Upper Band": upper, "Real Middle Band": middle, "Real Lower Band": lower},
+                            {"5: Time Period": time_period, "6.1: Deviation multiplier for upper band": 2,
+                             "6.2: Deviation multiplier for lower band": 2, "7: Series Type": series_type})
+
+    def get_atr(self, ticker: str, interval: str = "1min", time_period: int = 10, series_type: str = "close",
+                data: pd.DataFrame | None = None) -> dict | None:
+        bars = self._bars(ticker, interval, data)
+        if bars is None:
+            return None
+        values = atr(bars["High"].to_numpy(), bars["Low"].to_numpy(), bars["Close"].to_numpy(), time_period)
+        return self._format(bars, "ATR", ticker, interval, {"ATR": values}, {"5: Time Period": time_period})
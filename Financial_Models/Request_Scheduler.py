@@ -0,0 +1,278 @@
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable
+
+
+# Priority classes, lower runs first.
+INTERACTIVE = 0
+BACKGROUND = 10
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# Seconds a caller waits for its response before giving up, None waits for as long as the quota takes.
+CALL_TIMEOUTS = {
+    INTERACTIVE: float(os.getenv("ALPHA_VANTAGE_INTERACTIVE_TIMEOUT", 15)),
+    BACKGROUND: None,
+}
+
+
+class Throttled_Error(Exception):
+    pass
+
+
+def is_throttled(payload: Any) -> bool:
+    """
+        Check whether an Alpha Vantage response is a rate-limit message instead of data.
+        - params:
+            - payload (Any): The parsed JSON body (dict) or raw text of the response.
+        - returns:
+            - bool: True if the response is a throttle note.
+    """
+    if isinstance(payload, str):
+        if not payload.lstrip().startswith("{"):
+            return False
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            return False
+    if not isinstance(payload, dict):
+        return False
+    if "Note" in payload:
+        return True
+    message = str(payload.get("Information", "")).lower()
+    return "rate limit" in message or "call frequency" in message or "requests per" in message
+
+
+class Token_Bucket:
+    def __init__(self, rate_per_minute: float, capacity: float | None = None) -> None:
+        self._rate = rate_per_minute / 60.0
+        # At least one token fits, or a quota split across many workers would never dispatch.
+        self._capacity = max(1.0, capacity if capacity is not None else rate_per_minute)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"Token_Bucket(rate_per_minute={self._rate * 60}, capacity={self._capacity})"
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """
+            Take a token if one is available.
+            - returns:
+                - float: 0 if a token was taken, otherwise the seconds until the next token.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self._rate
+
+    def pause(self, seconds: float) -> None:
+        """
+            Drain the bucket and hand out no tokens for the given time, used after a throttle response.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = 0
+            self._updated = now + seconds
+            self._paused_until = max(self._paused_until, now + seconds)
+
+
+class _Job:
+    def __init__(self, fn: Callable[[], Any], priority: int) -> None:
+        self.fn = fn
+        self.priority = priority
+        self.future = Future()
+        self.submitted = time.monotonic()
+        self.requeues = 0
+        self.abandoned = False
+
+
+class Request_Scheduler:
+    def __init__(self, calls_per_minute: float = 5, burst: float | None = None, workers: int = 4,
+                 max_requeues: int = 3, throttle_backoff: float = 60.0) -> None:
+        self._bucket = Token_Bucket(calls_per_minute, burst)
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._dispatch_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._max_requeues = max_requeues
+        self._throttle_backoff = throttle_backoff
+        self._depth = {}
+        self._waits = deque(maxlen=1000)
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "throttled": 0, "requeued": 0,
+                          "timed_out": 0, "dropped": 0}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._workers = [threading.Thread(target=self._work, daemon=True, name=f"av-scheduler-{i}")
+                         for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def __repr__(self) -> str:
+        return f"Request_Scheduler(bucket={self._bucket!r}, workers={len(self._workers)})"
+
+    @property
+    def bucket(self) -> Token_Bucket:
+        return self._bucket
+
+    def submit(self, fn: Callable[[], Any], priority: int = INTERACTIVE) -> Future:
+        """
+            Queue a call to Alpha Vantage.
+            - params:
+                - fn (Callable): Performs the request and returns the parsed response.
+                - priority (int): INTERACTIVE or BACKGROUND, lower values are dispatched first.
+            - returns:
+                - Future: Resolves to the response, or raises Throttled_Error if the quota never freed up.
+        """
+        return self._submit(fn, priority).future
+
+    def call(self, fn: Callable[[], Any], priority: int = INTERACTIVE, timeout: float | None = None) -> Any:
+        """
+            Queue a call to Alpha Vantage and wait for its response.
+            - params:
+                - fn (Callable): Performs the request and returns the parsed response.
+                - priority (int): INTERACTIVE or BACKGROUND, lower values are dispatched first.
+                - timeout (float | None): Seconds to wait, defaults to CALL_TIMEOUTS for the priority.
+            - returns:
+                - Any: The response. Raises Throttled_Error if the quota did not free up in time,
+                  the job is then dropped from the queue instead of spending a token later.
+        """
+        if timeout is None:
+            timeout = CALL_TIMEOUTS.get(priority)
+        job = self._submit(fn, priority)
+        try:
+            return job.future.result(timeout)
+        except TimeoutError:
+            job.abandoned = True
+            with self._stats_lock:
+                self._counters["timed_out"] += 1
+            raise Throttled_Error(f"No Alpha Vantage response within {timeout:g}s")
+
+    def _submit(self, fn: Callable[[], Any], priority: int) -> _Job:
+        job = _Job(fn, priority)
+        with self._stats_lock:
+            self._counters["submitted"] += 1
+        self._put(job, next(self._seq))
+        return job
+
+    def stats(self) -> dict:
+        """
+            Return queue depth and wait-time metrics.
+            - returns:
+                - dict: queue_depth, queue_depth_by_priority, the request counters and
+                  wait_seconds (count, avg, max, p50, p95) measured from submit to dispatch.
+        """
+        with self._stats_lock:
+            waits = sorted(self._waits)
+            count = self._counters["completed"] + self._counters["failed"]
+            return {
+                "queue_depth": sum(self._depth.values()),
+                "queue_depth_by_priority": {PRIORITY_NAMES.get(p, str(p)): d for p, d in self._depth.items()},
+                **self._counters,
+                "wait_seconds": {
+                    "count": count,
+                    "avg": self._wait_total / count if count else 0.0,
+                    "max": self._wait_max,
+                    "p50": waits[len(waits) // 2] if waits else 0.0,
+                    "p95": waits[int(len(waits) * 0.95)] if waits else 0.0,
+                },
+            }
+
+    def _put(self, job: _Job, seq: int) -> None:
+        with self._stats_lock:
+            self._depth[job.priority] = self._depth.get(job.priority, 0) + 1
+        self._queue.put((job.priority, seq, job))
+
+    def _next(self) -> tuple:
+        # Only one worker dispatches at a time, and the job is popped after a token is
+        # available, so an interactive call queued while waiting still goes first.
+        with self._dispatch_lock:
+            while True:
+                item = self._queue.get()
+                if item[2].abandoned:
+                    # Its caller timed out, drop it without spending a token.
+                    with self._stats_lock:
+                        self._depth[item[0]] -= 1
+                        self._counters["dropped"] += 1
+                    continue
+                wait = self._bucket.try_acquire()
+                if wait == 0:
+                    break
+                self._queue.put(item)
+                time.sleep(min(wait, 1.0))
+        with self._stats_lock:
+            self._depth[item[0]] -= 1
+        return item
+
+    def _work(self) -> None:
+        while True:
+            _, seq, job = self._next()
+            started = time.monotonic()
+            try:
+                result = job.fn()
+            except Exception as e:
+                self._finish(job, started, error=e)
+                continue
+            if is_throttled(result):
+                with self._stats_lock:
+                    self._counters["throttled"] += 1
+                self._bucket.pause(self._throttle_backoff)
+                if job.requeues < self._max_requeues:
+                    job.requeues += 1
+                    with self._stats_lock:
+                        self._counters["requeued"] += 1
+                    self._put(job, seq)
+                    continue
+                self._finish(job, started, error=Throttled_Error(result.get("Note") if isinstance(result, dict) else result))
+                continue
+            self._finish(job, started, result=result)
+
+    def _finish(self, job: _Job, started: float, result: Any = None, error: Exception | None = None) -> None:
+        wait = started - job.submitted
+        with self._stats_lock:
+            self._counters["failed" if error is not None else "completed"] += 1
+            self._waits.append(wait)
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Request_Scheduler:
+    """
+        Return the process-wide scheduler. The quota is read from ALPHA_VANTAGE_CALLS_PER_MINUTE
+        (default 5, the free tier) and ALPHA_VANTAGE_BURST. The bucket lives in this process, so the
+        quota is split evenly across the WEB_CONCURRENCY gunicorn workers (gunicorn's own default for
+        --workers); set it to the worker count when serving with -w.
+    """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                workers = max(1, int(os.getenv("WEB_CONCURRENCY", 1)))
+                rate = float(os.getenv("ALPHA_VANTAGE_CALLS_PER_MINUTE", 5)) / workers
+                burst = os.getenv("ALPHA_VANTAGE_BURST")
+                _scheduler = Request_Scheduler(rate, float(burst) / workers if burst else None)
+    return _scheduler
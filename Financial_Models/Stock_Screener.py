@@ -0,0 +1,247 @@
+import os
+import sys
+import threading
+import numpy as np
+import pandas as pd
+from Data_Services.Leader_Lock import Leader_Lock
+from Financial_Models.Request_Scheduler import BACKGROUND
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+UNIVERSE_PATH = os.path.join(ROOT, "companies.xlsx")
+
+ENRICHMENT_PATH = os.getenv("FINDASH_SCREENER", os.path.join(ROOT, "data", "screener.parquet"))
+
+# Screener columns filled from the Alpha Vantage OVERVIEW of each company.
+OVERVIEW_FIELDS = {
+    "market_cap": "MarketCapitalization",
+    "pe_ratio": "PERatio",
+    "peg_ratio": "PEGRatio",
+    "dividend_yield": "DividendYield",
+    "beta": "Beta",
+}
+
+# Columns only the OVERVIEW fills; a company with none of them has not been enriched yet.
+ENRICHED_COLUMNS = ["pe_ratio", "peg_ratio", "dividend_yield", "beta"]
+
+# Seconds between background enrichment batches, and companies per batch.
+ENRICH_INTERVAL = 15 * 60
+ENRICH_BATCH = 25
+
+INDEXED_COLUMNS = ["market_cap", "performance", "pe_ratio", "peg_ratio", "dividend_yield", "beta"]
+
+
+class _Sorted_Index:
+    """
+        The positions of a column's rows in ascending order of value, NaN left out, so a range is
+        two binary searches and a top-N is a slice.
+    """
+
+    def __init__(self, values: np.ndarray) -> None:
+        valid = np.flatnonzero(~np.isnan(values))
+        order = np.argsort(values[valid], kind="stable")
+        self.positions = valid[order]
+        self.values = values[self.positions]
+
+    def range(self, low: float | None = None, high: float | None = None) -> np.ndarray:
+        start = 0 if low is None else np.searchsorted(self.values, low, side="left")
+        end = len(self.values) if high is None else np.searchsorted(self.values, high, side="right")
+        return self.positions[start:end]
+
+
+class Stock_Screener:
+    def __init__(self, universe_path: str = UNIVERSE_PATH, enrichment_path: str = ENRICHMENT_PATH) -> None:
+        self._universe_path = universe_path
+        self._enrichment_path = enrichment_path
+        self._lock = threading.Lock()
+        self._attempted = set()
+        self._table = self._build_table()
+        self._build_indexes()
+
+    def __repr__(self) -> str:
+        return f"Stock_Screener(companies={len(self._table)})"
+
+    @property
+    def table(self) -> pd.DataFrame:
+        return self._table
+
+    def sectors(self) -> list:
+        return sorted(self._sectors)
+
+    def _build_table(self) -> pd.DataFrame:
+        table = pd.read_excel(self._universe_path)
+        table["ticker"] = table["ticker"].str.upper()
+        for column in OVERVIEW_FIELDS:
+            if column not in table.columns:
+                table[column] = np.nan
+        if os.path.exists(self._enrichment_path):
+            try:
+                enrichment = pd.read_parquet(self._enrichment_path).set_index("ticker")
+                table = table.set_index("ticker")
+                table.update(enrichment)
+                table = table.reset_index()
+            except Exception as e:
+                print("Error: ", e)
+        for column in INDEXED_COLUMNS:
+            table[column] = pd.to_numeric(table[column], errors="coerce").astype("float64")
+        return table
+
+    def _build_indexes(self) -> None:
+        self._indexes = {column: _Sorted_Index(self._table[column].to_numpy()) for column in INDEXED_COLUMNS}
+        self._sectors = {sector: np.asarray(positions) for sector, positions
+                         in self._table.groupby("sector").indices.items()}
+
+    def screen(self, ranges: dict | None = None, sectors: list | None = None, sort_by: str = "market_cap",
+               ascending: bool = False, limit: int | None = 50) -> pd.DataFrame:
+        """
+            Filter the universe by value ranges and sectors and return the top rows.
+            - params:
+                - ranges (dict): Column name to a (low, high) tuple, either bound may be None.
+                - sectors (list): The sectors to keep, all sectors if None or empty.
+                - sort_by (str): An indexed column to sort by; rows without a value are left out.
+                - ascending (bool): Sort direction.
+                - limit (int): The number of rows to return, all if None.
+            - returns:
+                - pd.DataFrame: The matching companies in sort order.
+        """
+        selected = np.ones(len(self._table), dtype=bool)
+        for column, (low, high) in (ranges or {}).items():
+            if low is None and high is None:
+                continue
+            mask = np.zeros(len(self._table), dtype=bool)
+            mask[self._indexes[column].range(low, high)] = True
+            selected &= mask
+        if sectors:
+            mask = np.zeros(len(self._table), dtype=bool)
+            for sector in sectors:
+                mask[self._sectors.get(sector, [])] = True
+            selected &= mask
+        order = self._indexes[sort_by].positions
+        if not ascending:
+            order = order[::-1]
+        order = order[selected[order]]
+        if limit is not None:
+            order = order[:limit]
+        return self._table.iloc[order]
+
+    def top_n(self, column: str, n: int = 10, ascending: bool = False) -> pd.DataFrame:
+        return self.screen(sort_by=column, ascending=ascending, limit=n)
+
+    def enrich(self, tickers: list | None = None, priority: int = BACKGROUND, save: bool = True) -> int:
+        """
+            Fill the OVERVIEW columns from Alpha Vantage, persist them and rebuild the indexes.
+            - params:
+                - tickers (list): The tickers to refresh, the whole universe by default.
+                - priority (int): The scheduler priority class, background by default since a full run
+                  takes many minutes of quota.
+                - save (bool): Whether to write the enrichment file.
+            - returns:
+                - int: The number of companies updated.
+        """
+        from Financial_Models.Fundamental_Indicator import Fundamental_Indicators
+        tickers = tickers if tickers is not None else self._table["ticker"].tolist()
+        loaded = Fundamental_Indicators.load_many(tickers, priority)
+        if not loaded:
+            return 0
+        updates = pd.DataFrame.from_dict(
+            {ticker: {column: indicator.company_info.get(field) for column, field in OVERVIEW_FIELDS.items()}
+             for ticker, indicator in loaded.items()}, orient="index")
+        updates = updates.apply(pd.to_numeric, errors="coerce").astype("float64")
+        with self._lock:
+            table = self._table.set_index("ticker")
+            table.update(updates)
+            self._table = table.reset_index()
+            self._build_indexes()
+            if save:
+                self._save()
+        return len(updates)
+
+    def pending(self) -> list:
+        """
+            Return the tickers that have not been enriched, leaving out those already tried by this process.
+        """
+        missing = self._table[ENRICHED_COLUMNS].isna().all(axis=1)
+        return [ticker for ticker in self._table.loc[missing, "ticker"] if ticker not in self._attempted]
+
+    def enrich_pending(self, batch: int | None = ENRICH_BATCH, priority: int = BACKGROUND) -> int:
+        """
+            Enrich the next `batch` companies without OVERVIEW data, all of them if batch is None.
+            - returns:
+                - int: The number of companies updated.
+        """
+        tickers = self.pending()
+        tickers = tickers if batch is None else tickers[:batch]
+        if not tickers:
+            return 0
+        self._attempted.update(tickers)
+        return self.enrich(tickers, priority)
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self._enrichment_path), exist_ok=True)
+        self._table[["ticker"] + list(OVERVIEW_FIELDS)].to_parquet(self._enrichment_path + ".tmp", index=False)
+        os.replace(self._enrichment_path + ".tmp", self._enrichment_path)
+
+
+_screener = None
+_screener_lock = threading.Lock()
+
+
+def get_screener() -> Stock_Screener:
+    """
+        Return the process-wide screener, built on first use.
+    """
+    global _screener
+    if _screener is None:
+        with _screener_lock:
+            if _screener is None:
+                _screener = Stock_Screener()
+    return _screener
+
+
+_enrichment = None
+_enrichment_stop = threading.Event()
+
+
+def start_enrichment(interval: float = ENRICH_INTERVAL, batch: int = ENRICH_BATCH) -> None:
+    """
+        Enrich the screener in the background, one batch of companies every `interval` seconds at
+        background priority, so the PE, PEG, dividend yield and beta filters fill in over time.
+        Only the gunicorn worker holding the enrichment Leader_Lock spends the API quota on it.
+    """
+    global _enrichment
+    if _enrichment is not None and _enrichment.is_alive():
+        return
+    _enrichment_stop.clear()
+    leader = Leader_Lock("enrichment")
+
+    def run():
+        while True:
+            if leader.try_acquire():
+                try:
+                    get_screener().enrich_pending(batch)
+                except Exception as e:
+                    print("Error: ", e)
+            if _enrichment_stop.wait(interval):
+                leader.release()
+                return
+
+    _enrichment = threading.Thread(target=run, name="screener-enrichment", daemon=True)
+    _enrichment.start()
+
+
+def stop_enrichment() -> None:
+    _enrichment_stop.set()
+
+
+def main(argv: list) -> None:
+    if not argv or argv[0] != "enrich":
+        print("Usage: python -m Financial_Models.Stock_Screener enrich [ticker ...]")
+        return
+    screener = get_screener()
+    updated = screener.enrich([t.upper() for t in argv[1:]]) if len(argv) > 1 else screener.enrich_pending(None)
+    print(f"Enriched {updated} companies, {len(screener.pending())} left without OVERVIEW data")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,13 +1,26 @@
 import os
 import dotenv
-import requests
+from Financial_Models.Alpha_Vantage_Client import get_client
+from Financial_Models.Request_Scheduler import INTERACTIVE
+from Data_Services.Metrics import timed
+from Financial_Models.Local_Technical_Indicator import LOCAL_MOVING_AVERAGES, Local_Technical_Indicators
 
 
 class Technical_Indicators:
-    def __init__(self) -> None:
+    def __init__(self, priority: int = INTERACTIVE, source: str | None = None) -> None:
+        """
+            - params:
+                - priority (int): The scheduler priority class for remote calls.
+                - source (str): "remote" to call Alpha Vantage, "local" to compute from OHLCV bars with
+                  Local_Technical_Indicators. Defaults to the FINDASH_INDICATORS environment variable, else remote.
+        """
         try:
+            self._priority = priority
+            self._source = source or os.getenv("FINDASH_INDICATORS", "remote")
+            self._local = Local_Technical_Indicators() if self._source == "local" else None
             dotenv.load_dotenv()
             self._api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
+            self._client = get_client()
         except Exception as e:
             print(e)
             return None
@@ -20,12 +33,17 @@ class Technical_Indicators:
     def api_key(self, api_key: str) -> None:
         self._api_key = api_key
 
+    @property
+    def source(self) -> str:
+        return self._source
+
     def __str__(self) -> str:
         return f"api_key: {self._api_key}"
 
     def __repr__(self) -> str:
         return f"Technical_Indicators(api_key={self._api_key})"
 
+    @timed("Technical_Indicators.get_moving_average")
     def get_moving_average(self, ticker: str, moving_average_type: str = "SMA", interval: str = "1min", time_period: int = 10, series_type: str = "close") -> dict | None:
         """
             Learn more about different moving averages at: https://www.investopedia.com/terms/m/movingaverage.asp
@@ -55,10 +73,11 @@ class Technical_Indicators:
             - returns:
                 - dict: The moving average for the given interval.
         """
-        url = f"https://www.alphavantage.co/query?function={moving_average_type}&symbol={ticker}&interval={interval}&time_period={time_period}&series_type={series_type}&apikey={self.api_key}"
-        r = requests.get(url)
-        return requests.get(url).json() if r.status_code == 200 else None
+        if self._local is not None and moving_average_type in LOCAL_MOVING_AVERAGES:
+            return self._local.get_moving_average(ticker, moving_average_type, interval, time_period, series_type)
+        return self._client.get_json({"function": moving_average_type, "symbol": ticker, "interval": interval, "time_period": time_period, "series_type": series_type, "apikey": self.api_key}, priority=self._priority)
 
+    @timed("Technical_Indicators.get_macd")
     def get_macd(self, ticker: str, interval: str = "1min", series_type: str = "close") -> dict | None:
         """
             Learn more about MACD at: https://www.investopedia.com/terms/m/macd.asp
@@ -77,10 +96,11 @@ class Technical_Indicators:
             - returns:
                 - dict: The moving average convergence divergence (MACD) for the given interval.
         """
-        url = f"https://www.alphavantage.co/query?function=MACD&symbol={ticker}&interval={interval}&series_type={series_type}&apikey={self.api_key}"
-        r = requests.get(url)
-        return requests.get(url).json() if r.status_code == 200 else None
+        if self._local is not None:
+            return self._local.get_macd(ticker, interval, series_type)
+        return self._client.get_json({"function": "MACD", "symbol": ticker, "interval": interval, "series_type": series_type, "apikey": self.api_key}, priority=self._priority)
 
+    @timed("Technical_Indicators.get_stoch")
     def get_stoch(self, ticker: str, interval: str = "1min", series_type: str = "close") -> dict | None:
         """
             Learn more about stochastic oscillator at: https://www.investopedia.com/terms/s/stochasticoscillator.asp
@@ -99,10 +119,11 @@ class Technical_Indicators:
             - returns:
                 - dict: The stochastic oscillator for the given interval.
         """
-        url = f"https://www.alphavantage.co/query?function=STOCH&symbol={ticker}&interval={interval}&series_type={series_type}&apikey={self.api_key}"
-        r = requests.get(url)
-        return requests.get(url).json() if r.status_code == 200 else None
+        if self._local is not None:
+            return self._local.get_stoch(ticker, interval, series_type)
+        return self._client.get_json({"function": "STOCH", "symbol": ticker, "interval": interval, "series_type": series_type, "apikey": self.api_key}, priority=self._priority)
 
+    @timed("Technical_Indicators.get_rsi")
     def get_rsi(self, ticker: str, interval: str = "1min", time_period: int = 10, series_type: str = "close") -> dict | None:
         """
             Learn more about relative strength index (RSI) at: https://www.investopedia.com/terms/r/rsi.asp
@@ -122,10 +143,11 @@ class Technical_Indicators:
             - returns:
                 - dict: The relative strength index (RSI) for the given interval.
         """
-        url = f"https://www.alphavantage.co/query?function=RSI&symbol={ticker}&interval={interval}&time_period={time_period}&series_type={series_type}&apikey={self.api_key}"
-        r = requests.get(url)
-        return requests.get(url).json() if r.status_code == 200 else None
+        if self._local is not None:
+            return self._local.get_rsi(ticker, interval, time_period, series_type)
+        return self._client.get_json({"function": "RSI", "symbol": ticker, "interval": interval, "time_period": time_period, "series_type": series_type, "apikey": self.api_key}, priority=self._priority)
 
+    @timed("Technical_Indicators.get_bolinger_bands")
     def get_bolinger_bands(self, ticker, interval: str = "1min", time_period: int = 10, series_type: str = "close") -> dict | None:
         """
             Learn more about bolinger bands at: https://www.investopedia.com/terms/b/bollingerbands.asp
@@ -145,10 +167,11 @@ class Technical_Indicators:
             - returns:
                 - dict: The bolinger bands for the given interval.
         """
-        url = f"https://www.alphavantage.co/query?function=BBANDS&symbol={ticker}&interval={interval}&time_period={time_period}&series_type={series_type}&apikey={self.api_key}"
-        r = requests.get(url)
-        return requests.get(url).json() if r.status_code == 200 else None
+        if self._local is not None:
+            return self._local.get_bolinger_bands(ticker, interval, time_period, series_type)
+        return self._client.get_json({"function": "BBANDS", "symbol": ticker, "interval": interval, "time_period": time_period, "series_type": series_type, "apikey": self.api_key}, priority=self._priority)
 
+    @timed("Technical_Indicators.get_atr")
     def get_atr(self, ticker: str, interval: str = "1min", time_period: int = 10, series_type: str = "close") -> dict | None:
         """
             Learn more about average true range (ATR) at: https://www.investopedia.com/terms/a/atr.asp \n
@@ -168,6 +191,6 @@ class Technical_Indicators:
             - returns:
                 - dict: The average true range (ATR) for the given interval.
         """
-        url = f"https://www.alphavantage.co/query?function=ATR&symbol={ticker}&interval={interval}&time_period={time_period}&series_type={series_type}&apikey={self.api_key}"
-        r = requests.get(url)
-        return requests.get(url).json() if r.status_code == 200 else None
+        if self._local is not None:
+            return self._local.get_atr(ticker, interval, time_period, series_type)
+        return self._client.get_json({"function": "ATR", "symbol": ticker, "interval": interval, "time_period": time_period, "series_type": series_type, "apikey": self.api_key}, priority=self._priority)
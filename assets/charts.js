@@ -0,0 +1,60 @@
+/*
+    Draws the stock graph from the columnar payload in the stock-figure store, so switching
+    between line, candlestick and OHLC happens in the browser without a server call.
+*/
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    charts: {
+        _text: null,
+        _payload: null,
+
+        parse: function (text) {
+            if (text !== this._text) {
+                this._payload = JSON.parse(text);
+                this._text = text;
+            }
+            return this._payload;
+        },
+
+        render: function (text, chartType) {
+            if (!text) {
+                return window.dash_clientside.no_update;
+            }
+            var payload = window.dash_clientside.charts.parse(text);
+            if (payload.error) {
+                return {
+                    data: [],
+                    layout: {
+                        xaxis: {title: {text: payload.error}},
+                        font: {family: "Courier New, monospace", size: 38, color: "#7f7f7f"}
+                    }
+                };
+            }
+            var trace;
+            var title;
+            if (chartType === "line") {
+                trace = {type: "scatter", mode: "lines", name: "Close", x: payload.line.x, y: payload.line.close};
+                title = "Line Chart";
+            } else {
+                trace = {
+                    type: chartType === "ohlc" ? "ohlc" : "candlestick",
+                    x: payload.bars.x,
+                    open: payload.bars.open,
+                    high: payload.bars.high,
+                    low: payload.bars.low,
+                    close: payload.bars.close
+                };
+                title = "Candlestick Chart";
+            }
+            return {
+                data: [trace],
+                layout: {
+                    title: {text: title},
+                    yaxis: {title: {text: "Stock Price (USD)"}},
+                    xaxis: {rangeslider: {visible: false}},
+                    // keep the user's zoom while the same series is shown
+                    uirevision: payload.uirevision
+                }
+            };
+        }
+    }
+});
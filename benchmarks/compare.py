@@ -0,0 +1,66 @@
+"""
+    Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.compare <baseline.json> <candidate.json> [--threshold 0.1] [--stat median]
+
+    Exits with status 1 when any benchmark is slower than the baseline by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare(baseline: dict, candidate: dict, threshold: float = 0.1, stat: str = "median") -> list:
+    """
+        Compare the benchmarks present in both result sets.
+        - params:
+            - baseline (dict): The "results" of the reference run.
+            - candidate (dict): The "results" of the run to check.
+            - threshold (float): The relative slowdown tolerated, 0.1 for 10%.
+            - stat (str): The statistic compared: min, median or mean.
+        - returns:
+            - list: (name, baseline seconds, candidate seconds, ratio, status) tuples, where status is
+              regression, improvement or ok.
+    """
+    rows = []
+    for name in sorted(set(baseline) & set(candidate)):
+        before, after = baseline[name][stat], candidate[name][stat]
+        ratio = after / before if before else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, before, after, ratio, status))
+    return rows
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare", description="Compare benchmark results.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.1, help="tolerated relative slowdown (default 0.1)")
+    parser.add_argument("--stat", default="median", choices=("min", "median", "mean"))
+    args = parser.parse_args(argv)
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    rows = compare(baseline, candidate, args.threshold, args.stat)
+    print(f"{'benchmark':<45} {'baseline ms':>12} {'candidate ms':>13} {'ratio':>7}")
+    for name, before, after, ratio, status in rows:
+        flag = {"regression": "  REGRESSION", "improvement": "  faster"}.get(status, "")
+        print(f"{name:<45} {before * 1000:>12.3f} {after * 1000:>13.3f} {ratio:>7.2f}{flag}")
+    for name in sorted(set(baseline) ^ set(candidate)):
+        print(f"{name:<45} only in {'baseline' if name in baseline else 'candidate'}")
+    regressions = [row for row in rows if row[4] == "regression"]
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,57 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from Data_Services.Bar_Store import normalize_ohlcv
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Recorded Alpha Vantage 1min bars of AAPL.
+BARS_PATH = os.path.join(ROOT, "data", "apple.xlsx")
+
+# Recorded yfinance Ticker.info of MSFT, trimmed to the fields the dashboard reads.
+INFO_PATH = os.path.join(FIXTURES, "info_msft.json")
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+_bars = None
+
+
+def recorded_bars() -> pd.DataFrame:
+    """
+        Return the recorded 1m bars, oldest first, on a UTC index.
+    """
+    global _bars
+    if _bars is None:
+        _bars = normalize_ohlcv(pd.read_excel(BARS_PATH))
+    return _bars
+
+
+def bars(size: int) -> pd.DataFrame:
+    """
+        Return `size` consecutive 1m bars in the exchange timezone. Sizes beyond the recording repeat
+        its returns, so prices keep a realistic shape at any length.
+    """
+    recorded = recorded_bars()
+    repeats = -(-size // len(recorded))
+    returns = np.tile(recorded["Close"].pct_change().fillna(0.0).to_numpy(), repeats)[:size]
+    close = recorded["Close"].iloc[0] * np.cumprod(1.0 + returns)
+    spread_high = np.tile((recorded["High"] / recorded["Close"]).to_numpy(), repeats)[:size]
+    spread_low = np.tile((recorded["Low"] / recorded["Close"]).to_numpy(), repeats)[:size]
+    spread_open = np.tile((recorded["Open"] / recorded["Close"]).to_numpy(), repeats)[:size]
+    index = pd.date_range(end=recorded.index[-1], periods=size, freq="min").tz_convert("America/New_York")
+    return pd.DataFrame({
+        "Open": close * spread_open,
+        "High": close * spread_high,
+        "Low": close * spread_low,
+        "Close": close,
+        "Volume": np.tile(recorded["Volume"].to_numpy(), repeats)[:size],
+    }, index=index)
+
+
+def info() -> dict:
+    with open(INFO_PATH) as f:
+        return json.load(f)
@@ -0,0 +1,343 @@
+"""
+    Comparison of the local indicator engine with Alpha Vantage responses recorded by `record`.
+
+    python -m benchmarks.indicators [check] [--only RSI,ATR]
+    python -m benchmarks.indicators record <symbol> [--interval 1min]
+
+    Every directory under fixtures/indicators holds one recorded set: a manifest, the bars Alpha Vantage
+    computed from, and its response for each indicator in CHECKS. `check` computes every indicator
+    locally from those bars and exits with status 1 when a field differs from the recording by more
+    than the indicator's tolerance, or when a recording shares no timestamp with the local output.
+    `record` needs ALPHA_VANTAGE_API_KEY and the network.
+
+    Until a set has been recorded, `check` builds a reference set in a temporary directory from the
+    bars in data/apple.xlsx with a plain loop implementation of the TA-Lib definitions, and compares
+    against that. It cross-checks the two local implementations only; it says nothing about agreement
+    with the API.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import pandas as pd
+from Data_Services.Bar_Store import normalize_ohlcv
+from Financial_Models.Local_Technical_Indicator import Local_Technical_Indicators, compare_outputs
+
+from benchmarks import fixtures
+
+
+INDICATOR_FIXTURES = os.path.join(fixtures.FIXTURES, "indicators")
+
+# Newest timestamps kept of each recorded response; the local engine still warms up on all the bars.
+KEEP = 500
+
+# Indicator: (getter, arguments, absolute tolerance, oldest common timestamps to skip). Responses carry
+# four decimals, so a tolerance of 2e-4 allows the rounding of both sides; oscillators on a 0-100 scale
+# and the adaptive averages get more room.
+CHECKS = {
+    "SMA": ("get_moving_average", {"moving_average_type": "SMA", "time_period": 10}, 2e-4, 0),
+    "EMA": ("get_moving_average", {"moving_average_type": "EMA", "time_period": 10}, 2e-4, 0),
+    "WMA": ("get_moving_average", {"moving_average_type": "WMA", "time_period": 10}, 2e-4, 0),
+    "DEMA": ("get_moving_average", {"moving_average_type": "DEMA", "time_period": 10}, 2e-4, 0),
+    "TEMA": ("get_moving_average", {"moving_average_type": "TEMA", "time_period": 10}, 2e-4, 0),
+    "TRIMA": ("get_moving_average", {"moving_average_type": "TRIMA", "time_period": 10}, 2e-4, 0),
+    "KAMA": ("get_moving_average", {"moving_average_type": "KAMA", "time_period": 10}, 1e-3, 0),
+    "T3": ("get_moving_average", {"moving_average_type": "T3", "time_period": 10}, 1e-3, 0),
+    "MACD": ("get_macd", {}, 2e-4, 0),
+    "STOCH": ("get_stoch", {}, 2e-3, 0),
+    "RSI": ("get_rsi", {"time_period": 10}, 2e-3, 0),
+    "BBANDS": ("get_bolinger_bands", {"time_period": 10}, 2e-4, 0),
+    "ATR": ("get_atr", {"time_period": 10}, 2e-4, 0),
+}
+
+
+def load_set(directory: str) -> tuple:
+    """
+        Read a recorded set.
+        - returns:
+            - tuple: The manifest, the bars on a UTC index, and the responses keyed by indicator.
+    """
+    with open(os.path.join(directory, "manifest.json")) as f:
+        manifest = json.load(f)
+    path = os.path.join(fixtures.ROOT, manifest["bars"]) if not os.path.isabs(manifest["bars"]) else manifest["bars"]
+    if path.endswith(".json"):
+        with open(path) as f:
+            response = json.load(f)
+        series = next(v for k, v in response.items() if k.startswith("Time Series"))
+        bars = normalize_ohlcv(pd.DataFrame.from_dict(series, orient="index"))
+    else:
+        bars = normalize_ohlcv(pd.read_excel(path))
+    responses = {}
+    for name in CHECKS:
+        response_path = os.path.join(directory, f"{name}.json")
+        if os.path.exists(response_path):
+            with open(response_path) as f:
+                responses[name] = json.load(f)
+    return manifest, bars, responses
+
+
+def recorded_sets() -> list:
+    if not os.path.isdir(INDICATOR_FIXTURES):
+        return []
+    return sorted(os.path.join(INDICATOR_FIXTURES, d) for d in os.listdir(INDICATOR_FIXTURES)
+                  if os.path.exists(os.path.join(INDICATOR_FIXTURES, d, "manifest.json")))
+
+
+def check(only: list | None = None) -> int:
+    sets = recorded_sets()
+    if sets:
+        return compare_sets(sets, only)
+    print(f"no recorded sets in {INDICATOR_FIXTURES}, comparing with the reference implementation instead")
+    with tempfile.TemporaryDirectory() as directory:
+        reference(directory)
+        return compare_sets([directory], only)
+
+
+def compare_sets(sets: list, only: list | None = None) -> int:
+    engine = Local_Technical_Indicators()
+    failures = []
+    for directory in sets:
+        manifest, bars, responses = load_set(directory)
+        name = f"{manifest['symbol']}_{manifest['interval']}"
+        recorded = manifest.get("source", "alpha_vantage") == "alpha_vantage"
+        source = "Alpha Vantage recording" if recorded else "reference implementation"
+        print(f"{name} ({source}, {len(bars)} bars)")
+        for indicator, response in responses.items():
+            if only and indicator not in only:
+                continue
+            getter, arguments, tolerance, skip = CHECKS[indicator]
+            local = getattr(engine, getter)(manifest["symbol"], interval=manifest["interval"], data=bars, **arguments)
+            result = compare_outputs(local, response, skip=skip) if local is not None else {"compared": 0, "max_abs_diff": {}}
+            worst = max(result["max_abs_diff"].values(), default=math.nan)
+            ok = result["compared"] > 0 and worst <= tolerance
+            print(f"  {indicator:<7} {result['compared']:>6} compared  max diff {worst:.6f}  "
+                  f"(tolerance {tolerance:g})  {'ok' if ok else 'FAIL'}")
+            if not ok:
+                failures.append(f"{name} {indicator}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+def _trim(response: dict) -> dict:
+    # Keep the newest KEEP timestamps of the technical analysis series; the keys sort chronologically.
+    return {
+        key: dict(sorted(value.items(), reverse=True)[:KEEP]) if key.startswith("Technical Analysis") else value
+        for key, value in response.items()
+    }
+
+
+def _save(directory: str, file_name: str, data: dict) -> None:
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, file_name), "w") as f:
+        json.dump(data, f, indent=1)
+
+
+def record(symbol: str, interval: str) -> int:
+    from Financial_Models.Alpha_Vantage_Client import get_client
+    from Financial_Models.Technical_Indicator import Technical_Indicators
+    remote = Technical_Indicators(source="remote")
+    if not remote.api_key:
+        print("FAIL: ALPHA_VANTAGE_API_KEY is not set")
+        return 1
+    directory = os.path.join(INDICATOR_FIXTURES, f"{symbol.upper()}_{interval}")
+    intraday = interval.endswith("min")
+    params = {"function": "TIME_SERIES_INTRADAY" if intraday else "TIME_SERIES_DAILY", "symbol": symbol,
+              "outputsize": "full", "apikey": remote.api_key}
+    if intraday:
+        params["interval"] = interval
+    bars = get_client().get_json(params)
+    if not bars or not any(key.startswith("Time Series") for key in bars):
+        print(f"FAIL: no bars for {symbol}: {bars}")
+        return 1
+    _save(directory, "bars.json", bars)
+    for indicator, (getter, arguments, _, _) in CHECKS.items():
+        response = getattr(remote, getter)(symbol, interval, **arguments)
+        if not response or not any(key.startswith("Technical Analysis") for key in response):
+            print(f"FAIL: no {indicator} response for {symbol}: {response}")
+            return 1
+        _save(directory, f"{indicator}.json", _trim(response))
+        print(f"recorded {indicator}")
+    relative = os.path.relpath(os.path.join(directory, "bars.json"), fixtures.ROOT)
+    _save(directory, "manifest.json", {"symbol": symbol.upper(), "interval": interval, "bars": relative,
+                                       "source": "alpha_vantage"})
+    return 0
+
+
+# Plain loop versions of the TA-Lib definitions, written independently of the NumPy engine. Series are
+# lists with None before the first value.
+
+def _valid(values: list) -> int:
+    return next((i for i, v in enumerate(values) if v is not None), len(values))
+
+
+def ref_sma(values: list, n: int) -> list:
+    out = [None] * len(values)
+    start = _valid(values)
+    for i in range(start + n - 1, len(values)):
+        out[i] = sum(values[i - n + 1:i + 1]) / n
+    return out
+
+
+def ref_ema(values: list, n: int) -> list:
+    out = [None] * len(values)
+    start = _valid(values)
+    if len(values) - start < n:
+        return out
+    k = 2.0 / (n + 1)
+    out[start + n - 1] = sum(values[start:start + n]) / n
+    for i in range(start + n, len(values)):
+        out[i] = out[i - 1] + k * (values[i] - out[i - 1])
+    return out
+
+
+def _combine(weights: list, *series: list) -> list:
+    return [None if any(s[i] is None for s in series) else sum(w * s[i] for w, s in zip(weights, series))
+            for i in range(len(series[0]))]
+
+
+def ref_wma(values: list, n: int) -> list:
+    out = [None] * len(values)
+    for i in range(n - 1, len(values)):
+        out[i] = sum((j + 1) * values[i - n + 1 + j] for j in range(n)) / (n * (n + 1) / 2)
+    return out
+
+
+def ref_dema(values: list, n: int) -> list:
+    e1 = ref_ema(values, n)
+    return _combine([2, -1], e1, ref_ema(e1, n))
+
+
+def ref_tema(values: list, n: int) -> list:
+    e1 = ref_ema(values, n)
+    e2 = ref_ema(e1, n)
+    return _combine([3, -3, 1], e1, e2, ref_ema(e2, n))
+
+
+def ref_trima(values: list, n: int) -> list:
+    # Triangular weights 1, 2, .., 2, 1 over the window; an even window repeats its middle weight.
+    weights = [min(j + 1, n - j) for j in range(n)]
+    out = [None] * len(values)
+    for i in range(n - 1, len(values)):
+        out[i] = sum(w * values[i - n + 1 + j] for j, w in enumerate(weights)) / sum(weights)
+    return out
+
+
+def ref_kama(values: list, n: int) -> list:
+    fastest, slowest = 2.0 / 3, 2.0 / 31
+    out = [None] * len(values)
+    if len(values) <= n:
+        return out
+    prev = values[n - 1]
+    for i in range(n, len(values)):
+        volatility = sum(abs(values[j] - values[j - 1]) for j in range(i - n + 1, i + 1))
+        ratio = abs(values[i] - values[i - n]) / volatility if volatility else 0.0
+        prev = prev + (ratio * (fastest - slowest) + slowest) ** 2 * (values[i] - prev)
+        out[i] = prev
+    return out
+
+
+def ref_t3(values: list, n: int, a: float = 0.7) -> list:
+    e = [values]
+    for _ in range(6):
+        e.append(ref_ema(e[-1], n))
+    weights = [-a ** 3, 3 * a ** 2 + 3 * a ** 3, -6 * a ** 2 - 3 * a - 3 * a ** 3, 1 + 3 * a + a ** 3 + 3 * a ** 2]
+    return _combine(weights, e[6], e[5], e[4], e[3])
+
+
+def _wilder(values: list, n: int) -> list:
+    out = [None] * len(values)
+    start = _valid(values)
+    if len(values) - start < n:
+        return out
+    out[start + n - 1] = sum(values[start:start + n]) / n
+    for i in range(start + n, len(values)):
+        out[i] = (out[i - 1] * (n - 1) + values[i]) / n
+    return out
+
+
+def reference_values(bars: pd.DataFrame, indicator: str, arguments: dict) -> dict:
+    close, high, low = (bars[c].tolist() for c in ("Close", "High", "Low"))
+    n = arguments.get("time_period", 10)
+    averages = {"SMA": ref_sma, "EMA": ref_ema, "WMA": ref_wma, "DEMA": ref_dema, "TEMA": ref_tema,
+                "TRIMA": ref_trima, "KAMA": ref_kama, "T3": ref_t3}
+    if indicator in averages:
+        return {indicator: averages[indicator](close, n)}
+    if indicator == "MACD":
+        line = _combine([1, -1], ref_ema(close, 12), ref_ema(close, 26))
+        signal = ref_ema(line, 9)
+        return {"MACD_Signal": signal, "MACD": line, "MACD_Hist": _combine([1, -1], line, signal)}
+    if indicator == "STOCH":
+        fast_k = [None] * len(close)
+        for i in range(4, len(close)):
+            highest, lowest = max(high[i - 4:i + 1]), min(low[i - 4:i + 1])
+            fast_k[i] = 100 * (close[i] - lowest) / (highest - lowest) if highest > lowest else 0.0
+        slow_k = ref_sma(fast_k, 3)
+        return {"SlowK": slow_k, "SlowD": ref_sma(slow_k, 3)}
+    if indicator == "RSI":
+        changes = [None] + [close[i] - close[i - 1] for i in range(1, len(close))]
+        gains = _wilder([None if c is None else max(c, 0.0) for c in changes], n)
+        losses = _wilder([None if c is None else max(-c, 0.0) for c in changes], n)
+        return {"RSI": [None if g is None else (100 * g / (g + l) if g + l else 0.0) for g, l in zip(gains, losses)]}
+    if indicator == "BBANDS":
+        middle = ref_sma(close, n)
+        deviation = [None] * len(close)
+        for i in range(n - 1, len(close)):
+            window = close[i - n + 1:i + 1]
+            deviation[i] = math.sqrt(sum((v - middle[i]) ** 2 for v in window) / n)
+        return {"Real Upper Band": _combine([1, 2], middle, deviation), "Real Middle Band": middle,
+                "Real Lower Band": _combine([1, -2], middle, deviation)}
+    if indicator == "ATR":
+        ranges = [None] + [max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+                           for i in range(1, len(close))]
+        return {"ATR": _wilder(ranges, n)}
+    raise ValueError(f"No reference for {indicator}")
+
+
+def reference(directory: str) -> None:
+    """
+        Write a set in the recorded layout whose responses come from the reference implementation above,
+        computed from the bars in data/apple.xlsx.
+    """
+    symbol, interval = "AAPL", "1min"
+    bars = fixtures.recorded_bars()
+    keys = bars.index.tz_convert("US/Eastern").strftime("%Y-%m-%d %H:%M").tolist()
+    for indicator, (_, arguments, _, _) in CHECKS.items():
+        columns = reference_values(bars, indicator, arguments)
+        series = {}
+        for i in range(len(keys) - 1, -1, -1):
+            if len(series) == KEEP:
+                break
+            row = {field: values[i] for field, values in columns.items()}
+            if all(value is not None for value in row.values()):
+                series[keys[i]] = {field: f"{value:.4f}" for field, value in row.items()}
+        _save(directory, f"{indicator}.json", {
+            "Meta Data": {"1: Symbol": symbol, "2: Indicator": indicator, "3: Last Refreshed": keys[-1],
+                          "4: Interval": interval, "Time Zone": "US/Eastern Time"},
+            f"Technical Analysis: {indicator}": series,
+        })
+    _save(directory, "manifest.json", {"symbol": symbol, "interval": interval,
+                                       "bars": os.path.relpath(fixtures.BARS_PATH, fixtures.ROOT),
+                                       "source": "reference"})
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.indicators",
+                                     description="Compare local indicators with recorded responses.")
+    parser.add_argument("command", nargs="?", default="check", choices=("check", "record"))
+    parser.add_argument("symbol", nargs="?", help="symbol to record")
+    parser.add_argument("--interval", default="1min", help="Alpha Vantage interval to record")
+    parser.add_argument("--only", default="", help="comma separated indicators to check")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        if not args.symbol:
+            parser.error("record needs a symbol")
+        return record(args.symbol, args.interval)
+    return check([name.strip().upper() for name in args.only.split(",") if name.strip()])
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
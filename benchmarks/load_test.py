@@ -0,0 +1,412 @@
+"""
+    Concurrent-user load test of the Dash server.
+
+    python -m benchmarks.load_test [--url http://127.0.0.1:8050] [--users 1,5,10,25,50] [--duration 30]
+    python -m benchmarks.load_test --serve [--workers 4] [--latency 0.05-0.3] [--error-rate 0.01]
+
+    The report is also written as JSON to --output, by default benchmarks/results/load-<time>.json.
+
+    Each virtual user behaves like the Dash renderer in a browser: it loads the page, then changes the
+    symbol, interval, period and chart type, and posts the server callbacks each change triggers to
+    /_dash-update-component, built from the app's own /_dash-dependencies. Users pause between actions
+    for a random think time. Concurrency ramps through --users, one stage of --duration seconds each,
+    and each stage reports throughput and p50/p95/p99 latency and error rates per callback.
+
+    --serve starts the app with the upstream APIs replaced by recorded responses (Replay_Transport), on
+    gunicorn when it is installed. Record the responses once with a short live run:
+
+    python -m benchmarks.load_test --serve --transport record --users 1 --duration 120
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import requests
+from requests.adapters import HTTPAdapter
+
+from benchmarks import fixtures
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+DEFAULT_SYMBOLS = ("MSFT", "AAPL", "AMZN", "GOOGL", "META", "NVDA", "TSLA", "JPM")
+
+# Interval and period pairs a user would pick; yfinance only keeps intraday bars for recent periods.
+CHART_SETTINGS = (
+    ("1m", "1d"), ("1m", "5d"), ("5m", "5d"), ("15m", "1mo"), ("30m", "1mo"), ("1h", "1mo"),
+    ("1h", "3mo"), ("1d", "6mo"), ("1d", "1y"), ("1d", "5y"), ("1wk", "2y"), ("1mo", "5y"),
+)
+
+# Relative frequency of each user action.
+ACTIONS = {"symbol": 4, "interval": 3, "period": 2, "chart_type": 3}
+
+# Requests a browser sends in parallel to one host.
+BROWSER_CONNECTIONS = 6
+
+# Width the browser reports for the graph (graph-width), set by a clientside callback.
+GRAPH_WIDTH = 1200
+
+
+def prop_id(component_id: str, prop: str) -> str:
+    return f"{component_id}.{prop}"
+
+
+def split_outputs(output: str) -> list:
+    """
+        Return the (id, property) pairs of a dependency's output string, "id.prop" or "..a.b...c.d..".
+    """
+    if output.startswith(".."):
+        return [tuple(part.rsplit(".", 1)) for part in output[2:-2].split("...")]
+    return [tuple(output.rsplit(".", 1))]
+
+
+def layout_props(node, props: dict | None = None) -> dict:
+    """
+        Collect the initial property values of every component with a string id in a /_dash-layout tree.
+    """
+    props = {} if props is None else props
+    if isinstance(node, list):
+        for child in node:
+            layout_props(child, props)
+    elif isinstance(node, dict):
+        if "props" in node and "type" in node:
+            component_id = node["props"].get("id")
+            for name, value in node["props"].items():
+                if isinstance(component_id, str) and name != "children":
+                    props[prop_id(component_id, name)] = value
+                layout_props(value, props)
+    return props
+
+
+class Dash_App:
+    """
+        The server callbacks of a running Dash app, indexed by the properties that trigger them.
+    """
+
+    def __init__(self, url: str, timeout: float = 30.0) -> None:
+        self.url = url.rstrip("/")
+        self.layout = layout_props(requests.get(f"{self.url}/_dash-layout", timeout=timeout).json())
+        self.callbacks = []
+        for dependency in requests.get(f"{self.url}/_dash-dependencies", timeout=timeout).json():
+            # Clientside callbacks run in the browser, and pattern-matching ids belong to other pages.
+            if dependency.get("clientside_function"):
+                continue
+            ids = [i["id"] for i in dependency["inputs"] + dependency["state"]]
+            if not all(isinstance(i, str) and not i.startswith("{") for i in ids):
+                continue
+            self.callbacks.append(dependency)
+        self.triggers = {}
+        for dependency in self.callbacks:
+            for i in dependency["inputs"]:
+                self.triggers.setdefault(prop_id(i["id"], i["property"]), []).append(dependency)
+
+    def __repr__(self) -> str:
+        return f"Dash_App(url={self.url}, callbacks={len(self.callbacks)})"
+
+    def triggered_by(self, changed: set) -> list:
+        seen, dependencies = set(), []
+        for prop in changed:
+            for dependency in self.triggers.get(prop, []):
+                if dependency["output"] not in seen:
+                    seen.add(dependency["output"])
+                    dependencies.append(dependency)
+        return dependencies
+
+
+class Stats:
+    def __init__(self) -> None:
+        self._samples = []
+        self._lock = threading.Lock()
+
+    def add(self, callback: str, seconds: float, outcome: str) -> None:
+        with self._lock:
+            self._samples.append((callback, seconds, outcome))
+
+    def samples(self) -> list:
+        with self._lock:
+            return list(self._samples)
+
+
+def percentile(values: list, q: float) -> float:
+    """
+        Return the q-th percentile of sorted values, interpolating between the closest ranks.
+    """
+    if not values:
+        return float("nan")
+    position = (len(values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def summarize(samples: list, seconds: float) -> dict:
+    """
+        - returns:
+            - dict: Per callback, and for "all": requests, throughput, latency percentiles in seconds,
+              and the share of calls that failed or were prevented.
+    """
+    groups = {"all": samples}
+    for sample in samples:
+        groups.setdefault(sample[0], []).append(sample)
+    report = {}
+    for callback, group in groups.items():
+        latencies = sorted(sample[1] for sample in group)
+        outcomes = [sample[2] for sample in group]
+        report[callback] = {
+            "requests": len(group),
+            "throughput": len(group) / seconds if seconds else 0.0,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "error_rate": outcomes.count("error") / len(group),
+            "prevented_rate": outcomes.count("prevented") / len(group),
+        }
+    return report
+
+
+class Virtual_User:
+    """
+        One browser session. It keeps the component properties the renderer would hold and posts each
+        server callback whose inputs changed, following the outputs of one callback into the next.
+    """
+
+    def __init__(self, app: Dash_App, stats: Stats, symbols: tuple, think: float, rng: random.Random) -> None:
+        self._app = app
+        self._stats = stats
+        self._symbols = symbols
+        self._think = think
+        self._random = rng
+        self._props = dict(app.layout)
+        self._props[prop_id("graph-width", "data")] = GRAPH_WIDTH
+        self._client = f"load-{rng.getrandbits(48):012x}"
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=BROWSER_CONNECTIONS)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=BROWSER_CONNECTIONS)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        self._session.close()
+
+    def run(self, deadline: float) -> None:
+        self.load()
+        while time.monotonic() < deadline:
+            time.sleep(self._random.uniform(0, 2 * self._think))
+            if time.monotonic() >= deadline:
+                break
+            action = self._random.choices(list(ACTIONS), weights=list(ACTIONS.values()))[0]
+            getattr(self, action)()
+
+    def load(self) -> None:
+        """
+            Fire the callbacks the renderer runs when the page opens.
+        """
+        initial = [d for d in self._app.callbacks if not d.get("prevent_initial_call")]
+        self._fire(initial, set())
+
+    def symbol(self) -> None:
+        symbol = self._random.choice(self._symbols)
+        # Typing fires the suggestions callback, submitting sets the active symbol in the browser.
+        self.change({prop_id("stock-symbol", "value"): symbol})
+        active = self._props.get(prop_id("active-symbol", "data")) or {"token": 0}
+        self.change({prop_id("active-symbol", "data"): {
+            "symbol": symbol, "token": (active.get("token") or 0) + 1, "client": self._client}})
+
+    def interval(self) -> None:
+        current = self._props.get(prop_id("interval", "value"))
+        interval, period = self._random.choice([s for s in CHART_SETTINGS if s[0] != current])
+        self.change({prop_id("interval", "value"): interval})
+        if (interval, self._props.get(prop_id("period", "value"))) not in CHART_SETTINGS:
+            self.change({prop_id("period", "value"): period})
+
+    def period(self) -> None:
+        interval = self._props.get(prop_id("interval", "value"))
+        current = self._props.get(prop_id("period", "value"))
+        periods = [p for i, p in CHART_SETTINGS if i == interval and p != current]
+        if periods:
+            self.change({prop_id("period", "value"): self._random.choice(periods)})
+        else:
+            self.interval()
+
+    def chart_type(self) -> None:
+        options = [o["value"] for o in self._props.get(prop_id("chart-type", "options")) or []]
+        current = self._props.get(prop_id("chart-type", "value"))
+        choices = [o for o in options if o != current]
+        if choices:
+            self.change({prop_id("chart-type", "value"): self._random.choice(choices)})
+
+    def change(self, values: dict) -> None:
+        self._props.update(values)
+        self._fire(self._app.triggered_by(set(values)), set(values))
+
+    def _fire(self, dependencies: list, changed: set, depth: int = 0) -> None:
+        if not dependencies or depth > 5:
+            return
+        futures = [self._pool.submit(self._post, dependency, changed) for dependency in dependencies]
+        updated = {}
+        for future in futures:
+            updated.update(future.result())
+        self._props.update(updated)
+        followers = [d for d in self._app.triggered_by(set(updated)) if d not in dependencies]
+        self._fire(followers, set(updated), depth + 1)
+
+    def _payload(self, dependency: dict, changed: set) -> dict:
+        outputs = [{"id": i, "property": p} for i, p in split_outputs(dependency["output"])]
+
+        def values(items):
+            return [{"id": i["id"], "property": i["property"],
+                     "value": self._props.get(prop_id(i["id"], i["property"]))} for i in items]
+
+        inputs = dependency["inputs"]
+        return {
+            "output": dependency["output"],
+            "outputs": outputs if dependency["output"].startswith("..") else outputs[0],
+            "inputs": values(inputs),
+            "changedPropIds": [prop_id(i["id"], i["property"]) for i in inputs
+                               if prop_id(i["id"], i["property"]) in changed],
+            "state": values(dependency["state"]),
+        }
+
+    def _post(self, dependency: dict, changed: set) -> dict:
+        name = dependency["output"].strip(".")
+        start = time.perf_counter()
+        outcome, updated = "error", {}
+        try:
+            response = self._session.post(f"{self._app.url}/_dash-update-component",
+                                          json=self._payload(dependency, changed), timeout=60)
+            if response.status_code == 204:
+                outcome = "prevented"
+            elif response.status_code == 200:
+                outcome = "ok"
+                for component_id, props in response.json().get("response", {}).items():
+                    for prop, value in props.items():
+                        updated[prop_id(component_id, prop)] = value
+        except (requests.RequestException, ValueError):
+            pass
+        self._stats.add(name, time.perf_counter() - start, outcome)
+        return updated
+
+
+def run_stage(app: Dash_App, users: int, duration: float, symbols: tuple, think: float, seed: int) -> dict:
+    stats = Stats()
+    deadline = time.monotonic() + duration
+    start = time.monotonic()
+    virtual_users = [Virtual_User(app, stats, symbols, think, random.Random(seed + i)) for i in range(users)]
+    threads = [threading.Thread(target=user.run, args=(deadline,), daemon=True) for user in virtual_users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for user in virtual_users:
+        user.close()
+    return summarize(stats.samples(), time.monotonic() - start)
+
+
+def print_stage(users: int, report: dict) -> None:
+    print(f"\n{users} concurrent user(s)")
+    print(f"{'callback':<40} {'requests':>9} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'errors':>7} {'prevented':>10}")
+    for callback, row in sorted(report.items(), key=lambda item: (item[0] != "all", item[0])):
+        print(f"{callback:<40} {row['requests']:>9} {row['throughput']:>8.1f} {row['p50'] * 1000:>9.1f} "
+              f"{row['p95'] * 1000:>9.1f} {row['p99'] * 1000:>9.1f} {row['error_rate']:>7.1%} "
+              f"{row['prevented_rate']:>10.1%}")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(transport: str, workers: int, threads: int, latency: str, error_rate: float) -> tuple:
+    """
+        Start the dashboard on a free local port with the upstream APIs on the replay transport.
+        - returns:
+            - tuple: (process, url).
+    """
+    port = free_port()
+    env = dict(os.environ, FINDASH_TRANSPORT=transport, FINDASH_REPLAY_LATENCY=latency,
+               FINDASH_REPLAY_ERROR_RATE=str(error_rate), FINDASH_PREFETCH="0")
+    if shutil.which("gunicorn"):
+        command = ["gunicorn", "--workers", str(workers), "--threads", str(threads),
+                   "--bind", f"127.0.0.1:{port}", "main:server"]
+    else:
+        print("gunicorn is not installed, serving with the single-process Flask server")
+        command = [sys.executable, "-c",
+                   f"import main; main.app.run_server(host='127.0.0.1', port={port}, debug=False, threaded=True)"]
+    process = subprocess.Popen(command, cwd=fixtures.ROOT, env=env)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The server exited with status {process.returncode}")
+        try:
+            requests.get(f"{url}/_dash-layout", timeout=2)
+            return process, url
+        except requests.RequestException:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("The server did not start within 120 seconds")
+
+
+def main(argv: list) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load_test", description="Load test the dashboard.")
+    parser.add_argument("--url", default="http://127.0.0.1:8050", help="dashboard to test, unless --serve")
+    parser.add_argument("--users", default="1,5,10,25,50", help="comma separated concurrency stages")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per stage")
+    parser.add_argument("--think", type=float, default=1.0, help="mean seconds between a user's actions")
+    parser.add_argument("--symbols", default=",".join(DEFAULT_SYMBOLS), help="comma separated symbols to browse")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None,
+                        help="report file, defaults to benchmarks/results/load-<time>.json")
+    parser.add_argument("--serve", action="store_true", help="start a local server on the replay transport")
+    parser.add_argument("--transport", default="replay", choices=("replay", "record"), help="with --serve")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers, with --serve")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker, with --serve")
+    parser.add_argument("--latency", default="0.05-0.3", help="replayed upstream latency in seconds, with --serve")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="replayed upstream error rate, with --serve")
+    args = parser.parse_args(argv)
+
+    started = datetime.now(timezone.utc)
+    output = args.output or os.path.join(RESULTS_DIR, "load-" + started.strftime("%Y%m%dT%H%M%SZ") + ".json")
+    process, url = None, args.url
+    if args.serve:
+        process, url = serve(args.transport, args.workers, args.threads, args.latency, args.error_rate)
+    try:
+        app = Dash_App(url)
+        symbols = tuple(s.strip().upper() for s in args.symbols.split(",") if s.strip())
+        print(f"Testing {url}: {len(app.callbacks)} server callbacks")
+        stages = {}
+        for users in (int(u) for u in args.users.split(",") if u):
+            stages[users] = run_stage(app, users, args.duration, symbols, args.think, args.seed)
+            print_stage(users, stages[users])
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "meta": {
+                "created": started.isoformat(),
+                "url": url,
+                "duration": args.duration,
+                "think": args.think,
+                "transport": args.transport if args.serve else None,
+            },
+            "stages": stages,
+        }, f, indent=2)
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,258 @@
+"""
+    Offline benchmarks of the fetch, transform and render paths.
+
+    python -m benchmarks.run [--sizes 1000,10000,100000] [--repeat 5] [--filter text] [--output file.json]
+    python -m benchmarks.compare <baseline.json> <candidate.json> [--threshold 0.1]
+    python -m benchmarks.startup [--import-budget 1.25]
+    python -m benchmarks.indicators [check | record <symbol>]
+
+    Upstream calls are replaced by recorded fixtures and every store writes to a temporary directory,
+    so runs need no network and leave the working tree untouched.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Point every store at a scratch directory before the modules that read these at import time load.
+SCRATCH = tempfile.mkdtemp(prefix="findash-bench-")
+os.environ["FINDASH_BAR_STORE"] = os.path.join(SCRATCH, "bars")
+os.environ["FINDASH_STATEMENTS"] = os.path.join(SCRATCH, "statements.parquet")
+os.environ["FINDASH_SCREENER"] = os.path.join(SCRATCH, "screener.parquet")
+os.environ["FINDASH_LEARNED_NAMES"] = os.path.join(SCRATCH, "learned_names.csv")
+os.environ["FINDASH_CACHE_BACKEND"] = "none"
+os.environ["FINDASH_PREFETCH"] = "0"
+os.environ.setdefault("ALPHA_VANTAGE_API_KEY", "offline")
+
+from benchmarks import fixtures
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Minimum time of one sample; fast cases are looped until a sample takes at least this long.
+MIN_SAMPLE_SECONDS = 0.05
+
+
+class _Triggered:
+    """
+        Stands in for dash.callback_context outside a request.
+    """
+    triggered = [{"prop_id": "active-symbol.data"}]
+
+
+def measure(func, repeat: int) -> dict:
+    """
+        Time a callable like timeit: loop it until one sample takes MIN_SAMPLE_SECONDS, then take
+        `repeat` samples after one warm-up sample.
+        - returns:
+            - dict: The per-call seconds (min, median, mean, stdev) and the loop count.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SAMPLE_SECONDS or number >= 1_000_000:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(MIN_SAMPLE_SECONDS / elapsed) + 1)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+@contextmanager
+def offline_dashboard(data=None):
+    """
+        Import main with yfinance replaced by the fixtures.
+    """
+    import main
+    saved = (main.download_history, main.fetch_ticker_attribute, main.callback_context)
+    main.download_history = lambda symbol, interval, period: data
+    main.fetch_ticker_attribute = lambda ticker, attribute, retries=3: fixtures.info()
+    main.callback_context = _Triggered
+    try:
+        yield main
+    finally:
+        main.download_history, main.fetch_ticker_attribute, main.callback_context = saved
+
+
+def sized_cases(size: int) -> dict:
+    """
+        Return the benchmarks that run at each data size, keyed by name.
+    """
+    import json as json_module
+    import numpy as np
+    from Data_Services.Decimation import chart_payload, decimate
+    from Data_Services.Rollup import Rollup_Engine, resample_ohlcv
+    from Financial_Models import Local_Technical_Indicator as indicators
+    from Financial_Models.Fundamental_Indicator import Fundamental_Indicators
+    from Financial_Models.Indicator_State import Indicator_Set
+
+    data = fixtures.bars(size)
+    close = data["Close"].to_numpy()
+    high, low = data["High"].to_numpy(), data["Low"].to_numpy()
+    fundamentals = Fundamental_Indicators("AAPL")
+    converted = os.path.join(SCRATCH, "converted.parquet")
+    active = {"symbol": "MSFT", "token": None, "client": None}
+
+    def get_stock_data_cold():
+        with offline_dashboard(data) as main:
+            main.symbol_cache.invalidate("MSFT")
+            main.get_stock_data("MSFT", "1m", "5d")
+
+    def get_stock_data_cached():
+        with offline_dashboard(data) as main:
+            main.get_stock_data("MSFT", "1m", "5d")
+
+    def update_graph_cold():
+        with offline_dashboard(data) as main:
+            main.symbol_cache.invalidate("MSFT")
+            main.figure_cache.clear()
+            main.update_graph(active, "1m", "5d", None, 1200)
+
+    def update_graph_cached():
+        with offline_dashboard(data) as main:
+            main.update_graph(active, "1m", "5d", None, 1200)
+
+    def plot_chart(chart_type):
+        def run():
+            import main
+            main.plot_chart(data, chart_type)
+        return run
+
+    def figure_json(chart_type):
+        def run():
+            import main
+            main.plot_chart(decimate(data, chart_type, 1200), chart_type).to_json()
+        return run
+
+    return {
+        "get_stock_data.cold": get_stock_data_cold,
+        "get_stock_data.cached": get_stock_data_cached,
+        "decimate.line": lambda: decimate(data, "line", 1200),
+        "decimate.candlestick": lambda: decimate(data, "candlestick", 1200),
+        "plot_chart.line": plot_chart("line"),
+        "plot_chart.candlestick": plot_chart("candlestick"),
+        "figure_json.line": figure_json("line"),
+        "figure_json.candlestick": figure_json("candlestick"),
+        "chart_payload.json": lambda: json_module.dumps(chart_payload(data, 1200)),
+        "update_graph.cold": update_graph_cold,
+        "update_graph.cached": update_graph_cached,
+        "resample.5min": lambda: resample_ohlcv(data, "5min"),
+        "resample.1h": lambda: resample_ohlcv(data, "1h", "30min"),
+        "resample.1D": lambda: resample_ohlcv(data, "1D"),
+        "rollup.build": lambda: Rollup_Engine().build(data),
+        "convert_timeframe.15min": lambda: fundamentals.convert_timeframe(converted, data, "15min"),
+        "indicator.sma": lambda: indicators.sma(close, 20),
+        "indicator.ema": lambda: indicators.ema(close, 20),
+        "indicator.rsi": lambda: indicators.rsi(close, 14),
+        "indicator.macd": lambda: indicators.macd(close),
+        "indicator.bbands": lambda: indicators.bbands(close, 20),
+        "indicator.atr": lambda: indicators.atr(high, low, close, 14),
+        "indicator.kama": lambda: indicators.kama(close, 10),
+        "indicator_set.update": lambda: Indicator_Set().update(data),
+    }
+
+
+def unsized_cases() -> dict:
+    """
+        Return the benchmarks that do not depend on a data size.
+    """
+    def update_fundamental_info_cold():
+        with offline_dashboard() as main:
+            main.symbol_cache.invalidate("MSFT")
+            main.update_fundamental_info({"symbol": "MSFT", "token": None, "client": None})
+
+    def update_fundamental_info_cached():
+        with offline_dashboard() as main:
+            main.update_fundamental_info({"symbol": "MSFT", "token": None, "client": None})
+
+    return {
+        "update_fundamental_info.cold": update_fundamental_info_cold,
+        "update_fundamental_info.cached": update_fundamental_info_cached,
+    }
+
+
+def run(sizes: tuple, repeat: int, name_filter: str | None = None) -> dict:
+    results = {}
+
+    def record(name, func):
+        if name_filter and name_filter not in name:
+            return
+        results[name] = measure(func, repeat)
+        print(f"{name:<45} {results[name]['median'] * 1000:>12.3f} ms")
+
+    for name, func in unsized_cases().items():
+        record(name, func)
+    for size in sizes:
+        for name, func in sized_cases(size).items():
+            record(f"{name}[{size}]", func)
+    return results
+
+
+def git_revision() -> str | None:
+    head = os.path.join(fixtures.ROOT, ".git", "HEAD")
+    try:
+        with open(head) as f:
+            ref = f.read().strip()
+        if ref.startswith("ref: "):
+            with open(os.path.join(fixtures.ROOT, ".git", ref[5:])) as f:
+                return f.read().strip()
+        return ref
+    except OSError:
+        return None
+
+
+def main(argv: list) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Run the offline benchmarks.")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in fixtures.DEFAULT_SIZES),
+                        help="comma separated bar counts")
+    parser.add_argument("--repeat", type=int, default=5, help="samples per benchmark")
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this text")
+    parser.add_argument("--output", default=None, help="result file, defaults to benchmarks/results/<time>.json")
+    args = parser.parse_args(argv)
+
+    sizes = tuple(int(size) for size in args.sizes.split(",") if size)
+    try:
+        results = run(sizes, args.repeat, args.filter)
+    finally:
+        shutil.rmtree(SCRATCH, ignore_errors=True)
+    started = datetime.now(timezone.utc)
+    output = args.output or os.path.join(RESULTS_DIR, started.strftime("%Y%m%dT%H%M%SZ") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "meta": {
+                "created": started.isoformat(),
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "sizes": sizes,
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"Wrote {len(results)} results to {output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,106 @@
+"""
+    Cold-start budget of the dashboard: the time a fresh interpreter (a gunicorn worker) takes to import
+    main and build the app, and the heavy libraries it loads before serving anything.
+
+    python -m benchmarks.startup [--runs 5] [--import-budget 1.25] [--create-budget 0.25] [--threshold 0.1]
+    python -m benchmarks.startup --save-baseline
+
+    Exits with status 1 when the median import or create_app() time is over its budget or more than
+    --threshold slower than the stored baseline (benchmarks/startup_baseline.json), or when importing
+    main loads a library that should only be imported on first use. Save a new baseline on the
+    machine that runs the check after an intended change to the cold start.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks import fixtures
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_baseline.json")
+
+# Slowdown always tolerated against the baseline, so millisecond steps such as create_app() do not fail on noise.
+MIN_SLACK = 0.005
+
+
+# Libraries main must import on first use rather than at import time.
+LAZY_MODULES = ("yfinance", "plotly.express", "plotly.graph_objects", "alpha_vantage", "requests", "openpyxl")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+main.create_app()
+created = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "create_app": created - imported,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def probe() -> dict:
+    """
+        Import main and create the app in a fresh interpreter.
+        - returns:
+            - dict: The import and create_app seconds, and the lazy modules that were already loaded.
+    """
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=fixtures.ROOT, capture_output=True, text=True,
+                            env=dict(os.environ, FINDASH_PREFETCH="0"), check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup", description="Check the cold-start budget.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to start")
+    parser.add_argument("--import-budget", type=float, default=1.25, help="median seconds to import main")
+    parser.add_argument("--create-budget", type=float, default=0.25, help="median seconds for create_app()")
+    parser.add_argument("--threshold", type=float, default=0.1, help="tolerated slowdown against the baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args(argv)
+
+    probes = [probe() for _ in range(args.runs)]
+    times = {
+        "import": statistics.median(p["import"] for p in probes),
+        "create_app": statistics.median(p["create_app"] for p in probes),
+    }
+    loaded = sorted({m for p in probes for m in p["loaded"]})
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    budgets = {"import": args.import_budget, "create_app": args.create_budget}
+    labels = {"import": "import main", "create_app": "create_app()"}
+    for name, seconds in times.items():
+        line = f"{labels[name]:<16} {seconds * 1000:>9.1f} ms  (budget {budgets[name] * 1000:.0f} ms"
+        if name in baseline:
+            line += f", baseline {baseline[name] * 1000:.1f} ms"
+        print(line + ")")
+    print(f"loaded eagerly   {', '.join(loaded) or 'none'}")
+
+    failures = []
+    for name, seconds in times.items():
+        if seconds > budgets[name]:
+            failures.append(f"{labels[name]} is over budget")
+        if name in baseline and seconds > baseline[name] + max(baseline[name] * args.threshold, MIN_SLACK):
+            failures.append(f"{labels[name]} is {seconds / baseline[name] - 1:.0%} slower than the baseline")
+    if loaded:
+        failures.append(f"main imports {', '.join(loaded)} at import time")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if args.save_baseline and not failures:
+        with open(args.baseline, "w") as f:
+            json.dump(times, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {args.baseline}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,61 @@
+from dash import html
+from dash import dcc
+from dash import dash_table
+import dash_bootstrap_components as dbc
+
+
+# Indexed columns shown as range filters, with their labels.
+SCREENER_FILTERS = {
+    "market_cap": "Market Cap",
+    "performance": "Performance (%)",
+    "pe_ratio": "PE Ratio",
+    "peg_ratio": "PEG Ratio",
+    "dividend_yield": "Dividend Yield",
+    "beta": "Beta",
+}
+
+
+def build_range_filter(column: str, label: str) -> dbc.Col:
+    return dbc.Col([
+        dbc.Label(label),
+        dbc.InputGroup([
+            dbc.Input(id={"type": "screener-min", "column": column}, type="number", placeholder="min"),
+            dbc.Input(id={"type": "screener-max", "column": column}, type="number", placeholder="max"),
+        ], size="sm"),
+    ], width=4, className="mb-3")
+
+
+def build_screener() -> dbc.Container:
+    return dbc.Container([
+        dbc.Row([
+            dbc.Col([html.H2("Stock Screener")], width=12),
+        ], className="mt-5"),
+        dbc.Row([build_range_filter(column, label) for column, label in SCREENER_FILTERS.items()]),
+        dbc.Row([
+            dbc.Col([
+                dbc.Label("Sectors"),
+                dcc.Dropdown(id="screener-sectors", options=[], multi=True),
+            ], width=6),
+            dbc.Col([
+                dbc.Label("Sort by"),
+                dbc.Select(id="screener-sort", value="market_cap",
+                           options=[{"label": label, "value": column} for column, label in SCREENER_FILTERS.items()]),
+            ], width=3),
+            dbc.Col([
+                dbc.Label("Show"),
+                dbc.Select(id="screener-limit", value="50",
+                           options=[{"label": f"Top {n}", "value": str(n)} for n in (10, 50, 100, 500)]),
+            ], width=3),
+        ], className="mb-3"),
+        dbc.Row([
+            dbc.Col([
+                dash_table.DataTable(
+                    id="screener-table",
+                    columns=[{"name": "Ticker", "id": "ticker"}, {"name": "Sector", "id": "sector"}]
+                    + [{"name": label, "id": column, "type": "numeric"} for column, label in SCREENER_FILTERS.items()],
+                    page_size=25,
+                    style_table={"overflowX": "auto"},
+                ),
+            ], width=12),
+        ]),
+    ], className="my-5")
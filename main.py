@@ -1,15 +1,31 @@
-import requests
 from dotenv import load_dotenv
 import os
-import plotly.express as px
-import plotly.graph_objects as go
 import pandas as pd
-from alpha_vantage.timeseries import TimeSeries
-from dash import html, dcc, dash
-from dash.dependencies import Output, Input
+from dash import html, dcc, dash, callback_context
+from dash.dependencies import Output, Input, State, ALL, ClientsideFunction
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
-import yfinance as yf
 import time
+import functools
+import json
+import threading
+from Data_Services.Symbol_Cache import symbol_cache
+from Data_Services.Bar_Store import bar_store, flatten_columns
+from Data_Services.Rollup import rollup_engine
+from Data_Services.Decimation import chart_payload, is_zoom_event, visible_range, width_bucket
+from Data_Services.Figure_Cache import data_version, figure_cache
+from Data_Services.Request_Gate import request_gate
+from Data_Services.Watchlist import watchlist
+from Data_Services.Symbol_Index import symbol_index
+from Data_Services.Prefetch_Worker import prefetch_enabled, prefetch_worker
+from Financial_Models.Fundamental_Indicator import Fundamental_Indicators
+from Financial_Models.Request_Scheduler import BACKGROUND
+from Financial_Models import Request_Scheduler
+from Data_Services.Metrics import instrument_callbacks, metrics, timed, upstream
+from Data_Services.Replay_Transport import transport
+from flask import Response
+from Financial_Models.Stock_Screener import get_screener, start_enrichment
+from layout.screener import SCREENER_FILTERS, build_screener
 
 
 def create_card(title, content, color, icon, footer) -> dbc.Card | None:
@@ -52,345 +68,436 @@ custom_css = {
 }
 
 
-app = dash.Dash(__name__, external_stylesheets=[
-                dbc.themes.COSMO, fontawesome_icons, custom_css])
+# Callbacks are collected here and attached to each app by create_app(), so defining them needs no app
+_callbacks = []
+_clientside_callbacks = []
+
+
+def callback(*args, **kwargs):
+    """
+        Register a server callback with the apps built by create_app()
+    """
+    def decorator(func):
+        _callbacks.append((func, args, kwargs))
+        return func
+    return decorator
+
+
+def clientside_callback(clientside_function, *args, **kwargs):
+    """
+        Register a clientside callback with the apps built by create_app()
+    """
+    _clientside_callbacks.append((clientside_function, args, kwargs))
 
-server = app.server
 
 # stock name to show in the graph
 STOCK_NAME = "Stock Name"
 
-navbar = dbc.Navbar(
-    dbc.Container(
+_yahoo_session = None
+_yahoo_session_lock = threading.Lock()
+
+
+def yahoo_session():
+    """
+        Return the shared session for Yahoo's search, recorded or replayed when FINDASH_TRANSPORT asks for it
+    """
+    global _yahoo_session
+    if _yahoo_session is None:
+        with _yahoo_session_lock:
+            if _yahoo_session is None:
+                _yahoo_session = transport.session("yahoo")
+    return _yahoo_session
+
+
+def build_layout() -> html.Div:
+    """
+        Build the layout of both pages
+    """
+    navbar = dbc.Navbar(
+        dbc.Container(
+            [
+                dbc.NavbarBrand(html.H1("Findash"), href="#"),
+                dbc.Nav(
+                    [
+                        dbc.NavItem(dbc.NavLink("HOME", href="/")),
+                        dbc.NavItem(dbc.NavLink("SCREENER", href="/screener")),
+                        dbc.NavItem(dbc.NavLink("ABOUT US", href="/about")),
+                        dbc.NavItem(dbc.NavLink("CONTACT US", href="/contact")),
+                    ],
+                    className="ml-auto",
+                    navbar=True,
+                ),
+            ],
+            fluid=True,
+        ),
+        color="light",
+        light=True,
+        dark=False,
+        sticky="top",
+        class_name="py-3 px-5"
+    )
+
+    stock_symbol_input = dbc.Col([
+        dbc.Label("Stock Symbol", html_for="stock-symbol"),
+        dbc.Input(
+            type="text",
+            id="stock-symbol",
+            placeholder="Enter stock symbol",
+            className="mb-3",
+            value="MSFT",
+            list="symbol-suggestions",
+            autocomplete="off"
+        ),
+        html.Datalist(id="symbol-suggestions"),
+
+    ], width=6)
+
+    interval_input = dbc.Col(
         [
-            dbc.NavbarBrand(html.H1("Findash"), href="#"),
-            dbc.Nav(
-                [
-                    dbc.NavItem(dbc.NavLink("HOME", href="/")),
-                    dbc.NavItem(dbc.NavLink("ABOUT US", href="/about")),
-                    dbc.NavItem(dbc.NavLink("CONTACT US", href="/contact")),
+            dbc.Label("Interval", html_for="interval"),
+            dbc.Select(
+                id="interval",
+                options=[
+                    {"label": "1 min", "value": "1m"},
+                    {"label": "5 min", "value": "5m"},
+                    {"label": "15 min", "value": "15m"},
+                    {"label": "30 min", "value": "30m"},
+                    {"label": "60 min", "value": "1h"},
+                    {"label": "Daily", "value": "1d"},
+                    {"label": "Weekly", "value": "1wk"},
+                    {"label": "Monthly", "value": "1mo"},
                 ],
-                className="ml-auto",
-                navbar=True,
-            ),
+                value="1h"
+            )
         ],
-        fluid=True,
-    ),
-    color="light",
-    light=True,
-    dark=False,
-    sticky="top",
-    class_name="py-3 px-5"
-)
+        width=3,
+    )
 
-stock_symbol_input = dbc.Col([
-    dbc.Label("Stock Symbol", html_for="stock-symbol"),
-    dbc.Input(
-        type="text",
-        id="stock-symbol",
-        placeholder="Enter stock symbol",
-        className="mb-3",
-        value="MSFT"
-    ),
-
-], width=6)
-
-interval_input = dbc.Col(
-    [
-        dbc.Label("Interval", html_for="interval"),
-        dbc.Select(
-            id="interval",
-            options=[
-                {"label": "1 min", "value": "1m"},
-                {"label": "5 min", "value": "5m"},
-                {"label": "15 min", "value": "15m"},
-                {"label": "30 min", "value": "30m"},
-                {"label": "60 min", "value": "1h"},
-                {"label": "Daily", "value": "1d"},
-                {"label": "Weekly", "value": "1wk"},
-                {"label": "Monthly", "value": "1mo"},
-            ],
-            value="1h"
-        )
-    ],
-    width=3,
-)
+    period_input = dbc.Col(
+        [
+            dbc.Label("Period", html_for="period"),
+            dbc.Select(
+                id="period",
+                options=[
+                    {"label": "1 day", "value": "1d"},
+                    {"label": "5 days", "value": "5d"},
+                    {"label": "1 month", "value": "1mo"},
+                    {"label": "3 months", "value": "3mo"},
+                    {"label": "6 months", "value": "6mo"},
+                    {"label": "1 year", "value": "1y"},
+                    {"label": "2 years", "value": "2y"},
+                    {"label": "5 years", "value": "5y"},
+                    {"label": "10 years", "value": "10y"},
+                    {"label": "Year today", "value": "ytd"},
+                    {"label": "Max", "value": "max"},
+                ],
+                value="1mo"
+            )
+        ], width=3,)
 
-period_input = dbc.Col(
-    [
-        dbc.Label("Period", html_for="period"),
-        dbc.Select(
-            id="period",
-            options=[
-                {"label": "1 day", "value": "1d"},
-                {"label": "5 days", "value": "5d"},
-                {"label": "1 month", "value": "1mo"},
-                {"label": "3 months", "value": "3mo"},
-                {"label": "6 months", "value": "6mo"},
-                {"label": "1 year", "value": "1y"},
-                {"label": "2 years", "value": "2y"},
-                {"label": "5 years", "value": "5y"},
-                {"label": "10 years", "value": "10y"},
-                {"label": "Year today", "value": "ytd"},
-                {"label": "Max", "value": "max"},
-            ],
-            value="1mo"
-        )
-    ], width=3,)
-
-
-chart_type_input = dbc.Col(
-    [
-        dbc.Label("Chart Type", html_for="chart-type"),
-        dbc.RadioItems(
-            id="chart-type",
-            options=[
-                {"label": "Line", "value": "line"},
-                {"label": "Candlestick", "value": "candlestick"},
-                {"label": "OHLC", "value": "ohlc"},
-            ],
-            value="line",
-            style={"display": "inline-block", "margin-left": "10px"}
-        )
-    ])
 
-submit_button = dbc.Col([
-    dbc.Button("Submit", id="submit-button", color="primary")
-])
+    chart_type_input = dbc.Col(
+        [
+            dbc.Label("Chart Type", html_for="chart-type"),
+            dbc.RadioItems(
+                id="chart-type",
+                options=[
+                    {"label": "Line", "value": "line"},
+                    {"label": "Candlestick", "value": "candlestick"},
+                    {"label": "OHLC", "value": "ohlc"},
+                ],
+                value="line",
+                style={"display": "inline-block", "margin-left": "10px"}
+            )
+        ])
 
+    submit_button = dbc.Col([
+        dbc.Button("Submit", id="submit-button", color="primary")
+    ])
 
-app.layout = html.Div([
-    # Container for the navbar
-    dbc.Container([
-        dbc.Row([
-            navbar
-        ])
-    ]),
-    # Container for the inputs and submit button
-    dbc.Container([
-        dbc.Row([
-            stock_symbol_input,
-            interval_input,
-            period_input,
-
-        ], className="mt-5"),
-        dbc.Row([
-            chart_type_input,
-            submit_button
-        ])
-    ]),
-    # Container for the stock name and logo + favorite star
-    dbc.Container([
-        dbc.Row([
-            dbc.Col([
-                html.Img(
-                    src="https://img.icons8.com/ios/50/000000/stock-market.png", id="stock-icon"),
-                html.H1(
-                    id="stock-name", style={"text-align": "center", "display": "inline-block"}),
-                html.I("★", className="favorite-star tooltip",
-                       style={"font-size": "30px", "color": "rgb(255, 215, 0)"}),
-
-            ], style={"display": "flex", "align-items": "center"}, width=10)
+
+    layout = html.Div([
+        # Container for the navbar
+        dbc.Container([
+            dbc.Row([
+                navbar
+            ])
         ]),
-    ]),
-    # Container for the graph
-    dbc.Container([
-        dbc.Row([
-            dbc.Col([
-                  dcc.Graph(id="stock-graph")
-                  ], width=12)
-        ])
-    ]),
-    # Container for the fundamental and technical data
-    dbc.Container([
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardHeader(
-                        [
-                            html.H3("Fundamental data", style={
-                                    "margin-left": "30px"})
-                        ],
-                        style={"display": "flex", "align-items": "center"}
-                    ),
-                    dbc.CardBody([
-                        html.Ul([], id="stock-info")
-                    ]),
-                    dbc.CardFooter("Stock Info")
-                ])
-            ], width=6),
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardHeader([
-
-                        html.H3("Technical Data", style={
-                                "margin-left": "30px"})
-                    ], style={"display": "flex", "align-items": "center"}),
-                    dbc.CardBody([
-                        html.Ul([], id="company-technical-data")
-                    ]),
-                    dbc.CardFooter("Company's technical data")
-                ])
-            ], width=6),
-        ])
-    ], className="mt-5 my-5"),
-    dbc.Container([
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardHeader([
+        dcc.Location(id="url"),
+        # Dashboard page
+        html.Div([
+            # Container for the inputs and submit button
+            dbc.Container([
+                dbc.Row([
+                    stock_symbol_input,
+                    interval_input,
+                    period_input,
+
+                ], className="mt-5"),
+                dbc.Row([
+                    chart_type_input,
+                    submit_button
+                ]),
+                # symbol submitted with the button or Enter, with a per-session submit counter
+                dcc.Store(id="active-symbol", data={"symbol": "MSFT", "token": 0, "client": None}),
+            ]),
+            # Container for the stock name and logo + favorite star
+            dbc.Container([
+                dbc.Row([
+                    dbc.Col([
                         html.Img(
-                            src="https://img.icons8.com/ios/50/000000/news.png", id="news-icon"),
-                        html.H3("Company's news", style={
-                                "margin-left": "30px"})
-                    ], style={"display": "flex", "align-items": "center"}),
-                    dbc.CardBody([
-                        html.Ul([], id="company-news")
-                    ]),
-                    dbc.CardFooter("company's news")
+                            src="https://img.icons8.com/ios/50/000000/stock-market.png", id="stock-icon"),
+                        html.H1(
+                            id="stock-name", style={"text-align": "center", "display": "inline-block"}),
+                        html.I("★", id="favorite-star", className="favorite-star tooltip",
+                               style={"font-size": "30px", "color": "rgb(255, 215, 0)", "cursor": "pointer"}),
+                        # the session's watched symbols, kept in the browser
+                        dcc.Store(id="watchlist", storage_type="local", data=[]),
+
+                    ], style={"display": "flex", "align-items": "center"}, width=10)
+                ]),
+            ]),
+            # Container for the graph
+            dbc.Container([
+                dbc.Row([
+                    dbc.Col([
+                          dcc.Graph(id="stock-graph"),
+                          dcc.Store(id="graph-width"),
+                          # serialized chart data, drawn into the graph in the browser
+                          dcc.Store(id="stock-figure")
+                          ], width=12)
                 ])
-            ], width=12)
-        ])
-    ]),
-    dbc.Container([
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardHeader("Stock Recommendations"),
-                    dbc.CardBody([
-                        dcc.Graph(id="stock-recommendation")
-                    ]),
-                    dbc.CardFooter("Stock Recommendation")
+            ]),
+            # Container for the watchlist
+            dbc.Container([
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardHeader("Watchlist"),
+                            dbc.CardBody([
+                                dbc.Table([
+                                    html.Thead([
+                                        html.Tr([
+                                            html.Th("Symbol"),
+                                            html.Th("Last"),
+                                            html.Th("Change"),
+                                        ])
+                                    ]),
+                                    html.Tbody([], id="watchlist-table"),
+                                ]),
+                            ]),
+                            dbc.CardFooter("Click the star to add or remove the current stock")
+                        ])
+                    ], width=12)
                 ])
-            ], width=6),
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardHeader("Company's upcoming events"),
-                    dbc.CardBody([
-                        dbc.Table([
-                            html.Thead([
-                                html.Tr([
-                                    html.Th("Event"),
-                                    html.Th("Date"),
-                                    html.Th("Time"),
-                                    html.Th("Impact"),
-                                    html.Th("More Info"),
-                                ])
+            ], className="mt-5"),
+            # Container for the fundamental and technical data
+            dbc.Container([
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardHeader(
+                                [
+                                    html.H3("Fundamental data", style={
+                                            "margin-left": "30px"})
+                                ],
+                                style={"display": "flex", "align-items": "center"}
+                            ),
+                            dbc.CardBody([
+                                html.Ul([], id="stock-info")
                             ]),
-                            html.Tbody([
-                                html.Tr([
-                                    html.Td("Event"),
-                                    html.Td("Date"),
-                                    html.Td("Time"),
-                                    html.Td("Impact"),
-                                    html.Td("More Info"),
-                                ])
+                            dbc.CardFooter("Stock Info")
+                        ])
+                    ], width=6),
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardHeader([
+
+                                html.H3("Technical Data", style={
+                                        "margin-left": "30px"})
+                            ], style={"display": "flex", "align-items": "center"}),
+                            dbc.CardBody([
+                                html.Ul([], id="company-technical-data")
                             ]),
-                        ]),
-                        dbc.CardFooter("company's news")
-                    ])
-                ]),
-            ], width=6),
-        ]),
-    ], className="mt-5 my-5"),
-    dbc.Container([
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardHeader("Economic Calendar"),
-                    dbc.CardBody([
-                        dbc.Table([
-                            html.Thead([
-                                html.Tr([
-                                    html.Th("Country"),
-                                    html.Th("Event"),
-                                    html.Th("Date"),
-                                    html.Th("Time"),
-                                    html.Th("Impact"),
-                                    html.Th("More Info"),
-                                ]),
+                            dbc.CardFooter("Company's technical data")
+                        ])
+                    ], width=6),
+                ])
+            ], className="mt-5 my-5"),
+            dbc.Container([
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardHeader([
+                                html.Img(
+                                    src="https://img.icons8.com/ios/50/000000/news.png", id="news-icon"),
+                                html.H3("Company's news", style={
+                                        "margin-left": "30px"})
+                            ], style={"display": "flex", "align-items": "center"}),
+                            dbc.CardBody([
+                                html.Ul([], id="company-news")
                             ]),
-                            html.Tbody([
-                                html.Tr([
-                                    html.Td("Country"),
-                                    html.Td("Event"),
-                                    html.Td("Date"),
-                                    html.Td("Time"),
-                                    html.Td("Impact"),
-                                    html.Td("More Info"),
-                                ]),
+                            dbc.CardFooter("company's news")
+                        ])
+                    ], width=12)
+                ])
+            ]),
+            dbc.Container([
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardHeader("Stock Recommendations"),
+                            dbc.CardBody([
+                                dcc.Graph(id="stock-recommendation")
                             ]),
+                            dbc.CardFooter("Stock Recommendation")
+                        ])
+                    ], width=6),
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardHeader("Company's upcoming events"),
+                            dbc.CardBody([
+                                dbc.Table([
+                                    html.Thead([
+                                        html.Tr([
+                                            html.Th("Event"),
+                                            html.Th("Date"),
+                                            html.Th("Time"),
+                                            html.Th("Impact"),
+                                            html.Th("More Info"),
+                                        ])
+                                    ]),
+                                    html.Tbody([
+                                        html.Tr([
+                                            html.Td("Event"),
+                                            html.Td("Date"),
+                                            html.Td("Time"),
+                                            html.Td("Impact"),
+                                            html.Td("More Info"),
+                                        ])
+                                    ]),
+                                ]),
+                                dbc.CardFooter("company's news")
+                            ])
                         ]),
-                        dbc.CardFooter("Economic Calendar")
-                    ])
+                    ], width=6),
+                ]),
+            ], className="mt-5 my-5"),
+            dbc.Container([
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardHeader("Economic Calendar"),
+                            dbc.CardBody([
+                                dbc.Table([
+                                    html.Thead([
+                                        html.Tr([
+                                            html.Th("Country"),
+                                            html.Th("Event"),
+                                            html.Th("Date"),
+                                            html.Th("Time"),
+                                            html.Th("Impact"),
+                                            html.Th("More Info"),
+                                        ]),
+                                    ]),
+                                    html.Tbody([
+                                        html.Tr([
+                                            html.Td("Country"),
+                                            html.Td("Event"),
+                                            html.Td("Date"),
+                                            html.Td("Time"),
+                                            html.Td("Impact"),
+                                            html.Td("More Info"),
+                                        ]),
+                                    ]),
+                                ]),
+                                dbc.CardFooter("Economic Calendar")
+                            ])
+                        ])
+                    ], width=12),
                 ])
-            ], width=12),
-        ])
-    ], className="mt-5 my-5"),
-    dbc.Container([
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardHeader("Market's indicators"),
-                    dbc.CardBody([
-                        dbc.Table([
-                            html.Thead([
-                                html.Tr([
-                                    html.Th("Name"),
-                                    html.Th("Current"),
-                                    html.Th("Forecast"),
-                                    html.Th("Upcoming"),
-                                ])
-                            ]),
-                            html.Tbody([
-                                html.Tr([
-                                    html.Td("Name"),
-                                    html.Td("Current"),
-                                    html.Td("Forecast"),
-                                    html.Td("Upcoming"),
+            ], className="mt-5 my-5"),
+            dbc.Container([
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([
+                            dbc.CardHeader("Market's indicators"),
+                            dbc.CardBody([
+                                dbc.Table([
+                                    html.Thead([
+                                        html.Tr([
+                                            html.Th("Name"),
+                                            html.Th("Current"),
+                                            html.Th("Forecast"),
+                                            html.Th("Upcoming"),
+                                        ])
+                                    ]),
+                                    html.Tbody([
+                                        html.Tr([
+                                            html.Td("Name"),
+                                            html.Td("Current"),
+                                            html.Td("Forecast"),
+                                            html.Td("Upcoming"),
+                                        ])
+                                    ])
                                 ])
                             ])
                         ])
-                    ])
-                ])
-            ], width=6),
+                    ], width=6),
+
+                    dbc.Col([
+                            dbc.Card([
+                                dbc.CardHeader("Economic News"),
+                                dbc.CardBody([
+                                    "Economic News"
+                                ]),
+                                dbc.CardFooter("Economic News")
+                            ])
 
-            dbc.Col([
-                    dbc.Card([
-                        dbc.CardHeader("Economic News"),
-                        dbc.CardBody([
-                            "Economic News"
+                            ], width=6),
+                ])
+            ], className="mt-5 my-5"),
+        ], id="dashboard-page"),
+        # Screener page, shown on /screener
+        html.Div([build_screener()], id="screener-page", style={"display": "none"}),
+        html.Hr(),
+        dbc.Container([
+            dbc.Row([
+                dbc.Col([
+                    html.Footer([
+                        html.P("All rights reserved © 2020"),
+                        html.P([
+                            "Made By Habib"
                         ]),
-                        dbc.CardFooter("Economic News")
-                    ])
+                        dbc.Nav([
+                            dbc.NavItem(dbc.NavLink(
+                                html.P("Gtihub"), href="https://github.com/Habib97SE")),
+                            dbc.NavItem(dbc.NavLink(
+                                html.P("LinkedIn"), href="https://www.linkedin.com/in/habiballah-hezarehee/")),
+
+                        ], className="ml-auto")
+                    ], className="center")
+                ], width=8, className="center col-lg-3 mg-auto")
+            ])
+        ], className="mt-5 my-5 center"),
+    ])
+    return layout
+
+
+_layout = None
 
-                    ], width=6),
-        ])
-    ], className="mt-5 my-5"),
-    html.Hr(),
-    dbc.Container([
-        dbc.Row([
-            dbc.Col([
-                html.Footer([
-                    html.P("All rights reserved © 2020"),
-                    html.P([
-                        "Made By Habib"
-                    ]),
-                    dbc.Nav([
-                        dbc.NavItem(dbc.NavLink(
-                            html.P("Gtihub"), href="https://github.com/Habib97SE")),
-                        dbc.NavItem(dbc.NavLink(
-                            html.P("LinkedIn"), href="https://www.linkedin.com/in/habiballah-hezarehee/")),
-
-                    ], className="ml-auto")
-                ], className="center")
-            ], width=8, className="center col-lg-3 mg-auto")
-        ])
-    ], className="mt-5 my-5 center"),
-])
 
+def get_layout() -> html.Div:
+    """
+        Return the layout, built on first use and shared by every app
+    """
+    global _layout
+    if _layout is None:
+        _layout = build_layout()
+    return _layout
 
-def plot_candlestick(data: pd.DataFrame) -> go.Figure:
+
+def plot_candlestick(data: pd.DataFrame) -> "go.Figure":
     """
         Plot candlestick chart
         - Params:
@@ -398,6 +505,7 @@ def plot_candlestick(data: pd.DataFrame) -> go.Figure:
         - Returns:
             - candlestick chart
     """
+    import plotly.graph_objects as go
     fig = go.Figure(data=[go.Candlestick(x=data.index,
                                          open=data['Open'],
                                          high=data['High'],
@@ -411,7 +519,7 @@ def plot_candlestick(data: pd.DataFrame) -> go.Figure:
     return fig
 
 
-def plot_line_chart(data: pd.DataFrame) -> go.Figure:
+def plot_line_chart(data: pd.DataFrame) -> "go.Figure":
     """
         Plot line chart
         - Params:
@@ -419,6 +527,7 @@ def plot_line_chart(data: pd.DataFrame) -> go.Figure:
         - Returns:
             - line chart
     """
+    import plotly.graph_objects as go
     fig = go.Figure()
     fig.add_trace(go.Scatter(x=data.index, y=data['Close'],
                              mode='lines', name='Close'))
@@ -431,7 +540,7 @@ def plot_line_chart(data: pd.DataFrame) -> go.Figure:
     return fig
 
 
-def plot_chart(data: pd.DataFrame, chart_type: str) -> go.Figure:
+def plot_chart(data: pd.DataFrame, chart_type: str) -> "go.Figure":
     """
         Plot chart
         - Params:
@@ -440,6 +549,7 @@ def plot_chart(data: pd.DataFrame, chart_type: str) -> go.Figure:
         - Returns:
             - chart
     """
+    import plotly.graph_objects as go
     if chart_type == "line":
         return plot_line_chart(data)
     chart_types = {
@@ -459,26 +569,46 @@ def plot_chart(data: pd.DataFrame, chart_type: str) -> go.Figure:
     return fig
 
 
+@timed("get_stock_tricker")
 def get_stock_tricker(company_name):
     """
-        Get stock ticker from company name
+        Get stock ticker from company name, from the local symbol index when it knows the name,
+        otherwise from Yahoo's search. Called once the input gave no data as a ticker, so the
+        name is remembered as an alias of the ticker found
         - Params:
             - company_name: company name
         - Returns:
-            - stock ticker
+            - stock ticker, or None if no company matches
     """
+    company_code = symbol_index.lookup_name(company_name)
+    if company_code is not None:
+        symbol_index.alias(company_name, company_code)
+        return company_code
+    import requests
+
     yfinance = "https://query2.finance.yahoo.com/v1/finance/search"
     user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36'
     params = {"q": company_name, "quotes_count": 1, "country": "United States"}
 
-    res = requests.get(url=yfinance, params=params,
-                       headers={'User-Agent': user_agent})
-    data = res.json()
-
-    company_code = data['quotes'][0]['symbol']
+    try:
+        with upstream("yahoo", "search") as outcome:
+            res = yahoo_session().get(url=yfinance, params=params,
+                                      headers={'User-Agent': user_agent}, timeout=10)
+            quotes = res.json().get('quotes') or []
+            if not quotes:
+                outcome["outcome"] = "empty"
+    except (requests.RequestException, ValueError) as e:
+        print("Error: ", e)
+        return None
+    if not quotes:
+        return None
+    company_code = quotes[0]['symbol']
+    symbol_index.learn(company_code, quotes[0].get('longname') or quotes[0].get('shortname'))
+    symbol_index.alias(company_name, company_code)
     return company_code
 
 
+@timed("get_stock_data")
 def get_stock_data(symbol, interval, period=None) -> pd.DataFrame | None:
     """
         Get stock data from Alpha Vantage API
@@ -500,13 +630,52 @@ def get_stock_data(symbol, interval, period=None) -> pd.DataFrame | None:
         "1mo": "5y"
     }
     period = period if period else periods[interval]
-    stock_data = yf.download(symbol, interval=interval,
-                             period=period)
+    return symbol_cache.get(symbol, "history", lambda: download_stock_data(symbol, interval, period),
+                            params=(interval, period))
+
+
+def download_stock_data(symbol, interval, period) -> pd.DataFrame | None:
+    """
+        Read stock data from the rollup pyramid if it covers the request, otherwise download it
+        from yfinance, falling back to a ticker search by company name
+        - Params:
+            - symbol: stock symbol or company name
+            - interval: time interval
+            - period: time period
+        - Returns:
+            - data: stock data
+    """
+    stock_data = rollup_engine.read(symbol, interval, period)
+    if stock_data is not None:
+        return stock_data
+    stock_data = download_history(symbol, interval, period)
     if stock_data.empty:
         symbol = get_stock_tricker(symbol)
-        stock_data = yf.download(symbol, interval=interval, period=period)
+        if symbol is None:
+            return None
+        stock_data = download_history(symbol, interval, period)
         if stock_data.empty:
             return None
+    try:
+        if interval == "1m":
+            rollup_engine.ingest(symbol, stock_data)
+        else:
+            bar_store.append(symbol, interval, stock_data)
+    except Exception as e:
+        print("Error: ", e)
+    return stock_data
+
+
+def download_history(symbol, interval, period) -> pd.DataFrame:
+    """
+        Download bars from yfinance, recording the request in the upstream metrics
+    """
+    import yfinance as yf
+    with upstream("yfinance", "download") as outcome:
+        stock_data = flatten_columns(
+            transport.call("yfinance", "download", yf.download, symbol, interval=interval, period=period))
+        if stock_data.empty:
+            outcome["outcome"] = "empty"
     return stock_data
 
 
@@ -518,6 +687,7 @@ def get_stock_overview(symbol):
         - Returns:
             - data: stock overview
     """
+    from alpha_vantage.timeseries import TimeSeries
     ts = TimeSeries(key=api_key, output_format='pandas')
     data, meta = ts.get_quote_endpoint(symbol=symbol)
     return data
@@ -530,7 +700,8 @@ def build_li_item(name, value):
     return html.Li([name, html.Strong(value)])
 
 
-def get_recommendations(ticker) -> px.pie:
+@timed("get_recommendations")
+def get_recommendations(ticker) -> "go.Figure":
     """
         This method will return the pie chart with recommendations for a given stock
         - Params:
@@ -538,8 +709,10 @@ def get_recommendations(ticker) -> px.pie:
         - Returns:
             - pie chart with recommendations
     """
+    import plotly.express as px
     try:
-        df_recommendations = yf.Ticker(ticker).recommendations
+        df_recommendations = symbol_cache.get(
+            ticker, "recommendations", lambda: fetch_ticker_attribute(ticker, "recommendations"))
         df_recommendations = df_recommendations.reset_index()
 
         buy = df_recommendations[df_recommendations['To Grade']
@@ -555,20 +728,69 @@ def get_recommendations(ticker) -> px.pie:
         return None
 
 
-def get_info(ticker: str):
+def fetch_ticker_attribute(ticker: str, attribute: str, retries: int = 3):
     """
-        This method will return the info about the company
+        Fetch one attribute (info, news, recommendations) of a yfinance Ticker
         - Params:
             - ticker: stock ticker
+            - attribute: name of the Ticker attribute
+            - retries: number of attempts before giving up
         - Returns:
-            - info about the company
+            - value of the attribute
     """
-    while True:
+    import yfinance as yf
+    for attempt in range(retries):
         try:
-            return yf.Ticker(ticker)
-        except:
+            with upstream("yfinance", attribute):
+                return transport.call("yfinance", attribute, lambda t: getattr(yf.Ticker(t), attribute), ticker)
+        except Exception:
+            if attempt == retries - 1:
+                raise
             time.sleep(5)
-            continue
+
+
+@timed("get_info")
+def get_info(ticker: str) -> dict:
+    """
+        This method will return the info about the company
+        - Params:
+            - ticker: stock ticker
+        - Returns:
+            - info about the company
+    """
+    return symbol_cache.get(ticker, "info", lambda: learn_name(ticker, fetch_ticker_attribute(ticker, "info")))
+
+
+def learn_name(ticker: str, info: dict) -> dict:
+    """
+        Teach the symbol index the company name of a ticker looked up on yfinance
+    """
+    if info and info.get('longName'):
+        symbol_index.learn(ticker, info['longName'])
+    return info
+
+
+@timed("get_news")
+def get_news(ticker: str) -> list:
+    """
+        This method will return the latest news about the company
+        - Params:
+            - ticker: stock ticker
+        - Returns:
+            - list of news items
+    """
+    return symbol_cache.get(ticker, "news", lambda: fetch_ticker_attribute(ticker, "news"))
+
+
+"""
+    Keep the data of hot and watched symbols warm in the background, when FINDASH_PREFETCH=1
+"""
+prefetch_worker.register("history", lambda ticker: download_stock_data(ticker, "1h", "1mo"), params=("1h", "1mo"))
+prefetch_worker.register("info", lambda ticker: learn_name(ticker, fetch_ticker_attribute(ticker, "info")))
+prefetch_worker.register("news", lambda ticker: fetch_ticker_attribute(ticker, "news"))
+prefetch_worker.register("recommendations", lambda ticker: fetch_ticker_attribute(ticker, "recommendations"))
+if os.getenv("ALPHA_VANTAGE_API_KEY"):
+    prefetch_worker.register("overview", lambda ticker: Fundamental_Indicators(ticker, BACKGROUND).fetch_overview())
 
 
 """
@@ -576,30 +798,121 @@ def get_info(ticker: str):
 """
 
 
-@ app.callback(
-    Output("stock-graph", "figure"),
+clientside_callback(
+    """
+    function(n_clicks, n_submit, value, active) {
+        if (!value || !value.trim()) {
+            return window.dash_clientside.no_update;
+        }
+        var client = active.client || Math.random().toString(36).slice(2) + Date.now().toString(36);
+        return {symbol: value.trim(), token: active.token + 1, client: client};
+    }
+    """,
+    Output("active-symbol", "data"),
+    Input("submit-button", "n_clicks"),
+    Input("stock-symbol", "n_submit"),
+    State("stock-symbol", "value"),
+    State("active-symbol", "data"),
+    prevent_initial_call=True,
+)
+
+
+@callback(
+    Output("symbol-suggestions", "children"),
     Input("stock-symbol", "value"),
+)
+def update_symbol_suggestions(value):
+    """
+        Suggest tickers and company names from the local symbol index as the user types
+    """
+    if not value or len(value.strip()) < 1:
+        return []
+    return [html.Option(value=ticker, label=name or ticker) for ticker, name in symbol_index.search(value)]
+
+
+def current_symbol(active: dict) -> str:
+    """
+        Return the submitted symbol, or drop the update if the session has submitted a newer one
+        - Params:
+            - active: data of the active-symbol store
+        - Returns:
+            - stock symbol
+    """
+    if not active or not request_gate.is_current(active.get("client"), active.get("token")):
+        raise PreventUpdate
+    return symbol_index.resolve(active["symbol"]) or active["symbol"]
+
+
+def symbol_callback(func):
+    """
+        Decorate a callback whose first input is the active-symbol store. The callback gets the symbol,
+        and runs only while the request is current. Its result is dropped if a newer symbol was
+        submitted while it was fetching.
+    """
+    @functools.wraps(func)
+    def wrapper(active, *args):
+        result = func(current_symbol(active), *args)
+        current_symbol(active)
+        return result
+    return wrapper
+
+
+clientside_callback(
+    """
+    function(relayoutData) {
+        var graph = document.getElementById("stock-graph");
+        return graph ? graph.offsetWidth : window.dash_clientside.no_update;
+    }
+    """,
+    Output("graph-width", "data"),
+    Input("stock-graph", "relayoutData"),
+)
+
+
+clientside_callback(
+    ClientsideFunction(namespace="charts", function_name="render"),
+    Output("stock-graph", "figure"),
+    Input("stock-figure", "data"),
+    Input("chart-type", "value"),
+)
+
+
+@callback(
+    Output("stock-figure", "data"),
+    Input("active-symbol", "data"),
     Input("interval", "value"),
     Input("period", "value"),
-    Input("chart-type", "value")
+    Input("stock-graph", "relayoutData"),
+    State("graph-width", "data"),
 )
-def update_graph(symbol, interval, period, chart_type):
+@symbol_callback
+def update_graph(symbol, interval, period, relayout_data, graph_width):
     """
-        Update graph with new data
+        Send the chart data to the browser, decimated to the graph width rounded up to one of
+        WIDTH_BUCKETS, as one payload that every chart type is drawn from (assets/charts.js), so
+        switching chart type needs no server call.
+        On zoom only the visible range is resent, at full resolution where it fits.
+        Payloads are served from the figure cache while the data is unchanged.
     """
+    triggered = [t["prop_id"] for t in callback_context.triggered]
+    if triggered == ["stock-graph.relayoutData"] and not is_zoom_event(relayout_data):
+        raise PreventUpdate
+
+    prefetch_worker.record(symbol)
     data = get_stock_data(symbol, interval, period)
 
     if data is None:
-        fig = go.Figure()
-        fig.update_layout(
-            xaxis_title="Wrong input, try again",
-            font=dict(
-                family="Courier New, monospace",
-                size=38,
-                color="#7f7f7f"
-            )
-        )
-    return plot_chart(data, chart_type)
+        return json.dumps({"error": "Wrong input, try again"})
+    x_range = visible_range(relayout_data) if "stock-graph.relayoutData" in triggered else None
+    width = width_bucket(graph_width)
+
+    def build():
+        payload = chart_payload(data, width, x_range)
+        payload["uirevision"] = f"{symbol}-{interval}-{period}"
+        return json.dumps(payload)
+
+    key = (symbol.upper(), interval, period, width, x_range, data_version(data))
+    return figure_cache.get(key, build)
 
 
 """
@@ -608,38 +921,39 @@ def update_graph(symbol, interval, period, chart_type):
 """
 
 
-@ app.callback(
+@callback(
     Output("stock-info", "children"),
-    Input("stock-symbol", "value"),
+    Input("active-symbol", "data"),
 )
+@symbol_callback
 def update_fundamental_info(symbol):
     """
         Get stocks info and update stock-info list with new data from yfinance
     """
     stock_info = get_info(symbol)
     return [
-        build_li_item("Company Name: ", stock_info.info['longName']),
-        build_li_item("Industry: ", stock_info.info['industry']),
-        build_li_item("Sector: ", stock_info.info['sector']),
-        build_li_item("Market Cap: ", stock_info.fast_info['market_cap']),
-        build_li_item("Country: ", stock_info.info['country']),
-        build_li_item("Dividend Yield: ", stock_info.info['dividendYield']),
-        build_li_item("Dividend Rate: ", stock_info.info['dividendRate']),
-        build_li_item("EPS: ", stock_info.info['trailingEps']),
-        build_li_item("PE Ratio: ", stock_info.info['trailingPE']),
+        build_li_item("Company Name: ", stock_info['longName']),
+        build_li_item("Industry: ", stock_info['industry']),
+        build_li_item("Sector: ", stock_info['sector']),
+        build_li_item("Market Cap: ", stock_info['marketCap']),
+        build_li_item("Country: ", stock_info['country']),
+        build_li_item("Dividend Yield: ", stock_info['dividendYield']),
+        build_li_item("Dividend Rate: ", stock_info['dividendRate']),
+        build_li_item("EPS: ", stock_info['trailingEps']),
+        build_li_item("PE Ratio: ", stock_info['trailingPE']),
         build_li_item("Operating Margin: ",
-                      stock_info.info['operatingMargins']),
-        build_li_item("Profit Margin: ", stock_info.info['profitMargins']),
-        build_li_item("Price to Book: ", stock_info.info['priceToBook']),
+                      stock_info['operatingMargins']),
+        build_li_item("Profit Margin: ", stock_info['profitMargins']),
+        build_li_item("Price to Book: ", stock_info['priceToBook']),
         build_li_item("Price to Sales: ",
-                      stock_info.info['priceToSalesTrailing12Months']),
-        build_li_item("Price to Earnings: ", stock_info.info['trailingPE']),
+                      stock_info['priceToSalesTrailing12Months']),
+        build_li_item("Price to Earnings: ", stock_info['trailingPE']),
         build_li_item("Forward Price to Earnings: ",
-                      stock_info.info['forwardPE']),
-        build_li_item("PEG Ratio: ", stock_info.info['pegRatio']),
-        build_li_item("Beta: ", stock_info.info['beta']),
-        build_li_item("Revenue Growth: ", stock_info.info['revenueGrowth']),
-        build_li_item("Earnings Growth: ", stock_info.info['earningsGrowth']),
+                      stock_info['forwardPE']),
+        build_li_item("PEG Ratio: ", stock_info['pegRatio']),
+        build_li_item("Beta: ", stock_info['beta']),
+        build_li_item("Revenue Growth: ", stock_info['revenueGrowth']),
+        build_li_item("Earnings Growth: ", stock_info['earningsGrowth']),
     ]
 
 
@@ -648,16 +962,16 @@ def update_fundamental_info(symbol):
 """
 
 
-@ app.callback(
+@callback(
     Output("stock-icon", "src"),
-    Input("stock-symbol", "value"),
+    Input("active-symbol", "data"),
 )
+@symbol_callback
 def update_icon(symbol):
     """
         Get stock icon from yfinance
     """
-    stock = get_info(symbol)
-    return stock.info['logo_url']
+    return get_info(symbol)['logo_url']
 
 
 """
@@ -665,14 +979,14 @@ def update_icon(symbol):
 """
 
 
-@ app.callback(
+@callback(
     Output("stock-name", "children"),
-    Input("stock-symbol", "value"),
+    Input("active-symbol", "data"),
 )
+@symbol_callback
 def update_name(symbol):
     # Get companys full name based on  symbol  from yfiance api
-    stock = get_info(symbol)
-    return stock.info['longName']
+    return get_info(symbol)['longName']
 
 
 """
@@ -680,25 +994,207 @@ def update_name(symbol):
 """
 
 
-@ app.callback(
+@callback(
     Output("company-news", "children"),
-    Input("stock-symbol", "value"),
+    Input("active-symbol", "data"),
 )
+@symbol_callback
 def update_news(symbol):
-    stock_news = yf.Ticker(symbol)
-    return [html.Li([html.A(news['title'], href=news['link'])]) for news in stock_news.news]
+    return [html.Li([html.A(news['title'], href=news['link'])]) for news in get_news(symbol)]
 
 
-@app.callback(
+@callback(
     Output("stock-recommendation", "figure"),
-    Input("stock-symbol", "value"),
+    Input("active-symbol", "data"),
 )
+@symbol_callback
 def update_sentiment(symbol):
     return get_recommendations(symbol)
 
 
+"""
+    Watchlist: the star adds or removes the current symbol, and the watchlist card
+    shows every watched symbol from one batched download
+"""
+
+
+@callback(
+    Output("watchlist", "data"),
+    Input("favorite-star", "n_clicks"),
+    State("active-symbol", "data"),
+    State("watchlist", "data"),
+    prevent_initial_call=True,
+)
+def toggle_favorite(n_clicks, active, symbols):
+    symbol = current_symbol(active).strip().upper()
+    symbols = symbols or []
+    if symbol in symbols:
+        return [s for s in symbols if s != symbol]
+    return symbols + [symbol]
+
+
+@callback(
+    Output("favorite-star", "style"),
+    Input("watchlist", "data"),
+    Input("active-symbol", "data"),
+    State("favorite-star", "style"),
+)
+def update_favorite_star(symbols, active, style):
+    watched = current_symbol(active).strip().upper() in (symbols or [])
+    return {**(style or {}), "color": "rgb(255, 215, 0)" if watched else "rgb(200, 200, 200)"}
+
+
+@callback(
+    Output("watchlist-table", "children"),
+    Input("watchlist", "data"),
+)
+def update_watchlist(symbols):
+    """
+        Fetch the daily bars of all watched symbols in one batched request; symbols that fail
+        are listed as unavailable without affecting the others
+    """
+    if not symbols:
+        return [html.Tr([html.Td("No symbols yet", colSpan=3)])]
+    watchlist.touch(symbols)
+    result = watchlist.fetch("1d", "5d", symbols)
+    rows = []
+    for symbol in symbols:
+        data = result["frames"].get(symbol)
+        close = data["Close"].dropna() if data is not None else None
+        if close is None or close.empty:
+            rows.append(html.Tr([html.Td(symbol), html.Td("unavailable", colSpan=2,
+                                                           title=str(result["errors"].get(symbol, "No data found")))]))
+            continue
+        change = (close.iloc[-1] / close.iloc[-2] - 1) * 100 if len(close) > 1 else 0.0
+        rows.append(html.Tr([
+            html.Td(symbol),
+            html.Td(f"{close.iloc[-1]:.2f}"),
+            html.Td(f"{change:+.2f}%", style={"color": "green" if change >= 0 else "red"}),
+        ]))
+    return rows
+
+
+"""
+    Pages: the dashboard on / and the stock screener on /screener
+"""
+
+
+@callback(
+    Output("dashboard-page", "style"),
+    Output("screener-page", "style"),
+    Input("url", "pathname"),
+)
+def display_page(pathname):
+    if pathname == "/screener":
+        return {"display": "none"}, {"display": "block"}
+    return {"display": "block"}, {"display": "none"}
+
+
+@callback(
+    Output("screener-sectors", "options"),
+    Input("url", "pathname"),
+)
+def load_screener_sectors(pathname):
+    if pathname != "/screener":
+        raise PreventUpdate
+    return get_screener().sectors()
+
+
+@callback(
+    Output("screener-table", "data"),
+    Input("url", "pathname"),
+    Input({"type": "screener-min", "column": ALL}, "value"),
+    Input({"type": "screener-max", "column": ALL}, "value"),
+    Input("screener-sectors", "value"),
+    Input("screener-sort", "value"),
+    Input("screener-limit", "value"),
+)
+def update_screener(pathname, minimums, maximums, sectors, sort_by, limit):
+    """
+        Filter the universe with the screener's sorted indexes
+    """
+    if pathname != "/screener":
+        raise PreventUpdate
+    ranges = dict(zip(SCREENER_FILTERS, zip(minimums, maximums)))
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        limit = 50
+    return get_screener().screen(ranges, sectors, sort_by=sort_by, limit=limit).to_dict("records")
+
+
+"""
+    Metrics in Prometheus text format on /metrics
+"""
+metrics.register_collector("findash_symbol_cache", symbol_cache.stats, "Symbol cache")
+metrics.register_collector("findash_figure_cache", figure_cache.stats, "Figure cache")
+metrics.register_collector("findash_prefetch", prefetch_worker.stats, "Prefetch worker")
+metrics.register_collector("findash_transport", transport.stats, "Replay transport")
+metrics.register_collector("findash_request_gate", lambda: {"dropped": request_gate.dropped},
+                           "Requests superseded by a newer symbol")
+metrics.register_collector("findash_alpha_vantage_scheduler",
+                           lambda: Request_Scheduler._scheduler.stats() if Request_Scheduler._scheduler else {},
+                           "Alpha Vantage request scheduler")
+
+
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+def create_app() -> dash.Dash:
+    """
+        Build a Dash app with the shared layout, every registered callback and the /metrics route,
+        and start the prefetch worker and the screener enrichment when FINDASH_PREFETCH=1. Every gunicorn
+        worker starts them, but a lock file elects the one that refreshes; the prefetch worker only
+        elects with FINDASH_CACHE_BACKEND=sqlite and otherwise warms each process's own cache.
+        yfinance, plotly and the API clients are imported on first use, so creating an app stays cheap.
+        - Returns:
+            - the app; serve app.server with a WSGI server
+    """
+    app = dash.Dash(__name__, external_stylesheets=[
+                    dbc.themes.COSMO, fontawesome_icons, custom_css])
+    app.layout = get_layout()
+    for clientside_function, args, kwargs in _clientside_callbacks:
+        app.clientside_callback(clientside_function, *args, **kwargs)
+    for func, args, kwargs in _callbacks:
+        app.callback(*args, **kwargs)(func)
+    instrument_callbacks(app)
+    app.server.add_url_rule("/metrics", "metrics", metrics_endpoint)
+    metrics.start_export()
+    if prefetch_enabled():
+        prefetch_worker.start()
+        if os.getenv("ALPHA_VANTAGE_API_KEY"):
+            start_enrichment()
+    return app
+
+
+_app = None
+_app_lock = threading.Lock()
+
+
+def get_app() -> dash.Dash:
+    """
+        Return the process-wide app, created on first use
+    """
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                _app = create_app()
+    return _app
+
+
+def __getattr__(name):
+    # main.app and main:server (gunicorn) build the process-wide app on first access
+    if name == "app":
+        return get_app()
+    if name == "server":
+        return get_app().server
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def main():
-    app.run_server(debug=True)
+    get_app().run_server(debug=True)
 
 
 if __name__ == "__main__":